@@ -1,8 +1,10 @@
 from langchain.prompts import PromptTemplate
-from langchain_openai import ChatOpenAI
 from dotenv import load_dotenv
-from pydantic import SecretStr
 import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from utils.model_factory import get_chat_model
 
 load_dotenv()
 
@@ -11,12 +13,7 @@ question_template = PromptTemplate(
     template="Hi, I'm {name}! Tell me a joke about yourself.",
 )
 
-model = ChatOpenAI(
-    model="gpt-4o",
-    temperature=0.5,
-    base_url=os.environ["GITHUB_MODELS_ENDPOINT"],
-    api_key=SecretStr(os.environ["GITHUB_MODELS_TOKEN"])
-)
+model = get_chat_model("gpt-4o", temperature=0.5)
 
 chain = question_template | model
 
@@ -0,0 +1,100 @@
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from langchain_core.prompts import PromptTemplate
+from langchain_core.output_parsers import StrOutputParser
+from dotenv import load_dotenv
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from utils.model_factory import get_chat_model
+from utils.incremental import SummaryManifest, incremental_summarize
+
+load_dotenv()
+
+MANIFEST_PATH = "summary_manifest.json"
+
+long_text = """Dawn threads a pale gold through the alley of glass.
+The city yawns in a chorus of brakes and distant sirens.
+Windows blink awake, one by one, like sleepy eyes.
+Streetcloth of steam curls from manholes, a quiet river.
+Coffee steam spirals above a newspaper's pale print.
+Pedestrians sketch light on sidewalks, hurried, loud with umbrellas.
+Buses swallow the morning with their loud yawns.
+A sparrow perches on a steel beam, surveying the grid.
+The subway sighs somewhere underground, a heartbeat rising.
+Neon still glows in the corners where night refused to retire.
+A cyclist cuts through the chorus, bright with chrome and momentum.
+The city clears its throat, the air turning a little less electric.
+Shoes hiss on concrete, a thousand small verbs of arriving.
+Dawn keeps its promises in the quiet rhythm of a waking metropolis.
+The morning light cascades through towering windows of steel and glass,
+casting geometric shadows on busy streets below.
+Traffic flows like rivers of metal and light,
+while pedestrians weave through crosswalks with purpose.
+Coffee shops exhale warmth and the aroma of fresh bread,
+as commuters clutch their cups like talismans against the cold.
+Street vendors call out in a symphony of languages,
+their voices mixing with the distant hum of construction.
+Pigeons dance between the feet of hurried workers,
+finding crumbs of breakfast pastries on concrete sidewalks.
+The city breathes in rhythm with a million heartbeats,
+each person carrying dreams and deadlines in equal measure.
+Skyscrapers reach toward clouds that drift like cotton,
+while far below, subway trains rumble through tunnels.
+This urban orchestra plays from dawn until dusk,
+a endless song of ambition, struggle, and hope."""
+
+# Simulate the next day's edit: only the last line changes
+edited_text = long_text.replace(
+    "a endless song of ambition, struggle, and hope.",
+    "an endless song of ambition, struggle, rest, and hope."
+)
+
+splitter = RecursiveCharacterTextSplitter(chunk_size=300, chunk_overlap=50)
+
+llm = get_chat_model("gpt-4o", temperature=0)
+
+map_prompt = PromptTemplate.from_template("Write a concise summary of the following text:\n{context}")
+map_chain = map_prompt | llm | StrOutputParser()
+
+reduce_prompt = PromptTemplate.from_template("Combine the following summaries into a single concise summary:\n{context}")
+reduce_chain = reduce_prompt | llm | StrOutputParser()
+
+def summarize(text: str) -> str:
+    """Summarize the text reusing the manifest of the previous run"""
+    parts = splitter.create_documents([text])
+    manifest = SummaryManifest.load(MANIFEST_PATH)
+
+    result = incremental_summarize(
+        map_chain,
+        reduce_chain,
+        [part.page_content for part in parts],
+        manifest=manifest,
+        token_max=200,  # small budget so this short text still builds a reduce tree
+        length_function=llm.get_num_tokens,
+        # A manifest written with other prompts or another model is discarded
+        context={
+            "map_prompt": map_prompt.template,
+            "reduce_prompt": reduce_prompt.template,
+            "model_name": llm.model_name,
+            "temperature": llm.temperature,
+        },
+    )
+    result.manifest.save(MANIFEST_PATH)
+
+    if result.manifest_discarded:
+        print("Manifest was built with other prompts or another model: summarized from scratch")
+
+    print(
+        f"Map: {result.chunks_mapped} chunks summarized, {result.chunks_reused} reused, "
+        f"{result.chunks_removed} removed | "
+        f"Reduce: {result.nodes_reduced} nodes reduced, {result.nodes_reused} reused"
+    )
+    return result.summary
+
+print("=== RUN 1: original text ===")
+print(summarize(long_text))
+print("-" * 30)
+
+print("=== RUN 2: edited text (only the changed chunks and their branches are recomputed) ===")
+print(summarize(edited_text))
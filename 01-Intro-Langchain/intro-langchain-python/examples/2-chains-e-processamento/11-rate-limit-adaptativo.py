@@ -0,0 +1,55 @@
+from langchain_core.prompts import PromptTemplate
+from langchain_core.output_parsers import StrOutputParser
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from utils.stub_llm_server import StubLLMServer
+from utils.model_factory import get_chat_model, configure_rate_limits, close_http_clients
+from utils.summarization import map_summaries
+
+# Local stub endpoint (no API key needed) that answers 429 above 8 requests in flight
+NUM_CHUNKS = 200
+MAP_CONCURRENCY = 32
+
+server = StubLLMServer(max_concurrent=8, latency=0.1, retry_after=0.2, seed=42).start()
+os.environ["GITHUB_MODELS_ENDPOINT"] = server.base_url
+os.environ["GITHUB_MODELS_TOKEN"] = "stub-token"
+
+chunks = [
+    f"Chunk {i}: the city breathes in rhythm with a million heartbeats, "
+    f"each person carrying dreams and deadlines in equal measure."
+    for i in range(NUM_CHUNKS)
+]
+map_prompt = PromptTemplate.from_template("Write a concise summary of the following text:\n{context}")
+
+def run(title: str) -> None:
+    requests, throttled = server.requests, server.throttled
+    # max_retries=0: a 429 reaches map_summaries, which retries the chunk with backoff
+    map_chain = map_prompt | get_chat_model("gpt-4o", temperature=0, max_retries=0) | StrOutputParser()
+    start = time.perf_counter()
+    summaries = map_summaries(map_chain, chunks, max_concurrency=MAP_CONCURRENCY, max_retries=8, retry_delay=0.2)
+    elapsed = time.perf_counter() - start
+    assert len(summaries) == NUM_CHUNKS
+    print(
+        f"{title:<24} {elapsed:6.2f}s  {server.requests - requests:4d} requests"
+        f"  {server.throttled - throttled:4d} x 429"
+    )
+
+print(f"=== RATE LIMITING: {NUM_CHUNKS} chunks, map concurrency {MAP_CONCURRENCY}, endpoint allows 8 ===\n")
+
+run("no client-side limit")
+
+# Every model from get_chat_model now goes through the RPM bucket and the AIMD controller
+limiter = configure_rate_limits(requests_per_minute=6000, adaptive=True, initial_concurrency=2)
+run("token bucket + AIMD")
+
+controller = limiter.concurrency
+print(
+    f"\nAIMD: final limit {controller.limit:.1f} | {controller.succeeded} ok | {controller.throttled} throttled"
+    f" | server saw at most {server.max_in_flight_seen} in flight"
+)
+
+close_http_clients()
+server.stop()
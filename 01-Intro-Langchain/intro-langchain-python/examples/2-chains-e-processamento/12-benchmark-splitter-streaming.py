@@ -0,0 +1,40 @@
+import os
+import sys
+import time
+import tracemalloc
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from utils.streaming_splitter import StreamingRecursiveCharacterTextSplitter
+
+# Benchmark settings (no API key needed: only the splitter runs)
+INPUT_SIZES_MB = [2, 4, 8]
+BLOCK_SIZE = 64 * 1024
+
+LINE = "The city breathes in rhythm with a million heartbeats, each carrying dreams.\n"
+
+
+def generate_blocks(size_bytes: int):
+    """A title, then one endless paragraph: no "\\n\\n" after the first one"""
+    yield "Title\n\n"
+    block = LINE * (BLOCK_SIZE // len(LINE))
+    for _ in range(size_bytes // len(block)):
+        yield block
+
+
+print(f"=== STREAMING SPLITTER MEMORY: one paragraph, {BLOCK_SIZE // 1024}KB blocks ===\n")
+
+peaks = []
+for size_mb in INPUT_SIZES_MB:
+    splitter = StreamingRecursiveCharacterTextSplitter(chunk_size=300, chunk_overlap=50)
+    tracemalloc.start()
+    start = time.perf_counter()
+    chunks = sum(1 for _ in splitter.split_stream(generate_blocks(size_mb * 1024 * 1024)))
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    peaks.append(peak)
+    print(f"{size_mb:>3} MB input  {chunks:>7} chunks  {elapsed:6.2f}s  peak {peak / 1024 / 1024:6.2f} MB")
+
+# Only the text after the last separator (at most max_lookahead + one block) is kept in memory
+assert peaks[-1] < 2 * peaks[0], "peak memory must not grow with the input size"
+print("\nPeak memory is flat: it does not depend on the input size")
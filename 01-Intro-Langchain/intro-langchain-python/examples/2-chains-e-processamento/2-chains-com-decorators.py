@@ -1,9 +1,11 @@
 from langchain.prompts import PromptTemplate
-from langchain_openai import ChatOpenAI
 from langchain_core.runnables import chain
 from dotenv import load_dotenv
-from pydantic import SecretStr
 import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from utils.model_factory import get_chat_model
 
 load_dotenv()
 
@@ -17,13 +19,7 @@ question_template = PromptTemplate(
     template="What is the square result?' {square_result}",
 )
 
-model = ChatOpenAI(
-    model="gpt-4o",
-    temperature=0.5,
-    max_completion_tokens=100,
-    base_url=os.environ["GITHUB_MODELS_ENDPOINT"],
-    api_key=SecretStr(os.environ["GITHUB_MODELS_TOKEN"])
-)
+model = get_chat_model("gpt-4o", temperature=0.5, max_completion_tokens=100)
 
 chain = square | question_template | model
 
@@ -1,10 +1,12 @@
 from langchain_core.runnables import RunnableLambda
 from langchain.prompts import PromptTemplate
-from langchain_openai import ChatOpenAI
 from dotenv import load_dotenv
-from pydantic import SecretStr
 import os
+import sys
 import re
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from utils.model_factory import get_chat_model
 
 load_dotenv()
 
@@ -64,13 +66,7 @@ def main():
     )
     
     # Modelo
-    model = ChatOpenAI(
-        model="gpt-4o", 
-        temperature=0.5,
-        #max_completion_tokens=300,
-        base_url=os.environ["GITHUB_MODELS_ENDPOINT"],
-        api_key=SecretStr(os.environ["GITHUB_MODELS_TOKEN"])
-    )
+    model = get_chat_model("gpt-4o", temperature=0.5)
     
     # Chain: análise -> template -> modelo
     analysis_chain = analyze_runnable | template | model
@@ -1,9 +1,11 @@
 from langchain.prompts import PromptTemplate
-from langchain_openai import ChatOpenAI
 from langchain_core.output_parsers import StrOutputParser
 from dotenv import load_dotenv
-from pydantic import SecretStr
 import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from utils.model_factory import get_chat_model
 
 load_dotenv()
 
@@ -17,13 +19,7 @@ template_summary = PromptTemplate(
   template="Summarize the following text in 4 words:\n ```{text}```"
 )
 
-llm_en = ChatOpenAI(
-        model="gpt-4o", 
-        temperature=0.5,
-        #max_completion_tokens=300,
-        base_url=os.environ["GITHUB_MODELS_ENDPOINT"],
-        api_key=SecretStr(os.environ["GITHUB_MODELS_TOKEN"])
-    )
+llm_en = get_chat_model("gpt-4o", temperature=0.5)
 
 translate = template_translate | llm_en | StrOutputParser()
 pipeline = {"text": translate} | template_summary | llm_en | StrOutputParser()
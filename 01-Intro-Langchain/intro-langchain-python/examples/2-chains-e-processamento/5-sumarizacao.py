@@ -1,9 +1,11 @@
-from langchain_openai import ChatOpenAI
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain.chains.summarize import load_summarize_chain
 from dotenv import load_dotenv
-from pydantic import SecretStr
 import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from utils.model_factory import get_chat_model
 
 load_dotenv()
 
@@ -47,12 +49,7 @@ splitter = RecursiveCharacterTextSplitter(
 
 parts = splitter.create_documents([long_text])
 
-llm = ChatOpenAI(
-        model="gpt-4o", 
-        temperature=0,
-        base_url=os.environ["GITHUB_MODELS_ENDPOINT"],
-        api_key=SecretStr(os.environ["GITHUB_MODELS_TOKEN"])
-    )
+llm = get_chat_model("gpt-4o", temperature=0)
 
 chain_sumarize = load_summarize_chain(llm, chain_type="stuff", verbose=False)
 
@@ -1,9 +1,13 @@
-from langchain_openai import ChatOpenAI
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain.chains.summarize import load_summarize_chain
+from langchain_core.prompts import PromptTemplate
+from langchain_core.output_parsers import StrOutputParser
 from dotenv import load_dotenv
-from pydantic import SecretStr
 import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from utils.model_factory import get_chat_model
+from utils.summarization import map_summaries, collapse_summaries
 
 load_dotenv()
 
@@ -47,14 +51,25 @@ splitter = RecursiveCharacterTextSplitter(
 
 parts = splitter.create_documents([long_text])
 
-llm = ChatOpenAI(
-        model="gpt-4o", 
-        temperature=0,
-        base_url=os.environ["GITHUB_MODELS_ENDPOINT"],
-        api_key=SecretStr(os.environ["GITHUB_MODELS_TOKEN"])
-    )
+llm = get_chat_model("gpt-4o", temperature=0)
+
+# Map: one concise summary per chunk, computed concurrently
+map_prompt = PromptTemplate.from_template("Write a concise summary of the following text:\n{context}")
+map_chain = map_prompt | llm | StrOutputParser()
+summaries = map_summaries(map_chain, [part.page_content for part in parts], max_concurrency=8)
 
-chain_sumarize = load_summarize_chain(llm, chain_type="map_reduce", verbose=True)
+# Reduce: token-budgeted tree instead of one call over every summary joined together.
+# Summaries are packed into groups that fit token_max, the groups are reduced in
+# parallel and this repeats until a single reduce call fits.
+reduce_prompt = PromptTemplate.from_template("Combine the following summaries into a single concise summary:\n{context}")
+reduce_chain = reduce_prompt | llm | StrOutputParser()
 
-result = chain_sumarize.invoke({ "input_documents": parts })
-print(result["output_text"])
+result, levels = collapse_summaries(
+    reduce_chain,
+    summaries,
+    token_max=3000,
+    length_function=llm.get_num_tokens,
+    max_concurrency=8,
+    on_level=lambda level: print(f"Reduce level {level.depth}: {level.inputs} summaries -> {level.groups} group(s)"),
+)
+print(result)
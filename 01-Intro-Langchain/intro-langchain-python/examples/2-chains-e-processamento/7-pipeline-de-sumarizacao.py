@@ -1,11 +1,15 @@
-from langchain_openai import ChatOpenAI
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import RunnableLambda
 from dotenv import load_dotenv
-from pydantic import SecretStr
 import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from utils.model_factory import get_chat_model
+from utils.summarization import map_summaries, collapse_summaries
+from utils.summary_cache import SummaryCache
 
 load_dotenv()
 
@@ -48,28 +52,44 @@ parts = splitter.create_documents([long_text])
 #     print(part.page_content)
 #     print("-" * 10)
 
-llm = ChatOpenAI(
-    model="gpt-4o", 
-    temperature=0,
-    base_url=os.environ["GITHUB_MODELS_ENDPOINT"],
-    api_key=SecretStr(os.environ["GITHUB_MODELS_TOKEN"])
-)
+llm = get_chat_model("gpt-4o", temperature=0)
 
 # LCEL map stage: summarize each chunk
 map_prompt = PromptTemplate.from_template("Write a concise summary of the following text:\n{context}")
 map_chain = map_prompt | llm | StrOutputParser()
 
-# Process each document individually
-summaries = []
-for part in parts:
-    summary = map_chain.invoke({"context": part.page_content})
-    summaries.append(summary)
+# Unchanged chunks are served from a local SQLite cache (set enabled=False to bypass it)
+cache = SummaryCache("summary_cache.sqlite", max_bytes=50 * 1024 * 1024, enabled=True)
+
+# Process the documents concurrently (order preserved, failed chunks retried one by one)
+summaries = map_summaries(
+    map_chain,
+    [part.page_content for part in parts],
+    max_concurrency=8,
+    max_retries=2,
+    cache=cache,
+    cache_context={
+        "prompt_template": map_prompt.template,
+        "model_name": llm.model_name,
+        "temperature": llm.temperature,
+    },
+)
+print(f"Summary cache: {cache.hits} hits, {cache.misses} misses ({cache.hit_rate:.0%} hit rate)")
 
 # LCEL reduce stage: combine summaries into one final summary
 reduce_prompt = PromptTemplate.from_template("Combine the following summaries into a single concise summary:\n{context}")
 reduce_chain = reduce_prompt | llm | StrOutputParser()
 
-# Combine all summaries
-combined_summaries = "\n".join(summaries)
-result = reduce_chain.invoke({"context": combined_summaries})
+# Combine all summaries as a tree: groups that fit the token budget are reduced in parallel,
+# level by level, until a single reduce call fits
+result, levels = collapse_summaries(
+    reduce_chain,
+    summaries,
+    token_max=3000,
+    length_function=llm.get_num_tokens,
+    max_concurrency=8,
+)
+
+for level in levels:
+    print(f"Reduce level {level.depth}: {level.inputs} summaries -> {level.groups} group(s)")
 print(result)
\ No newline at end of file
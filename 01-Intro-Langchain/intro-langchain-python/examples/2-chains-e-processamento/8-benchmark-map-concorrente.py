@@ -0,0 +1,69 @@
+from langchain_core.prompts import PromptTemplate
+from langchain_core.output_parsers import StrOutputParser
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from utils.fake_chat_model import FakeLatencyChatModel
+from utils.summarization import ChunkSummaryError, map_summaries
+
+# Benchmark settings (no API key needed: the model is a local fake with configurable latency)
+NUM_CHUNKS = 200
+LATENCY_SECONDS = 0.05
+JITTER_SECONDS = 0.02
+FAILURE_RATE = 0.05
+# A chunk fails for good only if all 1 + MAX_RETRIES attempts fail (0.05 ** 7 per chunk)
+MAX_RETRIES = 6
+CONCURRENCY_LEVELS = [1, 8, 32, 64]
+
+chunks = [
+    f"Chunk {i}: the city breathes in rhythm with a million heartbeats, "
+    f"each person carrying dreams and deadlines in equal measure."
+    for i in range(NUM_CHUNKS)
+]
+
+llm = FakeLatencyChatModel(
+    latency=LATENCY_SECONDS,
+    jitter=JITTER_SECONDS,
+    failure_rate=FAILURE_RATE,
+    seed=42,
+)
+
+map_prompt = PromptTemplate.from_template("Write a concise summary of the following text:\n{context}")
+map_chain = map_prompt | llm | StrOutputParser()
+
+def sequential_map(texts: list[str]) -> list[str]:
+    """Baseline: the original `for part in parts` loop (with a naive retry so it can finish)"""
+    summaries = []
+    for text in texts:
+        while True:
+            try:
+                summaries.append(map_chain.invoke({"context": text}))
+                break
+            except Exception:
+                continue
+    return summaries
+
+print(f"=== MAP STAGE BENCHMARK: {NUM_CHUNKS} chunks, ~{LATENCY_SECONDS * 1000:.0f}ms per call ===\n")
+
+start = time.perf_counter()
+baseline = sequential_map(chunks)
+baseline_seconds = time.perf_counter() - start
+print(f"{'sequential loop':<22} {baseline_seconds:7.2f}s  {NUM_CHUNKS / baseline_seconds:8.1f} chunks/s")
+
+for concurrency in CONCURRENCY_LEVELS:
+    start = time.perf_counter()
+    try:
+        summaries = map_summaries(map_chain, chunks, max_concurrency=concurrency,
+                                  max_retries=MAX_RETRIES, retry_delay=0.01)
+    except ChunkSummaryError as e:
+        print(f"{f'batch (max={concurrency})':<22} failed: {e}")
+        continue
+    elapsed = time.perf_counter() - start
+
+    assert summaries == baseline, "map_summaries must keep the chunk order"
+    print(
+        f"{f'batch (max={concurrency})':<22} {elapsed:7.2f}s  {NUM_CHUNKS / elapsed:8.1f} chunks/s"
+        f"  speedup {baseline_seconds / elapsed:5.1f}x"
+    )
@@ -0,0 +1,77 @@
+from langchain_core.prompts import PromptTemplate
+from langchain_core.output_parsers import StrOutputParser
+from dotenv import load_dotenv
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from utils.model_factory import get_chat_model
+from utils.streaming_splitter import StreamingRecursiveCharacterTextSplitter, read_text_blocks
+from utils.summarization import stream_map_summaries, collapse_summaries
+
+load_dotenv()
+
+# Usage: python 9-sumarizacao-streaming.py [path/to/large-file.txt]
+# Without a path, the poem below is streamed line by line to simulate a lazy source.
+long_text = """Dawn threads a pale gold through the alley of glass.
+The city yawns in a chorus of brakes and distant sirens.
+Windows blink awake, one by one, like sleepy eyes.
+Streetcloth of steam curls from manholes, a quiet river.
+Coffee steam spirals above a newspaper's pale print.
+Pedestrians sketch light on sidewalks, hurried, loud with umbrellas.
+Buses swallow the morning with their loud yawns.
+A sparrow perches on a steel beam, surveying the grid.
+The subway sighs somewhere underground, a heartbeat rising.
+Neon still glows in the corners where night refused to retire.
+A cyclist cuts through the chorus, bright with chrome and momentum.
+The city clears its throat, the air turning a little less electric.
+Shoes hiss on concrete, a thousand small verbs of arriving.
+Dawn keeps its promises in the quiet rhythm of a waking metropolis.
+The morning light cascades through towering windows of steel and glass,
+casting geometric shadows on busy streets below.
+Traffic flows like rivers of metal and light,
+while pedestrians weave through crosswalks with purpose.
+Coffee shops exhale warmth and the aroma of fresh bread,
+as commuters clutch their cups like talismans against the cold.
+Street vendors call out in a symphony of languages,
+their voices mixing with the distant hum of construction.
+Pigeons dance between the feet of hurried workers,
+finding crumbs of breakfast pastries on concrete sidewalks.
+The city breathes in rhythm with a million heartbeats,
+each person carrying dreams and deadlines in equal measure.
+Skyscrapers reach toward clouds that drift like cotton,
+while far below, subway trains rumble through tunnels.
+This urban orchestra plays from dawn until dusk,
+a endless song of ambition, struggle, and hope."""
+
+if len(sys.argv) > 1:
+    blocks = read_text_blocks(sys.argv[1])
+else:
+    blocks = (line for line in long_text.splitlines(keepends=True))
+
+# Same chunk_size/chunk_overlap as 7-pipeline-de-sumarizacao.py: the chunk boundaries are identical,
+# but chunks are produced lazily while the source is being read
+splitter = StreamingRecursiveCharacterTextSplitter(chunk_size=300, chunk_overlap=50)
+chunks = splitter.split_stream(blocks)
+
+llm = get_chat_model("gpt-4o", temperature=0)
+
+map_prompt = PromptTemplate.from_template("Write a concise summary of the following text:\n{context}")
+map_chain = map_prompt | llm | StrOutputParser()
+
+reduce_prompt = PromptTemplate.from_template("Combine the following summaries into a single concise summary:\n{context}")
+reduce_chain = reduce_prompt | llm | StrOutputParser()
+
+# Each chunk goes to the map stage as soon as the splitter yields it
+start = time.perf_counter()
+summaries = []
+for index, summary in enumerate(stream_map_summaries(map_chain, chunks, max_concurrency=8)):
+    print(f"[{time.perf_counter() - start:6.2f}s] chunk {index}: {summary}")
+    summaries.append(summary)
+
+result, levels = collapse_summaries(reduce_chain, summaries, token_max=3000, length_function=llm.get_num_tokens)
+
+for level in levels:
+    print(f"Reduce level {level.depth}: {level.inputs} summaries -> {level.groups} group(s)")
+print(result)
@@ -1,10 +1,12 @@
 from langchain.tools import tool
-from langchain_openai import ChatOpenAI
 from langchain.agents import create_react_agent, AgentExecutor
 from langchain.prompts import PromptTemplate
 from dotenv import load_dotenv
-from pydantic import SecretStr
 import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from utils.model_factory import configure_rate_limits, get_chat_model
 
 load_dotenv()
 
@@ -34,12 +36,9 @@ def web_search_mock(query: str) -> str:
       return f"The capital of {country} is {capital}."
   return "I don't know the capital of that country."
 
-llm = ChatOpenAI(
-    model="gpt-4o", 
-    disable_streaming=True,
-    base_url=os.environ["GITHUB_MODELS_ENDPOINT"],
-    api_key=SecretStr(os.environ["GITHUB_MODELS_TOKEN"])
-)
+# Each agent step is a model call: throttle them like every other chain
+configure_rate_limits(requests_per_minute=15)
+llm = get_chat_model("gpt-4o", disable_streaming=True)
 
 tools = [calculator, web_search_mock]
 
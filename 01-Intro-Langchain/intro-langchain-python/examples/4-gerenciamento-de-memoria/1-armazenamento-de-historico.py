@@ -1,10 +1,12 @@
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.chat_history import InMemoryChatMessageHistory
 from langchain_core.runnables import RunnableConfig, RunnableWithMessageHistory
 from dotenv import load_dotenv
-from pydantic import SecretStr
 import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from utils.model_factory import get_chat_model
+from utils.session_store import BoundedSessionStore
 
 load_dotenv()
 
@@ -14,25 +16,22 @@ prompt = ChatPromptTemplate.from_messages([
     ("human", "{input}"),
 ])
 
-chat_model = ChatOpenAI(
-    model="gpt-4o", 
-    temperature=0.9,
-    base_url=os.environ["GITHUB_MODELS_ENDPOINT"],
-    api_key=SecretStr(os.environ["GITHUB_MODELS_TOKEN"])
-)
+chat_model = get_chat_model("gpt-4o", temperature=0.9)
 
 chain = prompt | chat_model
 
-session_store: dict[str, InMemoryChatMessageHistory] = {}
-
-def get_session_history(session_id: str) -> InMemoryChatMessageHistory:
-  if session_id not in session_store:
-    session_store[session_id] = InMemoryChatMessageHistory()
-  return session_store[session_id]
+# Idle sessions leave memory (LRU/TTL, hard caps) but every message is written through
+# to SQLite, so a session survives eviction and restarts and is loaded back on demand
+session_store = BoundedSessionStore(
+    path="chat_sessions.sqlite",
+    max_sessions=10_000,
+    max_bytes=64 * 1024 * 1024,
+    ttl_seconds=30 * 60,
+)
 
 conversational_chain = RunnableWithMessageHistory(
     chain,
-    get_session_history,
+    session_store.get_session_history,
     input_messages_key="input",
     history_messages_key="history",
 )
@@ -1,12 +1,12 @@
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.chat_history import InMemoryChatMessageHistory
 from langchain_core.runnables import RunnableConfig, RunnableWithMessageHistory
-from langchain_core.messages import trim_messages
-from langchain_core.runnables import RunnableLambda
 from dotenv import load_dotenv
-from pydantic import SecretStr
 import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from utils.model_factory import get_chat_model
+from utils.windowed_history import TokenWindowChatMessageHistory
 
 load_dotenv()
 
@@ -16,35 +16,19 @@ prompt = ChatPromptTemplate.from_messages([
     ("human", "{input}"),
 ])
 
-chat_model = ChatOpenAI(
-    model="gpt-4o", 
-    temperature=0.9,
-    base_url=os.environ["GITHUB_MODELS_ENDPOINT"],
-    api_key=SecretStr(os.environ["GITHUB_MODELS_TOKEN"])
-)
+chat_model = get_chat_model("gpt-4o", temperature=0.9)
 
-def prepare_inputs(payload: dict) -> dict:
-  raw_history = payload.get("raw_history", [])
-  trimmed = trim_messages(
-    raw_history,
-    token_counter=len,
-    max_tokens=2,
-    strategy="last",
-    start_on="human",
-    include_system=True,
-    allow_partial=False
-  )
-  
-  return { "input": payload.get("input", ""), "history": trimmed }
+chain = prompt | chat_model
 
-prepare = RunnableLambda(prepare_inputs)
-chain = prepare | prompt | chat_model
+# The window is trimmed to a real token budget as messages are added: each message is
+# tokenized once and the oldest turns are dropped, so the history is never re-scanned
+MAX_HISTORY_TOKENS = 60
 
-session_store: dict[str, InMemoryChatMessageHistory] = {}
+session_store: dict[str, TokenWindowChatMessageHistory] = {}
 
-def get_session_history(session_id: str) -> InMemoryChatMessageHistory:
+def get_session_history(session_id: str) -> TokenWindowChatMessageHistory:
   if session_id not in session_store:
-    session_store[session_id] = InMemoryChatMessageHistory()
+    session_store[session_id] = TokenWindowChatMessageHistory(max_tokens=MAX_HISTORY_TOKENS)
   return session_store[session_id]
 
 conversational_chain = RunnableWithMessageHistory(
@@ -65,3 +49,6 @@ print("Assistant:", resp2.content)
 resp3 = conversational_chain.invoke({"input": "What is my name?"}, config=config)
 print("Assistant:", resp3.content)
 
+history = get_session_history("demo-session")
+print(f"History window: {len(history.messages)} messages, {history.total_tokens}/{MAX_HISTORY_TOKENS} tokens")
+
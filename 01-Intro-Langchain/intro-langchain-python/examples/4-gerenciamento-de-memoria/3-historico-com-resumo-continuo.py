@@ -0,0 +1,62 @@
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.runnables import RunnableConfig, RunnableWithMessageHistory
+from dotenv import load_dotenv
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from utils.model_factory import get_chat_model
+from utils.rolling_summary import RollingSummarizer, RollingSummaryChatMessageHistory
+
+load_dotenv()
+
+prompt = ChatPromptTemplate.from_messages([
+    ("system", "You are a helpful assistant."),
+    MessagesPlaceholder(variable_name="history"),
+    ("human", "{input}"),
+])
+
+chat_model = get_chat_model("gpt-4o", temperature=0.9)
+
+summary_model = get_chat_model("gpt-4o-mini", temperature=0)
+
+chain = prompt | chat_model
+
+# Same 60-token window as the sliding-window example, but the turns that leave it are
+# folded into a summary by a background worker instead of being forgotten
+MAX_HISTORY_TOKENS = 60
+summarizer = RollingSummarizer(summary_model, max_workers=4)
+
+session_store: dict[str, RollingSummaryChatMessageHistory] = {}
+
+def get_session_history(session_id: str) -> RollingSummaryChatMessageHistory:
+  if session_id not in session_store:
+    session_store[session_id] = RollingSummaryChatMessageHistory(summarizer, max_tokens=MAX_HISTORY_TOKENS)
+  return session_store[session_id]
+
+conversational_chain = RunnableWithMessageHistory(
+  chain,
+  get_session_history,
+  input_messages_key="input",
+  history_messages_key="history",
+)
+
+config: RunnableConfig = {"configurable": {"session_id": "demo-session"}}
+
+def ask(question: str):
+  start = time.perf_counter()
+  response = conversational_chain.invoke({"input": question}, config=config)
+  print(f"Assistant ({time.perf_counter() - start:.2f}s):", response.content)
+
+ask("My name is Glaucia. Reply only with 'OK' and do not mention my name.")
+ask("Tell me a one-sentence fun fact. Do not mention my name.")
+
+# Only for the demo: in a real chat the user's think time covers the background summary
+history = get_session_history("demo-session")
+summary = history.wait_for_summary()
+print(f"Summary v{summary.version} ({summary.messages_folded} messages folded): {summary.text}")
+
+ask("What is my name?")
+
+summarizer.shutdown()
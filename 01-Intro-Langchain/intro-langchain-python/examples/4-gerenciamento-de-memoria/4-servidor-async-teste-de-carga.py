@@ -0,0 +1,70 @@
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.runnables import RunnableWithMessageHistory
+import asyncio
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from utils.fake_chat_model import FakeLatencyChatModel
+from utils.windowed_history import TokenWindowChatMessageHistory
+from utils.chat_server import AsyncChatServer
+
+# Load test settings (no API key needed: the model is a local fake with configurable latency)
+NUM_SESSIONS = 2000
+TURNS_PER_SESSION = 3
+LATENCY_SECONDS = 0.2
+JITTER_SECONDS = 0.05
+WORKERS = 500
+MAX_QUEUE = 1000
+
+prompt = ChatPromptTemplate.from_messages([
+    ("system", "You are a helpful assistant."),
+    MessagesPlaceholder(variable_name="history"),
+    ("human", "{input}"),
+])
+
+chat_model = FakeLatencyChatModel(latency=LATENCY_SECONDS, jitter=JITTER_SECONDS, seed=42)
+
+session_store: dict[str, TokenWindowChatMessageHistory] = {}
+
+def get_session_history(session_id: str) -> TokenWindowChatMessageHistory:
+  if session_id not in session_store:
+    session_store[session_id] = TokenWindowChatMessageHistory(max_tokens=500)
+  return session_store[session_id]
+
+conversational_chain = RunnableWithMessageHistory(
+  prompt | chat_model,
+  get_session_history,
+  input_messages_key="input",
+  history_messages_key="history",
+)
+
+async def simulated_user(server: AsyncChatServer, session_id: str) -> None:
+  # A user waits for each answer before sending the next message
+  for turn in range(TURNS_PER_SESSION):
+    await server.submit(session_id, f"{session_id} turn {turn}: tell me something new")
+
+async def main():
+  # submit() waits when the queue is full: that is the backpressure on the simulated users
+  async with AsyncChatServer(conversational_chain, workers=WORKERS, max_queue=MAX_QUEUE) as server:
+    start = time.perf_counter()
+    await asyncio.gather(*(simulated_user(server, f"session-{i}") for i in range(NUM_SESSIONS)))
+    elapsed = time.perf_counter() - start
+
+  # Turns of each session must be stored in order
+  for session_id, history in session_store.items():
+    human_turns = [m.content for m in history.messages if m.type == "human"]
+    assert human_turns == sorted(human_turns), session_id
+
+  stats = server.stats
+  print(f"=== LOAD TEST: {NUM_SESSIONS} sessions x {TURNS_PER_SESSION} turns, ~{LATENCY_SECONDS * 1000:.0f}ms per call ===\n")
+  print(f"Completed: {stats.completed} | failed: {stats.failed} | wall time: {elapsed:.2f}s")
+  print(f"Throughput: {stats.completed / elapsed:.1f} turns/s")
+  print(f"Latency p50: {stats.percentile(50) * 1000:.0f}ms | p99: {stats.percentile(99) * 1000:.0f}ms")
+  print(
+    f"  of which queue wait p50: {stats.queue_wait_percentile(50) * 1000:.0f}ms"
+    f" | p99: {stats.queue_wait_percentile(99) * 1000:.0f}ms"
+  )
+
+asyncio.run(main())
@@ -0,0 +1,16 @@
+"""
+Utilitários compartilhados pelos exemplos de LangChain
+"""
+
+from .fake_chat_model import *
+from .summarization import *
+from .streaming_splitter import *
+from .summary_cache import *
+from .incremental import *
+from .session_store import *
+from .windowed_history import *
+from .rolling_summary import *
+from .chat_server import *
+from .stub_llm_server import *
+
+# model_factory e rate_limit são importados explicitamente (carregam httpx e langchain_openai)
@@ -0,0 +1,192 @@
+"""
+Servidor assíncrono de chat: sessões em paralelo, turnos ordenados por sessão e fila limitada
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from langchain_core.runnables import Runnable
+
+
+class ServerOverloadedError(RuntimeError):
+    """Raised by `try_submit` when the request queue is full"""
+
+
+@dataclass
+class _Request:
+    session_id: str
+    payload: Dict[str, Any]
+    stream: bool
+    submitted: float
+    future: "asyncio.Future[Any]"
+    chunks: Optional["asyncio.Queue[Any]"] = None
+
+
+@dataclass
+class ServerStats:
+    completed: int = 0
+    failed: int = 0
+    rejected: int = 0
+    latencies: List[float] = field(default_factory=list)
+    queue_waits: List[float] = field(default_factory=list)
+
+    @staticmethod
+    def _percentile(values: List[float], p: float) -> float:
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+    def percentile(self, p: float) -> float:
+        """End-to-end latency percentile (0-100) over completed requests, queue wait included"""
+        return self._percentile(self.latencies, p)
+
+    def queue_wait_percentile(self, p: float) -> float:
+        return self._percentile(self.queue_waits, p)
+
+
+class _SessionLock:
+    """asyncio.Lock with a reference count, so idle sessions do not keep a lock around"""
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
+class AsyncChatServer:
+    """
+    asyncio serving entry point for a `RunnableWithMessageHistory` chain.
+
+    Requests go through a bounded queue (`submit` waits when it is full, `try_submit`
+    fails fast) and are served by `workers` tasks with `ainvoke`/`astream`. A per-session
+    lock, taken in queue order, keeps the turns of one session ordered while different
+    sessions run fully in parallel.
+    """
+
+    def __init__(
+        self,
+        chain: Runnable,
+        workers: int = 64,
+        max_queue: int = 1000,
+        input_key: str = "input",
+        session_config_key: str = "session_id",
+    ):
+        self.chain = chain
+        self.workers = workers
+        self.max_queue = max_queue
+        self.input_key = input_key
+        self.session_config_key = session_config_key
+        self.stats = ServerStats()
+        self._queue: Optional["asyncio.Queue[_Request]"] = None
+        self._tasks: List[asyncio.Task] = []
+        self._locks: Dict[str, _SessionLock] = {}
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Finish the queued requests, then stop the workers"""
+        if self._queue is not None:
+            await self._queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def __aenter__(self) -> "AsyncChatServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.stop()
+
+    @property
+    def queue_size(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def _new_request(self, session_id: str, text: str, stream: bool) -> _Request:
+        if self._queue is None:
+            raise RuntimeError("Server not started: call start() or use 'async with'")
+        loop = asyncio.get_running_loop()
+        return _Request(
+            session_id=session_id,
+            payload={self.input_key: text},
+            stream=stream,
+            submitted=time.perf_counter(),
+            future=loop.create_future(),
+            chunks=asyncio.Queue() if stream else None,
+        )
+
+    async def submit(self, session_id: str, text: str) -> Any:
+        """Queue a turn (waiting for room if the queue is full) and return the answer"""
+        request = self._new_request(session_id, text, stream=False)
+        await self._queue.put(request)  # type: ignore[union-attr]
+        return await request.future
+
+    async def try_submit(self, session_id: str, text: str) -> Any:
+        """Like `submit`, but raise ServerOverloadedError instead of waiting for room"""
+        request = self._new_request(session_id, text, stream=False)
+        try:
+            self._queue.put_nowait(request)  # type: ignore[union-attr]
+        except asyncio.QueueFull:
+            self.stats.rejected += 1
+            raise ServerOverloadedError(f"Request queue full ({self.max_queue})") from None
+        return await request.future
+
+    async def stream(self, session_id: str, text: str) -> AsyncIterator[Any]:
+        """Queue a turn and yield the answer chunks as the model produces them"""
+        request = self._new_request(session_id, text, stream=True)
+        await self._queue.put(request)  # type: ignore[union-attr]
+        assert request.chunks is not None
+        while True:
+            getter = asyncio.ensure_future(request.chunks.get())
+            done, _ = await asyncio.wait({getter, request.future}, return_when=asyncio.FIRST_COMPLETED)
+            if getter in done:
+                yield getter.result()
+                continue
+            getter.cancel()
+            while not request.chunks.empty():
+                yield request.chunks.get_nowait()
+            request.future.result()  # re-raise a failure of the turn
+            return
+
+    async def _worker(self) -> None:
+        assert self._queue is not None
+        while True:
+            request = await self._queue.get()
+            try:
+                await self._serve(request)
+            finally:
+                self._queue.task_done()
+
+    async def _serve(self, request: _Request) -> None:
+        # Taken right after dequeuing (no await in between), so the lock is acquired in queue order
+        entry = self._locks.setdefault(request.session_id, _SessionLock())
+        entry.users += 1
+        try:
+            async with entry.lock:
+                self.stats.queue_waits.append(time.perf_counter() - request.submitted)
+                config = {"configurable": {self.session_config_key: request.session_id}}
+                if request.stream:
+                    assert request.chunks is not None
+                    async for chunk in self.chain.astream(request.payload, config=config):
+                        request.chunks.put_nowait(chunk)
+                    result = None
+                else:
+                    result = await self.chain.ainvoke(request.payload, config=config)
+        except Exception as error:
+            self.stats.failed += 1
+            if not request.future.done():
+                request.future.set_exception(error)
+        else:
+            self.stats.completed += 1
+            self.stats.latencies.append(time.perf_counter() - request.submitted)
+            if not request.future.done():
+                request.future.set_result(result)
+        finally:
+            entry.users -= 1
+            if entry.users == 0:
+                del self._locks[request.session_id]
@@ -0,0 +1,161 @@
+"""
+Chat model local e determinístico para benchmarks e testes sem chamar a API
+"""
+
+import asyncio
+import random
+import time
+from typing import Any, AsyncIterator, Callable, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+
+class FakeTransientError(RuntimeError):
+    """Simulated transient failure (timeout, 5xx) raised by FakeLatencyChatModel"""
+
+
+def _count_tokens(text: str) -> int:
+    # Rough word-based approximation, good enough for benchmarks
+    return len(text.split())
+
+
+class FakeLatencyChatModel(BaseChatModel):
+    """
+    Chat model that sleeps for a configurable latency and answers deterministically.
+
+    By default the answer is the first `max_words` words of the last message, which
+    behaves like a (very naive) summarizer. Pass `responder` to customize it.
+    `latency_per_token` adds a delay proportional to the answer length (decoding time);
+    when streaming, `latency` is the time to the first token and each following word
+    takes `latency_per_token`.
+    """
+
+    latency: float = 0.5
+    latency_per_token: float = 0.0
+    jitter: float = 0.0
+    failure_rate: float = 0.0
+    max_words: int = 20
+    seed: Optional[int] = None
+    model_name: str = "fake-latency"
+    responder: Optional[Callable[[str], str]] = None
+
+    _rng: random.Random = PrivateAttr(default_factory=random.Random)
+
+    def model_post_init(self, __context: Any) -> None:
+        self._rng = random.Random(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-latency-chat-model"
+
+    def _delay(self, result: ChatResult) -> float:
+        completion_tokens = result.generations[0].message.usage_metadata["output_tokens"]
+        delay = self.latency + self.latency_per_token * completion_tokens
+        return max(0.0, delay + self._rng.uniform(-self.jitter, self.jitter))
+
+    def _first_token_delay(self) -> float:
+        return max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+
+    def _maybe_fail(self) -> None:
+        if self.failure_rate and self._rng.random() < self.failure_rate:
+            raise FakeTransientError("Simulated transient failure")
+
+    def _respond(self, messages: List[BaseMessage]) -> ChatResult:
+        prompt = str(messages[-1].content) if messages else ""
+        if self.responder is not None:
+            content = self.responder(prompt)
+        else:
+            content = " ".join(prompt.split()[: self.max_words])
+
+        prompt_tokens = sum(_count_tokens(str(m.content)) for m in messages)
+        completion_tokens = _count_tokens(content)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        message = AIMessage(
+            content=content,
+            response_metadata={"token_usage": usage, "model_name": self.model_name},
+            usage_metadata={
+                "input_tokens": prompt_tokens,
+                "output_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        result = self._respond(messages)
+        time.sleep(self._delay(result))
+        self._maybe_fail()
+        return result
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        result = self._respond(messages)
+        await asyncio.sleep(self._delay(result))
+        self._maybe_fail()
+        return result
+
+    @staticmethod
+    def _chunks(result: ChatResult) -> List[ChatGenerationChunk]:
+        message = result.generations[0].message
+        words = str(message.content).split(" ")
+        chunks = [ChatGenerationChunk(message=AIMessageChunk(content=word if i == 0 else f" {word}"))
+                  for i, word in enumerate(words)]
+        # Usage arrives with the last chunk, like OpenAI with stream_usage=True
+        chunks.append(ChatGenerationChunk(message=AIMessageChunk(
+            content="",
+            response_metadata=message.response_metadata,
+            usage_metadata=message.usage_metadata,
+        )))
+        return chunks
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        chunks = self._chunks(self._respond(messages))
+        time.sleep(self._first_token_delay())
+        self._maybe_fail()
+        for i, chunk in enumerate(chunks):
+            if 0 < i < len(chunks) - 1:
+                time.sleep(self.latency_per_token)
+            if run_manager:
+                run_manager.on_llm_new_token(str(chunk.message.content), chunk=chunk)
+            yield chunk
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        chunks = self._chunks(self._respond(messages))
+        await asyncio.sleep(self._first_token_delay())
+        self._maybe_fail()
+        for i, chunk in enumerate(chunks):
+            if 0 < i < len(chunks) - 1:
+                await asyncio.sleep(self.latency_per_token)
+            if run_manager:
+                await run_manager.on_llm_new_token(str(chunk.message.content), chunk=chunk)
+            yield chunk
@@ -0,0 +1,186 @@
+"""
+Re-sumarização incremental: só refaz o map e os ramos do reduce afetados pelo diff
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables import Runnable, RunnableConfig
+
+from .summarization import approximate_token_count, map_summaries
+
+
+def _hash(payload: str) -> str:
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def summary_fingerprint(context: Dict[str, Any]) -> str:
+    """Hash of what changes every summary of a run (prompt templates, model name, temperature)"""
+    return _hash(json.dumps(context, sort_keys=True, ensure_ascii=False))
+
+
+@dataclass
+class SummaryManifest:
+    """Chunk and reduce-node summaries of a previous run, keyed by content hash"""
+    chunks: Dict[str, str] = field(default_factory=dict)
+    nodes: Dict[str, str] = field(default_factory=dict)
+    fingerprint: Optional[str] = None
+
+    @classmethod
+    def load(cls, path: str) -> "SummaryManifest":
+        if not os.path.exists(path):
+            return cls()
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(chunks=data.get("chunks", {}), nodes=data.get("nodes", {}), fingerprint=data.get("fingerprint"))
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"fingerprint": self.fingerprint, "chunks": self.chunks, "nodes": self.nodes},
+                      f, ensure_ascii=False, indent=2)
+
+
+@dataclass
+class IncrementalResult:
+    """Final summary, the manifest for the next run and how much work was reused"""
+    summary: str
+    manifest: SummaryManifest
+    chunks_mapped: int = 0
+    chunks_reused: int = 0
+    chunks_removed: int = 0
+    nodes_reduced: int = 0
+    nodes_reused: int = 0
+    manifest_discarded: bool = False
+
+
+def _stable_groups(
+    items: Sequence[Tuple[str, str]],
+    token_max: int,
+    length_function: Callable[[str], int],
+    fanout: int,
+) -> List[List[Tuple[str, str]]]:
+    """
+    Group (key, summary) pairs with content-defined boundaries.
+
+    A group ends after an item whose hash is divisible by `fanout` (or when the token
+    budget is reached), so an edit only changes the groups around it instead of
+    shifting every group after it.
+    """
+    groups: List[List[Tuple[str, str]]] = []
+    current: List[Tuple[str, str]] = []
+    current_tokens = 0
+    for key, summary in items:
+        tokens = length_function(summary)
+        if current and current_tokens + tokens > token_max:
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append((key, summary))
+        current_tokens += tokens
+        if len(current) >= 2 and int(key[:8], 16) % fanout == 0:
+            groups.append(current)
+            current, current_tokens = [], 0
+    if current:
+        groups.append(current)
+    return groups
+
+
+def incremental_summarize(
+    map_chain: Runnable,
+    reduce_chain: Runnable,
+    texts: Sequence[str],
+    manifest: Optional[SummaryManifest] = None,
+    token_max: int = 3000,
+    length_function: Callable[[str], int] = approximate_token_count,
+    fanout: int = 4,
+    max_concurrency: int = 8,
+    max_depth: int = 10,
+    input_key: str = "context",
+    context: Optional[Dict[str, Any]] = None,
+) -> IncrementalResult:
+    """
+    Summarize `texts`, reusing every chunk and reduce node that did not change.
+
+    Chunks are identified by the hash of their text and reduce nodes by the hash of
+    their children, so only added/changed chunks are mapped and only the branches of
+    the reduce tree above them are reduced again. The manifest records a fingerprint
+    of `context`; a manifest written with other prompts or another model is discarded
+    and everything is summarized again.
+
+    Args:
+        map_chain: Runnable that summarizes one chunk
+        reduce_chain: Runnable that combines summaries
+        texts: Chunk contents, in document order
+        manifest: Manifest of the previous run (None for a full run)
+        token_max: Token budget for a single reduce call
+        length_function: Token counter (e.g. `llm.get_num_tokens`)
+        fanout: Average number of children per reduce node
+        max_concurrency: Maximum number of in-flight LLM calls
+        max_depth: Safety limit for the number of reduce levels
+        input_key: Prompt variable used by both chains
+        context: Map/reduce prompt templates, model name and temperature (required
+            when a manifest is given)
+
+    Returns:
+        IncrementalResult with the summary and the manifest to save for the next run
+    """
+    if manifest is not None and context is None:
+        raise ValueError("context (prompt templates, model_name, temperature) is required when a manifest is given")
+    fingerprint = summary_fingerprint(context) if context is not None else None
+    previous = manifest or SummaryManifest()
+    current = SummaryManifest(fingerprint=fingerprint)
+    result = IncrementalResult(summary="", manifest=current)
+    if previous.fingerprint != fingerprint and (previous.chunks or previous.nodes):
+        # Summaries written by other prompts or another model are stale
+        previous = SummaryManifest()
+        result.manifest_discarded = True
+
+    # Map stage: only chunks whose hash is not in the manifest
+    keys = [_hash(text) for text in texts]
+    missing = list(dict.fromkeys(key for key in keys if key not in previous.chunks))
+    texts_by_key = dict(zip(keys, texts))
+    new_summaries = map_summaries(
+        map_chain, [texts_by_key[key] for key in missing], max_concurrency=max_concurrency, input_key=input_key
+    )
+    current.chunks = {key: previous.chunks[key] for key in keys if key in previous.chunks}
+    current.chunks.update(zip(missing, new_summaries))
+
+    result.chunks_mapped = len(missing)
+    result.chunks_reused = len(set(keys)) - len(missing)
+    result.chunks_removed = len(set(previous.chunks) - set(keys))
+
+    config: RunnableConfig = {"max_concurrency": max_concurrency}
+
+    def reduce_level(groups: List[List[Tuple[str, str]]]) -> List[Tuple[str, str]]:
+        node_keys = [_hash(json.dumps([key for key, _ in group])) for group in groups]
+        todo = [i for i, key in enumerate(node_keys) if key not in previous.nodes]
+        outputs = reduce_chain.batch(
+            [{input_key: "\n".join(summary for _, summary in groups[i])} for i in todo], config=config
+        ) if todo else []
+        reduced = dict(zip(todo, outputs))
+
+        level = []
+        for i, key in enumerate(node_keys):
+            summary = reduced[i] if i in reduced else previous.nodes[key]
+            current.nodes[key] = summary
+            level.append((key, summary))
+        result.nodes_reduced += len(todo)
+        result.nodes_reused += len(node_keys) - len(todo)
+        return level
+
+    # Reduce stage: same tree shape as long as the content around a node is unchanged
+    items = [(key, current.chunks[key]) for key in keys]
+    if not items:
+        return result
+
+    depth = 0
+    while len(items) > 1 and length_function("\n".join(summary for _, summary in items)) > token_max:
+        if depth >= max_depth:
+            raise ValueError(f"Summaries did not fit {token_max} tokens after {max_depth} reduce levels")
+        items = reduce_level(_stable_groups(items, token_max, length_function, fanout))
+        depth += 1
+
+    [(_, result.summary)] = reduce_level([items])
+    return result
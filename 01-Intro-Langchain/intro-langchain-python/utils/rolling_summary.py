@@ -0,0 +1,134 @@
+"""
+Memória com resumo contínuo: turnos que saem da janela são resumidos em segundo plano
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional
+
+from langchain_core.messages import BaseMessage, SystemMessage, get_buffer_string
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import PromptTemplate
+
+from .windowed_history import TokenWindowChatMessageHistory
+
+DEFAULT_SUMMARY_PROMPT = PromptTemplate.from_template(
+    """Progressively summarize the conversation, adding to the previous summary and returning a new summary.
+Keep names, facts and preferences the user shared. Reply only with the new summary.
+
+Current summary:
+{summary}
+
+New lines of conversation:
+{new_lines}
+
+New summary:"""
+)
+
+
+@dataclass(frozen=True)
+class SessionSummary:
+    """Immutable snapshot of a session summary; replaced as a whole on every update"""
+    version: int = 0
+    text: str = ""
+    messages_folded: int = 0
+
+
+class RollingSummarizer:
+    """
+    Background worker pool that folds evicted turns into session summaries.
+
+    Each session has at most one job in flight; turns evicted while it runs are
+    queued and folded by the same job, so summaries are built in order.
+    """
+
+    def __init__(self, model: Any, prompt: PromptTemplate = DEFAULT_SUMMARY_PROMPT, max_workers: int = 4):
+        self.chain = prompt | model | StrOutputParser()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="rolling-summary")
+
+    def submit(self, fn: Callable[[], None]) -> Future:
+        return self._executor.submit(fn)
+
+    def summarize(self, summary: str, messages: List[BaseMessage]) -> str:
+        return self.chain.invoke({"summary": summary or "(empty)", "new_lines": get_buffer_string(messages)})
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+class RollingSummaryChatMessageHistory(TokenWindowChatMessageHistory):
+    """
+    Token window whose evicted turns are compressed into a running summary.
+
+    Eviction only queues the messages; a `RollingSummarizer` worker calls the model
+    off the request path and swaps in a new `SessionSummary` (version + 1) under a
+    lock, so readers see either the old or the new summary, never a partial one. The
+    summary is exposed as a system message in front of the window.
+    """
+
+    def __init__(self, summarizer: RollingSummarizer, max_tokens: int = 1000,
+                 token_counter: Optional[Callable[[BaseMessage], int]] = None):
+        super().__init__(max_tokens=max_tokens, token_counter=token_counter, on_evict=self._queue_evicted)
+        self.summarizer = summarizer
+        self.summary = SessionSummary()
+        self.last_error: Optional[BaseException] = None
+        self._lock = threading.Lock()
+        self._pending: List[BaseMessage] = []
+        self._job: Optional[Future] = None
+
+    @property
+    def messages(self) -> List[BaseMessage]:  # type: ignore[override]
+        summary = self.summary
+        window = super().messages
+        if not summary.text:
+            return window
+        return [SystemMessage(content=f"Summary of the earlier conversation:\n{summary.text}")] + window
+
+    def _queue_evicted(self, messages: List[BaseMessage]) -> None:
+        with self._lock:
+            self._pending.extend(messages)
+            if self._job is None:
+                self._job = self.summarizer.submit(self._fold_pending)
+
+    def _fold_pending(self) -> None:
+        while True:
+            with self._lock:
+                batch, base = self._pending, self.summary
+                self._pending = []
+                if not batch:
+                    self._job = None
+                    return
+            try:
+                text = self.summarizer.summarize(base.text, batch)
+            except Exception as error:
+                # Keep the turns for the next attempt instead of losing them
+                with self._lock:
+                    self.last_error = error
+                    self._pending = batch + self._pending
+                    self._job = None
+                return
+
+            with self._lock:
+                # Only apply on top of the summary this job started from (clear() resets it)
+                if self.summary is base:
+                    self.summary = SessionSummary(
+                        version=base.version + 1,
+                        text=text.strip(),
+                        messages_folded=base.messages_folded + len(batch),
+                    )
+
+    def wait_for_summary(self, timeout: Optional[float] = None) -> SessionSummary:
+        """Block until the queued turns are folded (useful in scripts and tests)"""
+        while True:
+            with self._lock:
+                job = self._job
+            if job is None:
+                return self.summary
+            job.result(timeout=timeout)
+
+    def clear(self) -> None:
+        with self._lock:
+            super().clear()
+            self._pending = []
+            self.summary = SessionSummary()
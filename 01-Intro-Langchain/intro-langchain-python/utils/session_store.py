@@ -0,0 +1,165 @@
+"""
+Armazenamento de sessões de chat com limite de memória (LRU/TTL) e persistência em SQLite
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+
+
+class PersistentChatMessageHistory(BaseChatMessageHistory):
+    """
+    Message history kept in memory and written through to a `BoundedSessionStore`.
+
+    Every `add_messages` call is persisted before returning, so dropping the object
+    from memory (eviction) or restarting the process never loses messages.
+    """
+
+    def __init__(self, session_id: str, store: "BoundedSessionStore", messages: Optional[List[BaseMessage]] = None):
+        self.session_id = session_id
+        self._store = store
+        self.messages: List[BaseMessage] = list(messages or [])
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        messages = list(messages)
+        self._store._append(self.session_id, messages)
+        self.messages.extend(messages)
+
+    def clear(self) -> None:
+        self._store._delete(self.session_id)
+        self.messages = []
+
+
+class BoundedSessionStore:
+    """
+    Drop-in replacement for a `dict[str, InMemoryChatMessageHistory]` session store.
+
+    Sessions are loaded lazily from SQLite on first access and kept in an LRU of
+    in-memory histories. Idle sessions older than `ttl_seconds`, and the least recently
+    used ones beyond `max_sessions` or `max_bytes` (estimated from the serialized
+    messages), are evicted from memory only; the next access loads them again.
+    Pass `store.get_session_history` to `RunnableWithMessageHistory`.
+    """
+
+    def __init__(
+        self,
+        path: str = "chat_sessions.sqlite",
+        max_sessions: int = 10_000,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl_seconds: Optional[float] = 30 * 60,
+    ):
+        self.path = path
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.loads = 0
+        self.hits = 0
+        self.evictions = 0
+        self.memory_bytes = 0
+
+        # session_id -> (history, last access); ordered from least to most recently used
+        self._sessions: "OrderedDict[str, Tuple[PersistentChatMessageHistory, float]]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS messages ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " session_id TEXT NOT NULL,"
+            " payload TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_session ON messages (session_id, id)")
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def get_session_history(self, session_id: str) -> PersistentChatMessageHistory:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None:
+                self.hits += 1
+                history = entry[0]
+                self._sessions[session_id] = (history, now)
+                self._sessions.move_to_end(session_id)
+            else:
+                history = self._load(session_id)
+                self._sessions[session_id] = (history, now)
+            self._evict(now, keep=session_id)
+            return history
+
+    def _load(self, session_id: str) -> PersistentChatMessageHistory:
+        rows = self._conn.execute(
+            "SELECT payload FROM messages WHERE session_id = ? ORDER BY id", (session_id,)
+        ).fetchall()
+        self.loads += 1
+        self._sizes[session_id] = sum(len(payload) for (payload,) in rows)
+        self.memory_bytes += self._sizes[session_id]
+        messages = messages_from_dict([json.loads(payload) for (payload,) in rows])
+        return PersistentChatMessageHistory(session_id, self, messages)
+
+    def _append(self, session_id: str, messages: List[BaseMessage]) -> None:
+        payloads = [json.dumps(message_to_dict(message), ensure_ascii=False) for message in messages]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO messages (session_id, payload) VALUES (?, ?)",
+                [(session_id, payload) for payload in payloads],
+            )
+            self._conn.commit()
+            if session_id in self._sessions:
+                added = sum(len(payload) for payload in payloads)
+                self._sizes[session_id] += added
+                self.memory_bytes += added
+                self._evict(time.monotonic(), keep=session_id)
+
+    def _delete(self, session_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            self._conn.commit()
+            if session_id in self._sessions:
+                self.memory_bytes -= self._sizes[session_id]
+                self._sizes[session_id] = 0
+
+    def _drop(self, session_id: str) -> None:
+        del self._sessions[session_id]
+        self.memory_bytes -= self._sizes.pop(session_id)
+        self.evictions += 1
+
+    def _evict(self, now: float, keep: Optional[str] = None) -> None:
+        # The LRU head is also the longest idle session, so TTL eviction stops at the first live one.
+        # `keep` (the session being used) is skipped wherever it sits, so the caps stay hard
+        for session_id, (_, last_access) in list(self._sessions.items()):
+            if session_id == keep:
+                continue
+            expired = self.ttl_seconds is not None and now - last_access > self.ttl_seconds
+            over_cap = len(self._sessions) > self.max_sessions or self.memory_bytes > self.max_bytes
+            if not (expired or over_cap):
+                break
+            self._drop(session_id)
+
+    def forget(self, session_id: str) -> None:
+        """Delete a session from memory and from disk"""
+        with self._lock:
+            self._conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            self._conn.commit()
+            if session_id in self._sessions:
+                self._drop(session_id)
+
+    def close(self) -> None:
+        with self._lock:
+            self._sessions.clear()
+            self._sizes.clear()
+            self.memory_bytes = 0
+            self._conn.close()
@@ -0,0 +1,190 @@
+"""
+Text splitter que lê o documento de forma incremental (arquivos maiores que a memória)
+"""
+
+import itertools
+import re
+from collections import deque
+from typing import Any, Deque, Iterable, Iterator, List, Optional, Tuple
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from langchain_text_splitters.character import _split_text_with_regex
+
+# Regex separators have no fixed length: rescan this much already-seen text for matches across blocks
+_REGEX_SCAN_OVERLAP = 256
+
+
+def read_text_blocks(path: str, block_size: int = 64 * 1024, encoding: str = "utf-8") -> Iterator[str]:
+    """Lazily read a text file in fixed-size blocks"""
+    with open(path, "r", encoding=encoding) as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            yield block
+
+
+class _SplitMerger:
+    """Incremental version of TextSplitter._merge_splits (same greedy rules, one split at a time)"""
+
+    def __init__(self, splitter: "StreamingRecursiveCharacterTextSplitter", separator: str):
+        self._splitter = splitter
+        self._separator = separator
+        self._separator_len = splitter._length_function(separator)
+        self._current: Deque[str] = deque()
+        self._total = 0
+
+    def push(self, split: str) -> List[str]:
+        splitter = self._splitter
+        docs = []
+        length = splitter._length_function(split)
+
+        if self._total + length + (self._separator_len if self._current else 0) > splitter._chunk_size:
+            if self._current:
+                doc = splitter._join_docs(list(self._current), self._separator)
+                if doc is not None:
+                    docs.append(doc)
+                # Keep only the tail that fits the chunk overlap
+                while self._total > splitter._chunk_overlap or (
+                    self._total + length + (self._separator_len if self._current else 0) > splitter._chunk_size
+                    and self._total > 0
+                ):
+                    self._total -= splitter._length_function(self._current[0]) + (
+                        self._separator_len if len(self._current) > 1 else 0
+                    )
+                    self._current.popleft()
+
+        self._current.append(split)
+        self._total += length + (self._separator_len if len(self._current) > 1 else 0)
+        return docs
+
+    def flush(self) -> List[str]:
+        doc = self._splitter._join_docs(list(self._current), self._separator)
+        self._current.clear()
+        self._total = 0
+        return [doc] if doc is not None else []
+
+
+class StreamingRecursiveCharacterTextSplitter(RecursiveCharacterTextSplitter):
+    """
+    RecursiveCharacterTextSplitter that consumes an iterator of text blocks.
+
+    Chunks are yielded as soon as they are complete and only the text after the last
+    separator is kept in memory. With literal separators the chunk boundaries are the
+    same as `split_text` over the whole text.
+
+    The eager splitter picks the first separator that appears anywhere in the text, so
+    the stream is buffered until the first separator (usually a paragraph break) shows
+    up. If it does not appear within `max_lookahead` characters (default: 4 chunks),
+    the best separator seen so far is used; boundaries then differ from the eager
+    splitter only if the preferred separator shows up later in the text.
+
+    Memory stays bounded by `max_lookahead` plus one block: when the text after the
+    last separator grows past `max_lookahead` (a paragraph longer than 4 chunks, or no
+    more paragraph breaks at all), it is cut at the last lower-level separator (line,
+    word) and split right away, or at a multiple of `chunk_size` characters when there
+    is none. Boundaries inside such a long paragraph may then differ slightly from the
+    eager splitter.
+    """
+
+    def __init__(self, max_lookahead: Optional[int] = None, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._max_lookahead = max_lookahead if max_lookahead is not None else 4 * self._chunk_size
+
+    def _pattern(self, separator: str) -> str:
+        return separator if self._is_separator_regex else re.escape(separator)
+
+    def _choose_separator(self, text: str) -> Optional[int]:
+        for i, separator in enumerate(self._separators):
+            if separator == "" or re.search(self._pattern(separator), text):
+                return i
+        return None
+
+    def _last_boundary(self, buffer: str, pattern: str, start: int = 0) -> Tuple[int, int]:
+        """
+        Last split boundary of `pattern` inside the buffer (0 if none), scanning from
+        `start`, and the end of the last match (where a later scan can resume without
+        landing inside a separator run)
+        """
+        cut, resume = 0, start
+        for match in re.compile(pattern).finditer(buffer, start):
+            position = match.end() if self._keep_separator == "end" else match.start()
+            if 0 < position < len(buffer):
+                cut = position
+            resume = match.end()
+        return cut, resume
+
+    def _fallback_cut(self, buffer: str, separators: List[str]) -> int:
+        """Where to cut an overlong top-level split: last lower-level separator, else a chunk_size multiple"""
+        for separator in separators:
+            if separator == "":
+                break
+            cut, _ = self._last_boundary(buffer, self._pattern(separator))
+            if cut:
+                return cut
+        return max(self._chunk_size, len(buffer) - len(buffer) % self._chunk_size)
+
+    def split_stream(self, blocks: Iterable[str]) -> Iterator[str]:
+        """Split an iterator of text blocks, yielding chunks in document order"""
+        blocks = iter(blocks)
+        buffer = ""
+        index: Optional[int] = None
+
+        for block in blocks:
+            buffer += block
+            index = self._choose_separator(buffer)
+            if index == 0 or len(buffer) >= self._max_lookahead:
+                break
+        else:
+            # The whole input fit in the lookahead window
+            yield from self.split_text(buffer)
+            return
+
+        if index is None:
+            index = len(self._separators) - 1
+        separator = self._separators[index]
+        new_separators = self._separators[index + 1:]
+        pattern = self._pattern(separator)
+        merger = _SplitMerger(self, "" if self._keep_separator else separator)
+
+        def process(text: str) -> Iterator[str]:
+            splits = _split_text_with_regex(text, pattern, keep_separator=self._keep_separator)
+            for split in splits:
+                if self._length_function(split) < self._chunk_size:
+                    yield from merger.push(split)
+                else:
+                    yield from merger.flush()
+                    if not new_separators:
+                        yield split
+                    else:
+                        yield from self._split_text(split, new_separators)
+
+        # A literal separator can straddle two blocks: rescan only its length - 1 of old text
+        overlap = _REGEX_SCAN_OVERLAP if self._is_separator_regex else max(len(separator) - 1, 0)
+        scanned = resume = 0
+
+        # Only the text after the last separator stays buffered between blocks
+        for block in itertools.chain([""], blocks):
+            buffer += block
+            if separator:
+                cut, resume = self._last_boundary(buffer, pattern, max(resume, scanned - overlap, 0))
+            else:
+                cut = len(buffer)
+            if cut:
+                yield from process(buffer[:cut])
+                buffer = buffer[cut:]
+                resume -= cut
+            if len(buffer) > self._max_lookahead:
+                # No top-level separator for a whole window: split what we have with the next ones
+                cut = self._fallback_cut(buffer, new_separators)
+                yield from merger.flush()
+                if new_separators:
+                    yield from self._split_text(buffer[:cut], new_separators)
+                else:
+                    yield buffer[:cut]
+                buffer = buffer[cut:]
+                resume = 0
+            scanned = len(buffer)
+
+        yield from process(buffer)
+        yield from merger.flush()
@@ -0,0 +1,148 @@
+"""
+Servidor HTTP local compatível com /chat/completions que injeta respostas 429 (para testes)
+"""
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+
+class StubLLMServer:
+    """
+    Local OpenAI-compatible chat completions endpoint with a simulated rate limit.
+
+    Requests beyond `max_concurrent` in flight, or beyond `requests_per_second`, get a
+    429 with `retry-after-ms`; `throttle_rate` injects extra random 429s. Answers echo
+    the first `max_words` words of the last message after `latency` seconds.
+    Point `base_url` (e.g. GITHUB_MODELS_ENDPOINT) at `server.base_url`.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 8,
+        requests_per_second: Optional[float] = None,
+        throttle_rate: float = 0.0,
+        latency: float = 0.1,
+        max_words: int = 20,
+        retry_after: float = 0.2,
+        seed: Optional[int] = None,
+        port: int = 0,
+    ):
+        self.max_concurrent = max_concurrent
+        self.requests_per_second = requests_per_second
+        self.throttle_rate = throttle_rate
+        self.latency = latency
+        self.max_words = max_words
+        self.retry_after = retry_after
+        self.requests = 0
+        self.throttled = 0
+        self.in_flight = 0
+        self.max_in_flight_seen = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._window_count = 0
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _admit(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            now = time.monotonic()
+            if now - self._window_start >= 1.0:
+                self._window_start, self._window_count = now, 0
+            over_rate = self.requests_per_second is not None and self._window_count >= self.requests_per_second
+            if self.in_flight >= self.max_concurrent or over_rate or self._rng.random() < self.throttle_rate:
+                self.throttled += 1
+                return False
+            self._window_count += 1
+            self.in_flight += 1
+            self.max_in_flight_seen = max(self.max_in_flight_seen, self.in_flight)
+            return True
+
+    def _done(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):  # keep the console clean
+                pass
+
+            def _send(self, status: int, payload: dict, headers: Optional[dict] = None) -> None:
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if not self.path.endswith("/chat/completions"):
+                    self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+                    return
+                if not stub._admit():
+                    self._send(
+                        429,
+                        {"error": {"message": "Rate limit exceeded", "type": "rate_limit_exceeded"}},
+                        {"retry-after-ms": str(int(stub.retry_after * 1000))},
+                    )
+                    return
+                try:
+                    time.sleep(stub.latency)
+                    messages = request.get("messages", [])
+                    prompt = str(messages[-1].get("content", "")) if messages else ""
+                    content = " ".join(prompt.split()[: stub.max_words])
+                    prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in messages)
+                    completion_tokens = len(content.split())
+                    self._send(200, {
+                        "id": f"chatcmpl-stub-{stub.requests}",
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": request.get("model", "stub"),
+                        "choices": [{
+                            "index": 0,
+                            "message": {"role": "assistant", "content": content},
+                            "finish_reason": "stop",
+                        }],
+                        "usage": {
+                            "prompt_tokens": prompt_tokens,
+                            "completion_tokens": completion_tokens,
+                            "total_tokens": prompt_tokens + completion_tokens,
+                        },
+                    })
+                finally:
+                    stub._done()
+
+        return Handler
+
+    def start(self) -> "StubLLMServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
@@ -0,0 +1,303 @@
+"""
+Estágios reutilizáveis de map/reduce para os pipelines de sumarização
+"""
+
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables import Runnable, RunnableConfig
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from .summary_cache import SummaryCache
+
+
+class ChunkSummaryError(RuntimeError):
+    """Raised when a chunk still fails after all retries"""
+
+    def __init__(self, index: int, error: BaseException):
+        super().__init__(f"Chunk {index} failed after retries: {error}")
+        self.index = index
+        self.error = error
+
+
+def _retry_chunk(map_chain: Runnable, index: int, payload: Dict[str, Any],
+                 max_retries: int, retry_delay: float) -> str:
+    last_error: BaseException = RuntimeError("no attempts made")
+    for attempt in range(max_retries):
+        time.sleep(retry_delay * (2 ** attempt))
+        try:
+            return map_chain.invoke(payload)
+        except Exception as e:
+            last_error = e
+    raise ChunkSummaryError(index, last_error)
+
+
+async def _aretry_chunk(map_chain: Runnable, index: int, payload: Dict[str, Any],
+                        max_retries: int, retry_delay: float) -> str:
+    last_error: BaseException = RuntimeError("no attempts made")
+    for attempt in range(max_retries):
+        await asyncio.sleep(retry_delay * (2 ** attempt))
+        try:
+            return await map_chain.ainvoke(payload)
+        except Exception as e:
+            last_error = e
+    raise ChunkSummaryError(index, last_error)
+
+
+def _cache_keys(cache: Optional[SummaryCache], texts: Sequence[str],
+                cache_context: Optional[Dict[str, Any]]) -> List[str]:
+    """Cache keys for `texts`, or [] when no (enabled) cache is given"""
+    if cache is None or not cache.enabled:
+        return []
+    if cache_context is None:
+        raise ValueError("cache_context (prompt_template, model_name, temperature) is required when a cache is given")
+    return [SummaryCache.make_key(text=text, **cache_context) for text in texts]
+
+
+def _cached_results(cache: Optional[SummaryCache], keys: List[str], count: int) -> List[Any]:
+    results: List[Any] = [None] * count
+    if keys:
+        cached = cache.get_many(keys)
+        for index, key in enumerate(keys):
+            results[index] = cached.get(key)
+    return results
+
+
+def map_summaries(
+    map_chain: Runnable,
+    texts: Sequence[str],
+    max_concurrency: int = 8,
+    max_retries: int = 2,
+    retry_delay: float = 0.5,
+    input_key: str = "context",
+    cache: Optional[SummaryCache] = None,
+    cache_context: Optional[Dict[str, Any]] = None,
+) -> List[str]:
+    """
+    Summarize every chunk concurrently with `map_chain.batch`.
+
+    The batch runs with `return_exceptions=True`, so a failing chunk does not abort
+    the others. Failed chunks are then retried one at a time with exponential backoff.
+
+    Args:
+        map_chain: Runnable that receives {input_key: text} and returns a summary
+        texts: Chunk contents, in document order
+        max_concurrency: Maximum number of in-flight LLM calls
+        max_retries: Retries per failed chunk before raising ChunkSummaryError
+        retry_delay: Base delay (seconds) for the exponential backoff
+        input_key: Prompt variable that receives the chunk text
+        cache: Optional SummaryCache; chunks found there skip the LLM entirely
+        cache_context: prompt_template, model_name and temperature used to build the
+            cache keys (required when `cache` is given)
+
+    Returns:
+        One summary per chunk, in the same order as `texts`
+    """
+    keys = _cache_keys(cache, texts, cache_context)
+    results = _cached_results(cache, keys, len(texts))
+
+    pending = [index for index, result in enumerate(results) if result is None]
+    inputs = [{input_key: texts[index]} for index in pending]
+    config: RunnableConfig = {"max_concurrency": max_concurrency}
+    outputs = map_chain.batch(inputs, config=config, return_exceptions=True) if inputs else []
+
+    try:
+        for index, payload, output in zip(pending, inputs, outputs):
+            if isinstance(output, Exception):
+                output = _retry_chunk(map_chain, index, payload, max_retries, retry_delay)
+            results[index] = output
+    finally:
+        # Chunks that succeeded are kept even if another one fails for good
+        if keys:
+            cache.put_many((keys[index], results[index]) for index in pending if results[index] is not None)
+
+    return results
+
+
+async def amap_summaries(
+    map_chain: Runnable,
+    texts: Sequence[str],
+    max_concurrency: int = 8,
+    max_retries: int = 2,
+    retry_delay: float = 0.5,
+    input_key: str = "context",
+    cache: Optional[SummaryCache] = None,
+    cache_context: Optional[Dict[str, Any]] = None,
+) -> List[str]:
+    """Async version of map_summaries, built on `map_chain.abatch` (same cache behavior)"""
+    keys = _cache_keys(cache, texts, cache_context)
+    results = _cached_results(cache, keys, len(texts))
+
+    pending = [index for index, result in enumerate(results) if result is None]
+    inputs = [{input_key: texts[index]} for index in pending]
+    config: RunnableConfig = {"max_concurrency": max_concurrency}
+    outputs = await map_chain.abatch(inputs, config=config, return_exceptions=True) if inputs else []
+
+    try:
+        for index, payload, output in zip(pending, inputs, outputs):
+            if isinstance(output, Exception):
+                output = await _aretry_chunk(map_chain, index, payload, max_retries, retry_delay)
+            results[index] = output
+    finally:
+        if keys:
+            cache.put_many((keys[index], results[index]) for index in pending if results[index] is not None)
+
+    return results
+
+
+def stream_map_summaries(
+    map_chain: Runnable,
+    texts: Iterable[str],
+    max_concurrency: int = 8,
+    max_retries: int = 2,
+    retry_delay: float = 0.5,
+    input_key: str = "context",
+    cache: Optional[SummaryCache] = None,
+    cache_context: Optional[Dict[str, Any]] = None,
+) -> Iterator[str]:
+    """
+    Summarize chunks while they are still being produced (e.g. by a streaming splitter).
+
+    At most `max_concurrency` chunks are in flight, so memory stays bounded no matter
+    how long the input is. Summaries are yielded in chunk order. With a cache, each
+    chunk is looked up and stored on its own, as soon as it is summarized.
+    """
+    if cache is not None and cache.enabled and cache_context is None:
+        raise ValueError("cache_context (prompt_template, model_name, temperature) is required when a cache is given")
+
+    def summarize(index: int, text: str) -> str:
+        keys = _cache_keys(cache, [text], cache_context)
+        cached = _cached_results(cache, keys, 1)[0]
+        if cached is not None:
+            return cached
+
+        payload = {input_key: text}
+        try:
+            summary = map_chain.invoke(payload)
+        except Exception:
+            summary = _retry_chunk(map_chain, index, payload, max_retries, retry_delay)
+        if keys:
+            cache.put(keys[0], summary)
+        return summary
+
+    pending: Deque[Future] = deque()
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        for index, text in enumerate(texts):
+            pending.append(executor.submit(summarize, index, text))
+            if len(pending) >= max_concurrency:
+                yield pending.popleft().result()
+            while pending and pending[0].done():
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+# ========= Tree reduce =========
+
+@dataclass
+class CollapseLevel:
+    """Stats for one level of the reduce tree"""
+    depth: int
+    inputs: int
+    groups: int
+
+
+def approximate_token_count(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) used when no tokenizer is given"""
+    return max(1, len(text) // 4)
+
+
+def group_by_tokens(
+    texts: Sequence[str],
+    token_max: int,
+    length_function: Callable[[str], int] = approximate_token_count,
+) -> List[List[str]]:
+    """Greedily pack consecutive texts into groups whose "\n"-joined token count fits `token_max`"""
+    separator_tokens = length_function("\n")
+    groups: List[List[str]] = []
+    current: List[str] = []
+    current_tokens = 0
+    for text in texts:
+        tokens = length_function(text) + (separator_tokens if current else 0)
+        if current and current_tokens + tokens > token_max:
+            groups.append(current)
+            current, current_tokens = [], 0
+            tokens -= separator_tokens
+        current.append(text)
+        current_tokens += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
+def split_to_fit(
+    text: str,
+    token_max: int,
+    length_function: Callable[[str], int] = approximate_token_count,
+) -> List[str]:
+    """Split a text that alone exceeds `token_max` into consecutive pieces that fit (paragraph, line, word boundaries)"""
+    if length_function(text) <= token_max:
+        return [text]
+    splitter = RecursiveCharacterTextSplitter(chunk_size=token_max, chunk_overlap=0, length_function=length_function)
+    return splitter.split_text(text)
+
+
+def collapse_summaries(
+    reduce_chain: Runnable,
+    summaries: Sequence[str],
+    token_max: int = 3000,
+    length_function: Callable[[str], int] = approximate_token_count,
+    max_concurrency: int = 8,
+    max_depth: int = 10,
+    input_key: str = "context",
+    on_level: Optional[Callable[[CollapseLevel], None]] = None,
+) -> Tuple[str, List[CollapseLevel]]:
+    """
+    Reduce the summaries as a tree instead of one huge reduce call.
+
+    While the joined summaries do not fit `token_max`, they are packed into groups
+    that fit the budget and every group is reduced in parallel with `reduce_chain.batch`.
+    A summary that alone exceeds the budget is split into pieces first (split_to_fit),
+    so every call of the tree, including the last single reduce call, fits `token_max`.
+
+    Args:
+        reduce_chain: Runnable that receives {input_key: joined summaries}
+        summaries: Map stage outputs, in document order
+        token_max: Token budget for a single reduce call
+        length_function: Token counter (e.g. `llm.get_num_tokens`)
+        max_concurrency: Maximum number of in-flight reduce calls per level
+        max_depth: Safety limit for the number of collapse levels
+        input_key: Prompt variable that receives the joined summaries
+        on_level: Optional callback invoked after each level
+
+    Returns:
+        The final summary and the stats of every level of the tree
+    """
+    current = list(summaries)
+    levels: List[CollapseLevel] = []
+    config: RunnableConfig = {"max_concurrency": max_concurrency}
+
+    while length_function("\n".join(current)) > token_max:
+        if len(levels) >= max_depth:
+            raise ValueError(f"Summaries did not fit {token_max} tokens after {max_depth} collapse levels")
+
+        current = [piece for text in current for piece in split_to_fit(text, token_max, length_function)]
+        groups = group_by_tokens(current, token_max, length_function)
+        level = CollapseLevel(depth=len(levels) + 1, inputs=len(current), groups=len(groups))
+        current = reduce_chain.batch([{input_key: "\n".join(group)} for group in groups], config=config)
+
+        levels.append(level)
+        if on_level:
+            on_level(level)
+
+    level = CollapseLevel(depth=len(levels) + 1, inputs=len(current), groups=1)
+    result = reduce_chain.invoke({input_key: "\n".join(current)})
+    levels.append(level)
+    if on_level:
+        on_level(level)
+
+    return result, levels
@@ -0,0 +1,123 @@
+"""
+Cache persistente (SQLite) de resumos de chunks, endereçado pelo conteúdo
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+
+class SummaryCache:
+    """
+    Content-addressed cache for chunk summaries stored in a local SQLite file.
+
+    The key is a SHA-256 of the prompt template, model name, temperature and chunk
+    text, so any change to one of them is a miss. When the stored summaries exceed
+    `max_bytes`, the least recently used entries are evicted.
+    """
+
+    def __init__(self, path: str = "summary_cache.sqlite", max_bytes: int = 100 * 1024 * 1024,
+                 enabled: bool = True):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS summaries ("
+            " key TEXT PRIMARY KEY,"
+            " summary TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_summaries_last_access ON summaries (last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(prompt_template: str, model_name: str, temperature: float, text: str) -> str:
+        """Hash of everything that changes the summary of a chunk"""
+        payload = json.dumps([prompt_template, model_name, temperature, text], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, str]:
+        """Return the cached summaries for `keys` (missing keys are left out)"""
+        if not self.enabled:
+            return {}
+
+        found: Dict[str, str] = {}
+        unique_keys = list(dict.fromkeys(keys))
+        with self._lock:
+            # Stay below SQLite's default limit of bound variables per statement
+            for start in range(0, len(unique_keys), 500):
+                batch = unique_keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, summary FROM summaries WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                found.update(rows)
+
+            now = time.time()
+            self._conn.executemany(
+                "UPDATE summaries SET last_access = ? WHERE key = ?", [(now, key) for key in found]
+            )
+            self._conn.commit()
+
+            # Counters are shared by the threads of stream_map_summaries
+            hits = sum(1 for key in keys if key in found)
+            self.hits += hits
+            self.misses += len(keys) - hits
+        return found
+
+    def get(self, key: str) -> Optional[str]:
+        return self.get_many([key]).get(key)
+
+    def put_many(self, items: Iterable[Tuple[str, str]]) -> None:
+        """Store (key, summary) pairs and evict old entries if the cache is over budget"""
+        if not self.enabled:
+            return
+
+        now = time.time()
+        rows = [(key, summary, len(summary.encode("utf-8")), now) for key, summary in items]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO summaries (key, summary, size, last_access) VALUES (?, ?, ?, ?)", rows
+            )
+            self._evict()
+            self._conn.commit()
+
+    def put(self, key: str, summary: str) -> None:
+        self.put_many([(key, summary)])
+
+    def _evict(self) -> None:
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM summaries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        to_free = total - self.max_bytes
+        victims = []
+        cursor = self._conn.execute("SELECT key, size FROM summaries ORDER BY last_access")
+        for key, size in cursor:
+            victims.append((key,))
+            to_free -= size
+            if to_free <= 0:
+                break
+        cursor.close()
+        self._conn.executemany("DELETE FROM summaries WHERE key = ?", victims)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM summaries")
+            self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
@@ -0,0 +1,104 @@
+"""
+Histórico em janela deslizante limitada por tokens, com contagem incremental
+"""
+
+from collections import deque
+from functools import lru_cache
+from typing import Callable, Deque, List, Optional, Sequence, Tuple
+
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import BaseMessage, HumanMessage
+
+from .summarization import approximate_token_count
+
+# Extra tokens per message for the role and separators of the chat format
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+@lru_cache(maxsize=1)
+def _tiktoken_encoding():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        # tiktoken missing or its vocabulary cannot be downloaded
+        return None
+
+
+def count_text_tokens(text: str) -> int:
+    """gpt-4o tokenizer when tiktoken is available, ~4 characters per token otherwise"""
+    encoding = _tiktoken_encoding()
+    if encoding is None:
+        return approximate_token_count(text)
+    return len(encoding.encode(text))
+
+
+def message_token_counter(
+    text_counter: Callable[[str], int] = count_text_tokens, overhead: int = MESSAGE_OVERHEAD_TOKENS
+) -> Callable[[BaseMessage], int]:
+    """Build a per-message counter from any text tokenizer"""
+    def count(message: BaseMessage) -> int:
+        content = message.content if isinstance(message.content, str) else str(message.content)
+        return text_counter(content) + overhead
+    return count
+
+
+class TokenWindowChatMessageHistory(BaseChatMessageHistory):
+    """
+    Chat history that keeps only the most recent messages fitting in `max_tokens`.
+
+    Each message is tokenized once, when it is added, and the window keeps a running
+    total, so trimming only pops messages from the left: every message is counted once
+    and evicted at most once (O(1) amortized per turn, regardless of the chat length).
+    The window always starts on a human message. Evicted messages are passed to
+    `on_evict`, e.g. to fold them into a summary.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 1000,
+        token_counter: Optional[Callable[[BaseMessage], int]] = None,
+        on_evict: Optional[Callable[[List[BaseMessage]], None]] = None,
+    ):
+        self.max_tokens = max_tokens
+        self.token_counter = token_counter or message_token_counter()
+        self.on_evict = on_evict
+        self.total_tokens = 0
+        self._window: Deque[Tuple[BaseMessage, int]] = deque()
+
+    @property
+    def messages(self) -> List[BaseMessage]:  # type: ignore[override]
+        return [message for message, _ in self._window]
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        for message in messages:
+            tokens = self.token_counter(message)
+            self._window.append((message, tokens))
+            self.total_tokens += tokens
+        self._trim()
+
+    # In-memory only: no need to hop to a thread pool on the async path
+    async def aget_messages(self) -> List[BaseMessage]:
+        return self.messages
+
+    async def aadd_messages(self, messages: Sequence[BaseMessage]) -> None:
+        self.add_messages(messages)
+
+    def _trim(self) -> None:
+        evicted: List[BaseMessage] = []
+        while self._window and self.total_tokens > self.max_tokens:
+            evicted.append(self._pop())
+        # Do not start the window in the middle of a turn (answer without its question)
+        while self._window and not isinstance(self._window[0][0], HumanMessage):
+            evicted.append(self._pop())
+        if evicted and self.on_evict:
+            self.on_evict(evicted)
+
+    def _pop(self) -> BaseMessage:
+        message, tokens = self._window.popleft()
+        self.total_tokens -= tokens
+        return message
+
+    def clear(self) -> None:
+        self._window.clear()
+        self.total_tokens = 0
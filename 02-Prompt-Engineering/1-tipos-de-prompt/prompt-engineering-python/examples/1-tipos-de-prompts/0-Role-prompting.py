@@ -1,12 +1,11 @@
-from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
 from dotenv import load_dotenv
-from pydantic import SecretStr
 import os
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
-from utils.prompt_helpers import print_llm_result
+from utils.model_factory import get_chat_model
+from utils.prompt_helpers import stream_llm_result
 
 load_dotenv()
 
@@ -30,13 +29,7 @@ chat_prompt = ChatPromptTemplate([system, user])
 chat_prompt2 = ChatPromptTemplate([system2, user])
 messages = chat_prompt.format_messages()
 
-model = ChatOpenAI(
-    model="gpt-4o",
-    base_url=os.environ["GITHUB_MODELS_ENDPOINT"],
-    api_key=SecretStr(os.environ["GITHUB_MODELS_TOKEN"])
-)
-response = model.invoke(messages)
-print_llm_result(str(system), response)
-
-response2 = model.invoke(chat_prompt2.format_messages())
-print_llm_result(str(system2), response2)
\ No newline at end of file
+model = get_chat_model("gpt-4o")
+# Tokens are rendered as they arrive, with time-to-first-token and inter-token latency
+stream_llm_result(str(system), model, messages)
+stream_llm_result(str(system2), model, chat_prompt2.format_messages())
\ No newline at end of file
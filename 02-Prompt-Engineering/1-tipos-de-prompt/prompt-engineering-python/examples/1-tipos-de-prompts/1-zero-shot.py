@@ -1,11 +1,10 @@
-from langchain_openai import ChatOpenAI
 from dotenv import load_dotenv
-from pydantic import SecretStr
 import os
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
-from utils.prompt_helpers import print_llm_result
+from utils.model_factory import get_chat_model
+from utils.prompt_helpers import stream_llm_result
 
 load_dotenv()
 
@@ -19,16 +18,9 @@ message2 = """
   
 message3 = "Qual é a capital do Brasil? Responda somente dando o nome da cidade."
 
-model = ChatOpenAI(
-    model="gpt-4o",
-    base_url=os.environ["GITHUB_MODELS_ENDPOINT"],
-    api_key=SecretStr(os.environ["GITHUB_MODELS_TOKEN"])
-)
+model = get_chat_model("gpt-4o")
 
-response1 = model.invoke(message1)
-response2 = model.invoke(message2)
-response3 = model.invoke(message3)
-
-print_llm_result(message1, response1)
-print_llm_result(message2, response2)
-print_llm_result(message3, response3)
\ No newline at end of file
+# Tokens are rendered as they arrive, with time-to-first-token and inter-token latency
+stream_llm_result(message1, model)
+stream_llm_result(message2, model)
+stream_llm_result(message3, model)
\ No newline at end of file
@@ -0,0 +1,33 @@
+from dotenv import load_dotenv
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from utils.prompt_helpers import print_llm_result
+from utils.model_factory import get_chat_model
+from utils.response_cache import ResponseCache
+
+load_dotenv()
+
+# Exact tier only (the default): answers kept for one hour, at most 500 prompts
+cache = ResponseCache(max_entries=500, ttl_seconds=3600)
+# The semantic tier is opt-in and needs a real embedding model to catch paraphrases, e.g.
+# ResponseCache(similarity_threshold=0.9, embedder=lambda texts: np.array(OpenAIEmbeddings().embed_documents(texts)))
+model = get_chat_model("gpt-4o", temperature=0, cache=cache)
+
+message1 = "Qual é a capital do Brasil? Responda somente dando o nome da cidade."
+
+# Same prompt, re-indented while iterating: exact hit after normalization
+message2 = """
+  Qual é a capital do Brasil?   Responda somente dando o nome da cidade.
+  """
+
+# Different question: miss (a lexical match would wrongly answer "Brasília" here)
+message3 = "Qual é a capital do Chile? Responda somente dando o nome da cidade."
+
+for message in (message1, message2, message3):
+    print_llm_result(message, model.invoke(message), cache)
+
+# Per-call bypass: always calls the API and refreshes the cached answer
+with cache.bypass():
+    print_llm_result(message1, model.invoke(message1), cache)
@@ -1,11 +1,11 @@
-from langchain_openai import ChatOpenAI
 from dotenv import load_dotenv
-from pydantic import SecretStr
 import os
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
-from utils.prompt_helpers import print_llm_result
+from utils.prompt_helpers import print_llm_result, display_result
+from utils.log_classifier import BatchLogClassifier
+from utils.model_factory import configure_rate_limits, get_chat_model
 
 load_dotenv()
 
@@ -121,11 +121,9 @@ Input: "CPU usage is 95%."
 Output:
 """
 
-model = ChatOpenAI(
-    model="gpt-4o",
-    base_url=os.environ["GITHUB_MODELS_ENDPOINT"],
-    api_key=SecretStr(os.environ["GITHUB_MODELS_TOKEN"])
-)
+# Stay under the GitHub Models quota: RPM bucket + adaptive concurrency on every call
+configure_rate_limits(requests_per_minute=15)
+model = get_chat_model("gpt-4o")
 
 response1 = model.invoke(msg1)
 response2 = model.invoke(msg2)
@@ -136,3 +134,22 @@ print_llm_result(msg1, response1)
 print_llm_result(msg2, response2)
 print_llm_result(msg3, response3)
 print_llm_result(msg4, response4)
+
+
+# Batch mode: many log lines per prompt, one "<id>: <LABEL>" answer per line
+logs = [
+    "API response time is above threshold.",
+    "CPU usage is 95%.",
+    "Scheduled backup completed",
+    "Authentication failed for user admin",
+    "Low disk space: 15% left",
+    "Cache warming completed",
+]
+
+classifier = BatchLogClassifier(model, token_budget=2000, max_concurrency=4)
+results = classifier.classify(logs)
+
+display_result(
+    "BATCH LOG CLASSIFICATION",
+    "\n".join(f"{item.label or '?':<8} {item.line}" for item in results),
+)
@@ -0,0 +1,71 @@
+import os
+import re
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from utils.fake_chat_model import FakeLatencyChatModel
+from utils.log_classifier import BatchLogClassifier, parse_single_output
+
+# Benchmark settings (no API key needed: the model is a local fake with configurable latency)
+NUM_LINES = 2000
+LATENCY_SECONDS = 0.05
+LATENCY_PER_TOKEN = 0.0005
+DROP_EVERY = 37  # the fake "forgets" some lines in batch answers to exercise the fallback
+
+templates = [
+    "Database connection lost at {i}",
+    "Disk usage at {i}%",
+    "User {i} logged in successfully",
+    "API latency is above threshold for request {i}",
+    "Authentication failed for user {i}",
+    "Background job {i} finished",
+]
+lines = [templates[i % len(templates)].format(i=i) for i in range(NUM_LINES)]
+
+def severity(line: str) -> str:
+    text = line.lower()
+    if "lost" in text or "failed" in text:
+        return "ERROR"
+    if "disk" in text or "latency" in text:
+        return "WARNING"
+    return "INFO"
+
+def responder(prompt: str) -> str:
+    if "Logs:" in prompt:
+        logs = prompt.split("Logs:", 1)[1]
+        answers = []
+        for match in re.finditer(r"^(\d+)\. (.+)$", logs, re.MULTILINE):
+            if int(match.group(1)) % DROP_EVERY:
+                answers.append(f"{match.group(1)}: {severity(match.group(2))}")
+        return "\n".join(answers)
+    return severity(prompt.rsplit("Input:", 1)[1])
+
+llm = FakeLatencyChatModel(latency=LATENCY_SECONDS, latency_per_token=LATENCY_PER_TOKEN, responder=responder)
+classifier = BatchLogClassifier(llm, token_budget=2000, max_concurrency=8)
+expected = [severity(line) for line in lines]
+
+print(f"=== LOG CLASSIFIER BENCHMARK: {NUM_LINES} lines, ~{LATENCY_SECONDS * 1000:.0f}ms per call ===\n")
+
+# Baseline: one prompt per line, like msg3/msg4 (measured on a sample to keep it short)
+sample = lines[:200]
+start = time.perf_counter()
+baseline = [
+    parse_single_output(llm.invoke(f'Classify the log severity.\n\nNow classify:\nInput: "{line}"\nOutput:').content)
+    for line in sample
+]
+baseline_seconds = time.perf_counter() - start
+baseline_rate = len(sample) / baseline_seconds
+print(f"{'one call per line':<22} {baseline_rate:9.1f} lines/s")
+
+start = time.perf_counter()
+results = classifier.classify(iter(lines))
+elapsed = time.perf_counter() - start
+
+assert [item.index for item in results] == list(range(NUM_LINES)), "results must keep the input order"
+assert [item.label for item in results] == expected
+stats = classifier.stats
+print(
+    f"{'batched':<22} {NUM_LINES / elapsed:9.1f} lines/s  speedup {NUM_LINES / elapsed / baseline_rate:5.1f}x"
+    f"\n  {stats.batches} batches, {stats.fallbacks} single-line fallbacks, {stats.unparsed} unparsed"
+)
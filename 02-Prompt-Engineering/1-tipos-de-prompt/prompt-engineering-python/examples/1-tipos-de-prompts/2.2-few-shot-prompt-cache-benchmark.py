@@ -0,0 +1,47 @@
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from utils.prompt_helpers import FewShotPromptCache, create_few_shot_examples
+
+# Building prompts only (no model calls): the example block of msg4 in 2-one-few-shot.py
+NUM_PROMPTS = 1_000_000
+
+examples = [
+    {"input": "Database connection lost at 10:34.", "output": "ERROR"},
+    {"input": "Disk usage at 85%.", "output": "WARNING"},
+    {"input": "User logged in successfully.", "output": "INFO"},
+    {"input": "File not found: config.yaml", "output": "ERROR"},
+    {"input": "High memory usage detected: 75%", "output": "WARNING"},
+    {"input": "Background job finished", "output": "INFO"},
+    {"input": "Retrying request to payment gateway", "output": "ERROR"},
+    {"input": "API latency is above threshold", "output": "WARNING"},
+    {"input": "Scheduled backup completed", "output": "INFO"},
+    {"input": "Low disk space: 15% left", "output": "WARNING"},
+    {"input": "Low disk space: 5% left", "output": "ERROR"},
+    {"input": "Cache warming completed", "output": "INFO"},
+    {"input": "Connection timeout, retrying...", "output": "WARNING"},
+    {"input": "Authentication failed for user admin", "output": "ERROR"},
+]
+header = "Classify the log severity."
+logs = [f"CPU usage is {i % 100}%." for i in range(NUM_PROMPTS)]
+
+print(f"=== FEW-SHOT PROMPT BUILDING: {NUM_PROMPTS:,} prompts, {len(examples)} examples ===\n")
+
+start = time.perf_counter()
+for log in logs:
+    prompt = f"{header}\n\n{create_few_shot_examples(examples)}\nInput: {log}\nOutput:"
+before = time.perf_counter() - start
+print(f"{'create_few_shot_examples':<26} {before:6.2f}s  {NUM_PROMPTS / before:12,.0f} prompts/s")
+
+start = time.perf_counter()
+cache = FewShotPromptCache.compile(examples, header=header)
+for log in logs:
+    prompt = cache.build(log)
+after = time.perf_counter() - start
+print(f"{'FewShotPromptCache':<26} {after:6.2f}s  {NUM_PROMPTS / after:12,.0f} prompts/s  speedup {before / after:5.1f}x")
+
+assert FewShotPromptCache.compile(examples, header=header) is cache
+assert cache.build("a").encode("utf-8").startswith(cache.prefix_bytes)
+print(f"\nPrefix: {len(cache.prefix_bytes)} bytes, {cache.prefix_tokens} tokens (computed once)")
@@ -0,0 +1,56 @@
+from dotenv import load_dotenv
+import os
+import sys
+import tempfile
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from utils.model_factory import get_chat_model
+from utils.prompt_helpers import print_llm_result, create_few_shot_examples, count_tokens
+from utils.example_selector import SemanticExampleSelector, HashingEmbedder
+
+load_dotenv()
+
+# A labeled pool with thousands of logs: putting all of them in the prompt is not an option
+templates = [
+    ("Database connection lost at {i}:{m:02d}.", "ERROR"),
+    ("Disk usage at {p}%.", "WARNING"),
+    ("User {i} logged in successfully.", "INFO"),
+    ("File not found: config-{i}.yaml", "ERROR"),
+    ("High memory usage detected: {p}%", "WARNING"),
+    ("Background job {i} finished", "INFO"),
+    ("Retrying request {i} to payment gateway", "ERROR"),
+    ("API latency is above threshold on node {i}", "WARNING"),
+    ("Scheduled backup {i} completed", "INFO"),
+    ("Authentication failed for user admin{i}", "ERROR"),
+    ("Connection timeout on shard {i}, retrying...", "WARNING"),
+    ("Cache warming completed for region {i}", "INFO"),
+]
+pool = [
+    {"input": template.format(i=i, m=i % 60, p=50 + i % 50), "output": label}
+    for i in range(500)
+    for template, label in templates
+]
+
+# Embed the pool once and keep the vectors in a memory-mapped .npy file
+index_dir = os.path.join(tempfile.gettempdir(), "log-examples-index")
+start = time.perf_counter()
+SemanticExampleSelector(pool, embedder=HashingEmbedder()).save(index_dir)
+print(f"Indexed {len(pool)} examples in {time.perf_counter() - start:.2f}s")
+
+selector = SemanticExampleSelector.load(index_dir, embedder=HashingEmbedder(), k=4)
+
+log = "CPU usage is 95%."
+start = time.perf_counter()
+examples = selector.select_examples({"input": log})
+print(f"Top-{selector.k} selected in {(time.perf_counter() - start) * 1000:.2f}ms")
+
+header = "Classify the log severity.\n\n"
+all_examples_prompt = f"{header}{create_few_shot_examples(pool)}\nNow classify:\nInput: {log}\nOutput:"
+msg = f"{header}{create_few_shot_examples(examples)}\nNow classify:\nInput: {log}\nOutput:"
+print(f"Prompt tokens: {count_tokens(all_examples_prompt)} with the whole pool, {count_tokens(msg)} with top-k\n")
+
+model = get_chat_model("gpt-4o")
+
+response = model.invoke(msg)
+print_llm_result(msg, response)
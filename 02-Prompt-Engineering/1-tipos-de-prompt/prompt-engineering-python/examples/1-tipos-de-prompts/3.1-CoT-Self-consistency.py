@@ -1,11 +1,11 @@
-from langchain_openai import ChatOpenAI
 from dotenv import load_dotenv
-from pydantic import SecretStr
 import os
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
+from utils.model_factory import get_chat_model
 from utils.prompt_helpers import print_llm_result
+from utils.self_consistency import self_consistency
 
 load_dotenv()
 
@@ -24,11 +24,31 @@ message1 = """
   If there are 3 different answers, ONLY reply: "I can't find a consistent answer".
 """
 
-model = ChatOpenAI(
-    model="gpt-4o",
-    base_url=os.environ["GITHUB_MODELS_ENDPOINT"],
-    api_key=SecretStr(os.environ["GITHUB_MODELS_TOKEN"])
-)
+model = get_chat_model("gpt-4o")
 
 response1 = model.invoke(message1)
-print_llm_result(message1, response1)
\ No newline at end of file
+print_llm_result(message1, response1)
+
+# Same question, but each reasoning path is an independent sample taken concurrently.
+# The answers are majority-voted and sampling stops as soon as the leader cannot be overtaken.
+message2 = """
+  Question: In an API endpoint that returns a list of users and their posts, the developer wrote:
+
+  users := db.FindAllUsers()
+  for _, u := range users {
+    u.Posts = db.FindPostsByUserID(u.ID)
+  }
+
+  How many database queries will this code execute if there are N users?
+
+  Think step by step.
+  At the end, give only the final answer as a formula in N after "Answer:".
+"""
+
+sampling_model = get_chat_model("gpt-4o", temperature=0.8)  # Diversity between reasoning paths
+
+result = self_consistency(sampling_model, message2, n_samples=7, max_concurrency=7)
+
+print(f"Samples taken: {len(result.samples)} of 7 (stopped early: {result.stopped_early})")
+print(f"Votes: {result.votes}")
+print(f"Answer: {result.answer} (agreement: {result.agreement:.0%})")
\ No newline at end of file
@@ -1,90 +1,43 @@
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import PromptTemplate
-from langchain_core.output_parsers import StrOutputParser
 from dotenv import load_dotenv
-from pydantic import SecretStr
 import os
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
-from utils.prompt_helpers import print_llm_result
+from utils.model_factory import get_chat_model
+from utils.prompt_helpers import display_result
+from utils.tree_of_thought import TreeOfThought
 
 load_dotenv()
 
-model = ChatOpenAI(
-    model="gpt-4o",
-    base_url=os.environ["GITHUB_MODELS_ENDPOINT"],
-    api_key=SecretStr(os.environ["GITHUB_MODELS_TOKEN"])
-)
-
-spect_to_schema = PromptTemplate.from_template(
-  """
-  You are a senior backend engineer.
-  From the following product spec, extract a minimal JSON schema with fields and types.
-  Only return JSON. No commentary.
-
-  Write all the code using markdown code blocks.  
-
-  Spec:
-  {spec}
-  """
-) | model | StrOutputParser()
-
-schema_to_routes = PromptTemplate.from_template(
-  """
-  You are a senior Go developer.
-  Given the JSON schema below, design REST routes and sketch idiomatic Go handlers for CRUD.
-  Keep it concise, production-oriented, and show code snippets.
-
-  Write all the code using markdown code blocks.  
-
-  Schema JSON:
-  {schema_json}
-  """
-) | model | StrOutputParser()
+model = get_chat_model("gpt-4o", temperature=0.8)  # Diversity between sibling thoughts
 
-commit_message = PromptTemplate.from_template(
-  """
-  You are a pragmatic developer.
-  Write a single-line conventional commit message summarizing the new API based on the schema and routes.
-
-  Schema:
-  {schema_json}
-
-  Routes and handlers:
-  {routes}
-  """
-) | model | StrOutputParser()
-
-spec_text = """
+problem = """
+  You are a senior Go developer designing a Products REST API.
   Fields: id (uuid), name (string, required), description (string), price (float, > 0), stock (int, >= 0).
   We must support list with pagination, create, get by id, update, delete.
-  """
-  
-schema_json = spect_to_schema.invoke({"spec": spec_text})
-routes = schema_to_routes.invoke({"schema_json": schema_json})
-commit = commit_message.invoke({"schema_json": schema_json, "routes": routes})
-
-response_content = f"""# Prompt Chaining Result
-
-## SCHEMA (Generated by GPT-3.5-turbo)
-{schema_json}
 
-## ROUTES & HANDLERS (Go) (Generated by GPT-5-mini)
-{routes}
+  Plan the implementation: data model, routing, validation, persistence and error handling.
+  """
 
-## COMMIT (Generated by GPT-4o-mini)
-{commit}
+# Each level expands every node of the frontier with 3 concurrent calls, scores the new
+# thoughts with an evaluator prompt and keeps only the 2 best (beam search)
+tot = TreeOfThought(
+    model,
+    beam_width=2,
+    branching=3,
+    max_depth=4,
+    max_concurrency=8,
+    token_budget=20_000,
+    time_budget=120,
+)
 
----
-**Pipeline Models:**
-- Step 1: GPT-3.5-turbo
-- Step 2: GPT-5-mini
-- Step 3: GPT-4o-mini  
+result = tot.search(problem)
 
-"""
+for level in result.levels:
+    print(
+        f"Depth {level.depth}: {level.expanded} thoughts expanded, {level.duplicates} duplicates, "
+        f"{level.kept} kept (best score {level.best_score:.1f})"
+    )
 
-with open("prompt_chaining_result.md", "w", encoding="utf-8") as f:
-    f.write(response_content)
-    
-print("Resultado salvo em 'prompt_chaining_result.md'")
+print(f"\nStopped by: {result.stop_reason} | tokens: {result.tokens_used} | time: {result.elapsed:.1f}s")
+display_result(f"BEST PATH (score {result.best.score:.1f})", result.best.render())
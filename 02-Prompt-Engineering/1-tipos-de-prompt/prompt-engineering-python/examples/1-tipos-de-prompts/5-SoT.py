@@ -1,60 +1,60 @@
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import PromptTemplate
-from langchain_core.output_parsers import StrOutputParser
 from dotenv import load_dotenv
-from pydantic import SecretStr
+import asyncio
 import os
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
-from utils.prompt_helpers import print_llm_result
+from utils.model_factory import get_chat_model
+from utils.prompt_helpers import display_result
+from utils.skeleton_of_thought import SkeletonOfThought, SoTSection
 
 load_dotenv()
 
+# The Skeleton of Thought steps are no longer spelled out in the prompts: SkeletonOfThought
+# asks for the skeleton first and then expands every point with its own concurrent call
 msg1 = """
 You are a senior backend engineer. A junior developer asked you how to optimize SQL queries for better performance. 
-Follow the Skeleton of Thought approach: 
-
-Step 1: Generate only the skeleton of your answer in 3–5 concise bullet points. 
-Step 2: Expand each bullet point into a clear and detailed explanation with examples. 
-Make sure the final answer is structured and easy to follow.
+Answer in 3–5 points, each explained with clear examples.
 """
 
-msg2 = f"""
+msg2 = """
 You are a software architect. I want you to produce an Architecture Decision Record (ADR) about choosing PostgreSQL instead of MongoDB. 
-
-Follow the Skeleton of Thought approach:
-Step 1: First, output only the skeleton of the ADR as section headers (no explanations yet). 
 Use the standard ADR structure with 5 sections: Context, Decision, Alternatives Considered, Consequences, References. 
-Step 2: After showing the skeleton, expand each section with clear and detailed content. 
 Keep the final ADR professional, structured, and easy to read.
 """
 
-msg3 = f"""
+msg3 = """
 You are a senior Go developer. I want you to help me plan a REST API for managing products in Go.
 
-Follow the Skeleton of Thought approach:
-
-Step 1: Output only the skeleton of the solution in 6–8 concise bullet points. 
-The skeleton must cover: data model definition in Go (structs), choice of HTTP framework or net/http, routing, handlers, validations, database layer, error handling, and project structure. Do not expand yet.
-
-Step 2: Expand each bullet point with clear technical details, examples, and Go best practices. 
+The solution must cover: data model definition in Go (structs), choice of HTTP framework or net/http, routing, handlers, validations, database layer, error handling, and project structure.
 Include sample code snippets in Go (structs, handlers, routes) and considerations about packages (e.g., chi, or net/http), error handling with idiomatic Go, and how to organize the project into packages (handlers, models, db). 
 Use concise and professional language.
 
 The API must implement CRUD operations for products with fields: id, name, description, price, stock.
 """
 
-model = ChatOpenAI(
-    model="gpt-4o",
-    base_url=os.environ["GITHUB_MODELS_ENDPOINT"],
-    api_key=SecretStr(os.environ["GITHUB_MODELS_TOKEN"])
-)
+model = get_chat_model("gpt-4o")
+
+sot = SkeletonOfThought(model, max_concurrency=8)
+
+def progress(name: str):
+    def on_section(section: SoTSection) -> None:
+        print(f"[{name}] section {section.index} ready after {section.elapsed:.1f}s: {section.point}")
+    return on_section
+
+async def main():
+    # The three questions also run concurrently with each other
+    return await asyncio.gather(
+        sot.arun(msg1, on_section=progress("SQL")),
+        sot.arun(msg2, on_section=progress("ADR")),
+        sot.arun(msg3, on_section=progress("Go API")),
+    )
 
-response1 = model.invoke(msg1)
-response2 = model.invoke(msg2)
-response3 = model.invoke(msg3)
+results = asyncio.run(main())
 
-print_llm_result(msg1, response1)
-print_llm_result(msg2, response2)
-print_llm_result(msg3, response3)
\ No newline at end of file
+for title, result in zip(["SQL OPTIMIZATION", "ADR: POSTGRESQL VS MONGODB", "GO PRODUCTS API"], results):
+    print(
+        f"\n{title}: {len(result.skeleton)} points | skeleton {result.skeleton_latency:.1f}s"
+        f" | total {result.total_latency:.1f}s"
+    )
+    display_result(title, result.answer)
@@ -0,0 +1,46 @@
+import asyncio
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from utils.fake_chat_model import FakeLatencyChatModel
+from utils.skeleton_of_thought import SkeletonOfThought, SoTSection
+
+# Benchmark settings (no API key needed: the model is a local fake whose latency grows
+# with the answer length, like a real decoder)
+NUM_POINTS = 6
+WORDS_PER_SECTION = 120
+LATENCY_SECONDS = 0.3
+LATENCY_PER_TOKEN = 0.005
+
+question = "How do I optimize SQL queries for better performance?"
+
+def responder(prompt: str) -> str:
+    section = " ".join(["detail"] * WORDS_PER_SECTION)
+    if "Output ONLY the skeleton" in prompt:
+        return "\n".join(f"- Point {i}" for i in range(1, NUM_POINTS + 1))
+    if "Write ONLY the section" in prompt:
+        return section
+    # Single prompt: the whole answer is decoded sequentially in one call
+    return "\n\n".join(f"Point {i}\n{section}" for i in range(1, NUM_POINTS + 1))
+
+llm = FakeLatencyChatModel(latency=LATENCY_SECONDS, latency_per_token=LATENCY_PER_TOKEN, responder=responder)
+
+print(f"=== SKELETON-OF-THOUGHT BENCHMARK: {NUM_POINTS} points, ~{WORDS_PER_SECTION} tokens each ===\n")
+
+start = time.perf_counter()
+llm.invoke(question)
+single_seconds = time.perf_counter() - start
+print(f"{'single prompt':<22} {single_seconds:6.2f}s")
+
+def on_section(section: SoTSection) -> None:
+    print(f"  section {section.index} streamed after {section.elapsed:.2f}s")
+
+result = asyncio.run(SkeletonOfThought(llm, max_concurrency=NUM_POINTS).arun(question, on_section))
+assert [section.index for section in result.sections] == list(range(1, NUM_POINTS + 1))
+
+print(
+    f"{'skeleton-of-thought':<22} {result.total_latency:6.2f}s"
+    f"  (skeleton {result.skeleton_latency:.2f}s)  speedup {single_seconds / result.total_latency:4.1f}x"
+)
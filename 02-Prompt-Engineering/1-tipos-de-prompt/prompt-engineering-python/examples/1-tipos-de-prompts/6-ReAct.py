@@ -1,10 +1,9 @@
-from langchain_openai import ChatOpenAI
 from dotenv import load_dotenv
-from pydantic import SecretStr
 import os
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
+from utils.model_factory import get_chat_model
 from utils.prompt_helpers import print_llm_result
 
 load_dotenv()
@@ -77,11 +76,7 @@ Other details:
 Start your reasoning now.
 """
 
-model = ChatOpenAI(
-    model="gpt-4o",
-    base_url=os.environ["GITHUB_MODELS_ENDPOINT"],
-    api_key=SecretStr(os.environ["GITHUB_MODELS_TOKEN"])
-)
+model = get_chat_model("gpt-4o")
 
 response1 = model.invoke(msg1)
 
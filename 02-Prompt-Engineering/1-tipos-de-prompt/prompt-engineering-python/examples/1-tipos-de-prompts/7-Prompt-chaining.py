@@ -1,22 +1,16 @@
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from dotenv import load_dotenv
-from pydantic import SecretStr
 import os
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
-from utils.prompt_helpers import print_llm_result
+from utils.model_factory import get_chat_model
+from utils.prompt_dag import PromptDAG, Step
 
 load_dotenv()
 
-model = ChatOpenAI(
-    model="gpt-4o",
-    base_url=os.environ["GITHUB_MODELS_ENDPOINT"],
-    api_key=SecretStr(os.environ["GITHUB_MODELS_TOKEN"]),
-    temperature=0.0 # Keep it deterministic (important for chaining)
-)
+model = get_chat_model("gpt-4o", temperature=0.0)  # Keep it deterministic (important for chaining)
 
 spec_to_schema = PromptTemplate.from_template(
     """You are a senior backend engineer.
@@ -55,14 +49,50 @@ Routes and handlers:
 ) | model | StrOutputParser()
 
 
+schema_to_sql = PromptTemplate.from_template(
+    """You are a senior database engineer.
+Given the JSON schema below, write the PostgreSQL migration (CREATE TABLE with constraints and indexes).
+
+Write all the code using markdown code blocks.  
+
+Schema JSON:
+{schema_json}
+"""
+) | model | StrOutputParser()
+
+
 spec_text = """We need a Products API.
 Fields: id (uuid), name (string, required), description (string), price (float, > 0), stock (int, >= 0).
 We must support list with pagination, create, get by id, update, delete.
 """
 
-schema_json = spec_to_schema.invoke({"spec": spec_text})
-routes = schema_to_routes.invoke({"schema_json": schema_json})
-commit = commit_message.invoke({"schema_json": schema_json, "routes": routes})
+# The chain is declared as a DAG: dependencies come from the input keys, so
+# schema_to_routes and schema_to_sql (both only need the schema) run concurrently
+chain = PromptDAG([
+    Step("schema_json", spec_to_schema, inputs=["spec"]),
+    Step("routes", schema_to_routes, inputs=["schema_json"]),
+    Step("migration", schema_to_sql, inputs=["schema_json"]),
+    Step("commit", commit_message, inputs=["schema_json", "routes"]),
+])
+
+def print_run(title, result):
+    print(f"\n{title}")
+    for name, run in result.runs.items():
+        print(f"  {name:<12} {run.latency:6.2f}s {'(cached)' if run.cached else ''}")
+    print(f"  Critical path: {' -> '.join(result.critical_path)} ({result.critical_path_latency:.2f}s)")
+    print(f"  Wall time: {result.wall_time:.2f}s (sequential would be {result.sequential_latency:.2f}s)")
+
+result = chain.run({"spec": spec_text})
+print_run("FIRST RUN", result)
+
+# Re-running from a step reuses the memoized upstream outputs (only "commit" calls the model)
+result = chain.run({"spec": spec_text}, rerun_from="commit")
+print_run("RE-RUN FROM 'commit'", result)
+
+schema_json = result.outputs["schema_json"]
+routes = result.outputs["routes"]
+migration = result.outputs["migration"]
+commit = result.outputs["commit"]
 
 
 result_content = f"""# Prompt Chaining Result
@@ -73,13 +103,16 @@ result_content = f"""# Prompt Chaining Result
 ## ROUTES & HANDLERS (Go) (Generated by GPT-5-mini)
 {routes}
 
+## MIGRATION (PostgreSQL)
+{migration}
+
 ## COMMIT (Generated by GPT-4o-mini)
 {commit}
 
 ---
 **Pipeline Models:**
 - Step 1: GPT-3.5-turbo
-- Step 2: GPT-5-mini
+- Step 2: GPT-5-mini (routes) and migration, in parallel
 - Step 3: GPT-4o-mini  
 
 """
@@ -2,4 +2,14 @@
 Utilitários para Prompt Engineering com LangChain
 """
 
-from .prompt_helpers import *
\ No newline at end of file
+from .prompt_helpers import *
+from .fake_chat_model import *
+from .self_consistency import *
+from .tree_of_thought import *
+from .skeleton_of_thought import *
+from .prompt_dag import *
+from .log_classifier import *
+from .example_selector import *
+from .response_cache import *
+
+# model_factory e rate_limit são importados explicitamente (carregam httpx e langchain_openai)
\ No newline at end of file
@@ -0,0 +1,141 @@
+"""
+Seleção semântica de exemplos few-shot com índice vetorial local (NumPy / memmap)
+"""
+
+import hashlib
+import json
+import os
+import re
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+from langchain_core.example_selectors import BaseExampleSelector
+
+# Any callable mapping a list of texts to an (n, dim) array, e.g.
+# lambda texts: np.array(OpenAIEmbeddings().embed_documents(texts))
+Embedder = Callable[[Sequence[str]], np.ndarray]
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=1 << 20)
+def _feature_hash(feature: str) -> int:
+    # Words repeat across texts: hash each distinct feature once
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class HashingEmbedder:
+    """
+    Deterministic local embedder (feature hashing), no model or network needed.
+
+    Words and word bigrams are hashed with blake2b into `dim` signed buckets and the
+    vectors are L2-normalized, so the same text always maps to the same vector.
+    With `collapse_digits`, numbers are ignored ("at 85%" and "at 90%" look the same).
+    """
+
+    def __init__(self, dim: int = 512, use_bigrams: bool = True, collapse_digits: bool = True):
+        self.dim = dim
+        self.use_bigrams = use_bigrams
+        self.collapse_digits = collapse_digits
+
+    def _features(self, text: str) -> List[str]:
+        text = text.lower()
+        if self.collapse_digits:
+            # Digits collapse to "0" so "Disk usage at 85%" and "at 90%" share features
+            text = re.sub(r"\d+", "0", text)
+        words = TOKEN_PATTERN.findall(text)
+        features = list(words)
+        if self.use_bigrams:
+            features += [f"{a} {b}" for a, b in zip(words, words[1:])]
+        return features
+
+    def __call__(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        rows: List[int] = []
+        hashes: List[int] = []
+        for row, text in enumerate(texts):
+            features = self._features(text)
+            rows.extend([row] * len(features))
+            hashes.extend(_feature_hash(feature) for feature in features)
+        values = np.array(hashes, dtype=np.uint64)
+        signs = np.where((values >> np.uint64(63)) & np.uint64(1), 1.0, -1.0).astype(np.float32)
+        np.add.at(vectors, (np.array(rows, dtype=np.intp), (values % np.uint64(self.dim)).astype(np.intp)), signs)
+        return normalize_rows(vectors)
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize each row (zero rows stay zero), so dot product = cosine similarity"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+class SemanticExampleSelector(BaseExampleSelector):
+    """
+    Picks the `k` examples most similar to the input from a large pool.
+
+    The pool is embedded once into a normalized float32 matrix (optionally memory-mapped
+    from disk), and each selection is a single matrix-vector product followed by an
+    `argpartition`, so the cost per input does not depend on calling the embedder for
+    the pool again.
+    """
+
+    def __init__(
+        self,
+        examples: Sequence[Dict[str, str]],
+        embedder: Optional[Embedder] = None,
+        k: int = 4,
+        input_key: str = "input",
+        vectors: Optional[np.ndarray] = None,
+    ):
+        self.examples: List[Dict[str, str]] = list(examples)
+        self.embedder = embedder or HashingEmbedder()
+        self.k = k
+        self.input_key = input_key
+        if vectors is None:
+            vectors = normalize_rows(self.embedder([example[input_key] for example in self.examples]))
+        if len(vectors) != len(self.examples):
+            raise ValueError(f"{len(vectors)} vectors for {len(self.examples)} examples")
+        self.vectors = vectors
+
+    def add_example(self, example: Dict[str, str]) -> None:
+        # Copies the matrix (and detaches it from a memmap); prefer building the pool at once
+        self.examples.append(example)
+        self.vectors = np.vstack([self.vectors, normalize_rows(self.embedder([example[self.input_key]]))])
+
+    def top_k(self, text: str, k: Optional[int] = None) -> List[int]:
+        """Indices of the most similar examples, best first"""
+        return self.top_k_many([text], k)[0]
+
+    def top_k_many(self, texts: Sequence[str], k: Optional[int] = None) -> List[List[int]]:
+        """Top-k for several inputs with one matrix product"""
+        k = min(k or self.k, len(self.examples))
+        if k == 0:
+            return [[] for _ in texts]
+        scores = normalize_rows(self.embedder(texts)) @ self.vectors.T
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        ordered = np.take_along_axis(
+            candidates, np.argsort(-np.take_along_axis(scores, candidates, axis=1), axis=1, kind="stable"), axis=1
+        )
+        return ordered.tolist()
+
+    def select_examples(self, input_variables: Dict[str, str]) -> List[dict]:
+        return [self.examples[i] for i in self.top_k(input_variables[self.input_key])]
+
+    def save(self, directory: str) -> None:
+        """Write the vectors as .npy (memory-mappable) and the examples as JSON"""
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "vectors.npy"), np.ascontiguousarray(self.vectors, dtype=np.float32))
+        with open(os.path.join(directory, "examples.json"), "w", encoding="utf-8") as f:
+            json.dump({"input_key": self.input_key, "examples": self.examples}, f, ensure_ascii=False)
+
+    @classmethod
+    def load(
+        cls, directory: str, embedder: Optional[Embedder] = None, k: int = 4, mmap: bool = True
+    ) -> "SemanticExampleSelector":
+        """Load a saved pool; with `mmap` the vectors stay on disk and are paged in on demand"""
+        with open(os.path.join(directory, "examples.json"), encoding="utf-8") as f:
+            data = json.load(f)
+        vectors = np.load(os.path.join(directory, "vectors.npy"), mmap_mode="r" if mmap else None)
+        return cls(data["examples"], embedder=embedder, k=k, input_key=data["input_key"], vectors=vectors)
@@ -0,0 +1,199 @@
+"""
+Classificação de logs em lote: várias linhas por prompt, saída estruturada por linha
+"""
+
+import re
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import PromptTemplate
+
+DEFAULT_LABELS = ("ERROR", "WARNING", "INFO")
+
+DEFAULT_LOG_EXAMPLES = [
+    ("Database connection lost at 10:34.", "ERROR"),
+    ("Disk usage at 85%.", "WARNING"),
+    ("Database response time is above the threshold at 30ms", "WARNING"),
+    ("User logged in successfully.", "INFO"),
+]
+
+BATCH_PROMPT = PromptTemplate.from_template(
+    """Classify the severity of each log line as one of: {labels}.
+
+Examples:
+{examples}
+
+Reply with exactly one line per log, in the format "<id>: <LABEL>", and nothing else.
+
+Logs:
+{lines}
+"""
+)
+
+SINGLE_PROMPT = PromptTemplate.from_template(
+    """Classify the log severity as one of: {labels}.
+
+Examples:
+{examples}
+
+Now classify:
+Input: "{line}"
+Output:"""
+)
+
+RESULT_PATTERN = re.compile(r"^\s*\[?(\d+)\]?\s*[:.)\-]\s*\**([A-Za-z]+)")
+
+
+def approximate_token_count(text: str) -> int:
+    """Cheap token estimate (~4 characters per token), good enough for budgeting"""
+    return len(text) // 4 + 1
+
+
+def parse_batch_output(text: str, labels: Sequence[str] = DEFAULT_LABELS) -> Dict[int, str]:
+    """`{id: LABEL}` for every well-formed "<id>: <LABEL>" line with a known label"""
+    results: Dict[int, str] = {}
+    for line in text.splitlines():
+        match = RESULT_PATTERN.match(line)
+        if match and match.group(2).upper() in labels:
+            results[int(match.group(1))] = match.group(2).upper()
+    return results
+
+
+def parse_single_output(text: str, labels: Sequence[str] = DEFAULT_LABELS) -> Optional[str]:
+    """First known label mentioned in a single-line answer"""
+    match = re.search(r"\b(" + "|".join(labels) + r")\b", text.upper())
+    return match.group(1) if match else None
+
+
+@dataclass
+class LogClassification:
+    """Label of one input line; `batched` is False when it came from the single-line fallback"""
+    index: int
+    line: str
+    label: Optional[str]
+    batched: bool = True
+
+
+@dataclass
+class ClassifierStats:
+    lines: int = 0
+    batches: int = 0
+    failed_batches: int = 0
+    fallbacks: int = 0
+    unparsed: int = 0
+
+
+class BatchLogClassifier:
+    """
+    Few-shot log classifier that packs many lines into each prompt.
+
+    Lines are grouped into batches whose estimated prompt + answer size fits
+    `token_budget`, batches run concurrently, and the "<id>: <LABEL>" answers are
+    mapped back to the input order. Lines missing from (or unparseable in) a batch
+    answer, and every line of a batch whose call failed, fall back to one call each.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        examples: Sequence[Tuple[str, str]] = DEFAULT_LOG_EXAMPLES,
+        labels: Sequence[str] = DEFAULT_LABELS,
+        token_budget: int = 2000,
+        max_lines_per_batch: int = 100,
+        max_concurrency: int = 8,
+        tokens_per_answer: int = 4,
+        length_function: Callable[[str], int] = approximate_token_count,
+    ):
+        self.labels = tuple(labels)
+        self.token_budget = token_budget
+        self.max_lines_per_batch = max_lines_per_batch
+        self.max_concurrency = max_concurrency
+        self.tokens_per_answer = tokens_per_answer
+        self.length_function = length_function
+        self.stats = ClassifierStats()
+
+        self._examples = "\n".join(f'Input: "{line}"\nOutput: {label}' for line, label in examples)
+        self._batch_chain = BATCH_PROMPT | model | StrOutputParser()
+        self._single_chain = SINGLE_PROMPT | model | StrOutputParser()
+        self._base_tokens = length_function(
+            BATCH_PROMPT.format(labels=", ".join(self.labels), examples=self._examples, lines="")
+        )
+
+    def _line_cost(self, number: int, line: str) -> int:
+        return self.length_function(f"{number}. {line}\n") + self.tokens_per_answer
+
+    def pack_batches(self, lines: Iterable[Tuple[int, str]]) -> Iterator[List[Tuple[int, str]]]:
+        """Group (index, line) pairs into batches capped by the token budget"""
+        batch: List[Tuple[int, str]] = []
+        used = self._base_tokens
+        for index, line in lines:
+            cost = self._line_cost(len(batch) + 1, line)
+            if batch and (used + cost > self.token_budget or len(batch) >= self.max_lines_per_batch):
+                yield batch
+                batch, used = [], self._base_tokens
+                cost = self._line_cost(1, line)
+            batch.append((index, line))
+            used += cost
+        if batch:
+            yield batch
+
+    def _batch_input(self, batch: List[Tuple[int, str]]) -> Dict[str, str]:
+        numbered = "\n".join(f"{number}. {line}" for number, (_, line) in enumerate(batch, 1))
+        return {"labels": ", ".join(self.labels), "examples": self._examples, "lines": numbered}
+
+    def _classify_window(self, batches: List[List[Tuple[int, str]]]) -> List[LogClassification]:
+        outputs = self._batch_chain.batch(
+            [self._batch_input(batch) for batch in batches],
+            config={"max_concurrency": self.max_concurrency},
+            return_exceptions=True,
+        )
+
+        results: List[LogClassification] = []
+        retry: List[LogClassification] = []
+        for batch, output in zip(batches, outputs):
+            self.stats.batches += 1
+            if isinstance(output, Exception):
+                self.stats.failed_batches += 1
+                parsed: Dict[int, str] = {}
+            else:
+                parsed = parse_batch_output(output, self.labels)
+            for number, (index, line) in enumerate(batch, 1):
+                item = LogClassification(index=index, line=line, label=parsed.get(number))
+                if item.label is None:
+                    item.batched = False
+                    retry.append(item)
+                results.append(item)
+
+        if retry:
+            # Fallback: one call per line the batch answer did not cover
+            answers = self._single_chain.batch(
+                [{"labels": ", ".join(self.labels), "examples": self._examples, "line": item.line} for item in retry],
+                config={"max_concurrency": self.max_concurrency},
+                return_exceptions=True,
+            )
+            self.stats.fallbacks += len(retry)
+            for item, answer in zip(retry, answers):
+                item.label = None if isinstance(answer, Exception) else parse_single_output(answer, self.labels)
+                if item.label is None:
+                    self.stats.unparsed += 1
+
+        self.stats.lines += len(results)
+        return results
+
+    def classify_stream(self, lines: Iterable[str]) -> Iterator[LogClassification]:
+        """
+        Classify a (possibly unbounded) stream of lines, yielding results in input order.
+
+        Only `max_concurrency` batches are held in memory at a time.
+        """
+        batches = self.pack_batches((index, line.rstrip("\n")) for index, line in enumerate(lines))
+        while True:
+            window = list(islice(batches, self.max_concurrency))
+            if not window:
+                break
+            yield from self._classify_window(window)
+
+    def classify(self, lines: Iterable[str]) -> List[LogClassification]:
+        return list(self.classify_stream(lines))
@@ -0,0 +1,186 @@
+"""
+Prompt chaining como DAG: passos nomeados, dependências inferidas pelas chaves de entrada
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+
+@dataclass
+class Step:
+    """
+    A named step of the chain.
+
+    `inputs` are the keys the runnable receives; each one is either an initial input
+    of the run or the `output_key` of another step (defaults to the step name).
+    """
+    name: str
+    runnable: Any
+    inputs: List[str]
+    output_key: Optional[str] = None
+
+    def __post_init__(self):
+        if self.output_key is None:
+            self.output_key = self.name
+
+
+@dataclass
+class StepRun:
+    """Timing of one step in a run (relative to the start of the run)"""
+    name: str
+    started: float
+    finished: float
+    cached: bool
+
+    @property
+    def latency(self) -> float:
+        return self.finished - self.started
+
+
+@dataclass
+class DAGResult:
+    """Outputs (initial inputs + every step output) and how the run went"""
+    outputs: Dict[str, Any]
+    runs: Dict[str, StepRun] = field(default_factory=dict)
+    critical_path: List[str] = field(default_factory=list)
+    critical_path_latency: float = 0.0
+    wall_time: float = 0.0
+
+    @property
+    def sequential_latency(self) -> float:
+        """What the same steps would have taken one after another"""
+        return sum(run.latency for run in self.runs.values())
+
+
+class PromptDAG:
+    """
+    Executor for a chain declared as a DAG of steps.
+
+    Dependencies are inferred from the input keys, independent steps run concurrently
+    and every step output is memoized by the values of its inputs, so running again
+    only recomputes what changed. `rerun_from` forces a step and everything
+    downstream of it to run again while the upstream results come from the cache.
+    """
+
+    def __init__(self, steps: Iterable[Step], max_concurrency: int = 8):
+        self.steps: Dict[str, Step] = {}
+        producers: Dict[str, str] = {}
+        for step in steps:
+            if step.name in self.steps:
+                raise ValueError(f"Duplicate step name: {step.name}")
+            if step.output_key in producers:
+                raise ValueError(f"Output key '{step.output_key}' produced by more than one step")
+            self.steps[step.name] = step
+            producers[step.output_key] = step.name
+
+        self.dependencies: Dict[str, List[str]] = {
+            name: [producers[key] for key in step.inputs if key in producers]
+            for name, step in self.steps.items()
+        }
+        self.external_inputs: Set[str] = {
+            key for step in self.steps.values() for key in step.inputs if key not in producers
+        }
+        self.order = self._topological_order()
+        self.max_concurrency = max_concurrency
+        self._cache: Dict[str, Dict[str, Any]] = {name: {} for name in self.steps}
+
+    def _topological_order(self) -> List[str]:
+        order: List[str] = []
+        state: Dict[str, str] = {}
+
+        def visit(name: str, path: List[str]) -> None:
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Cycle between steps: {' -> '.join(path + [name])}")
+            state[name] = "visiting"
+            for dependency in self.dependencies[name]:
+                visit(dependency, path + [name])
+            state[name] = "done"
+            order.append(name)
+
+        for name in self.steps:
+            visit(name, [])
+        return order
+
+    def downstream(self, name: str) -> Set[str]:
+        """The step itself and every step that (transitively) depends on it"""
+        if name not in self.steps:
+            raise KeyError(f"Unknown step: {name}")
+        affected = {name}
+        for candidate in self.order:
+            if any(dependency in affected for dependency in self.dependencies[candidate]):
+                affected.add(candidate)
+        return affected
+
+    def clear_cache(self) -> None:
+        for cache in self._cache.values():
+            cache.clear()
+
+    @staticmethod
+    def _cache_key(values: Dict[str, Any]) -> str:
+        payload = json.dumps(values, sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _critical_path(self, runs: Dict[str, StepRun]) -> Tuple[List[str], float]:
+        # Longest chain of step latencies through the dependency graph
+        best: Dict[str, Tuple[float, List[str]]] = {}
+        for name in self.order:
+            upstream = max((best[dep] for dep in self.dependencies[name]), key=lambda item: item[0], default=(0.0, []))
+            best[name] = (upstream[0] + runs[name].latency, upstream[1] + [name])
+        latency, path = max(best.values(), key=lambda item: item[0], default=(0.0, []))
+        return path, latency
+
+    async def arun(self, inputs: Dict[str, Any], rerun_from: Optional[str] = None) -> DAGResult:
+        missing = self.external_inputs - inputs.keys()
+        if missing:
+            raise ValueError(f"Missing inputs: {sorted(missing)}")
+
+        forced = self.downstream(rerun_from) if rerun_from else set()
+        outputs: Dict[str, Any] = dict(inputs)
+        runs: Dict[str, StepRun] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        start = time.perf_counter()
+
+        async def execute(name: str) -> None:
+            step = self.steps[name]
+            await asyncio.gather(*(tasks[dependency] for dependency in self.dependencies[name]))
+            values = {key: outputs[key] for key in step.inputs}
+            key = self._cache_key(values)
+            cache = self._cache[name]
+
+            started = time.perf_counter() - start
+            cached = name not in forced and key in cache
+            if not cached:
+                async with semaphore:
+                    started = time.perf_counter() - start
+                    cache[key] = await step.runnable.ainvoke(values)
+            outputs[step.output_key] = cache[key]
+            runs[name] = StepRun(name=name, started=started, finished=time.perf_counter() - start, cached=cached)
+
+        # Steps are created in topological order, so every dependency task already exists
+        for name in self.order:
+            tasks[name] = asyncio.create_task(execute(name))
+        try:
+            await asyncio.gather(*tasks.values())
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+        critical_path, critical_latency = self._critical_path(runs)
+        return DAGResult(
+            outputs=outputs,
+            runs=runs,
+            critical_path=critical_path,
+            critical_path_latency=critical_latency,
+            wall_time=time.perf_counter() - start,
+        )
+
+    def run(self, inputs: Dict[str, Any], rerun_from: Optional[str] = None) -> DAGResult:
+        """Sync wrapper around arun for scripts"""
+        return asyncio.run(self.arun(inputs, rerun_from))
@@ -3,11 +3,15 @@ Funções auxiliares para Prompt Engineering
 """
 
 import os
-from pydantic import SecretStr
-import os
-from typing import Dict, List, Any
-from dotenv import load_dotenv
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Dict, List, Any, Optional, Sequence, Tuple
 
+from dotenv import load_dotenv
+from pydantic import SecretStr
 from rich.console import Console
 from rich.text import Text
 
@@ -39,9 +43,11 @@ def validate_environment() -> bool:
     print("✅ Todas as variáveis de ambiente estão configuradas")
     return True
 
-def print_llm_result(prompt, response):
+def print_llm_result(prompt, response, cache=None):
     """
-    Print LLM prompt, response and token usage with colored formatting
+    Print LLM prompt, response and token usage with colored formatting.
+    Cache hits are flagged; pass the ResponseCache to also print its hit rate
+    and the tokens saved so far
     """
     console = Console()
     
@@ -54,11 +60,103 @@ def print_llm_result(prompt, response):
     console.print(Text(response.content, style="bold blue"), end="\n\n")
     
     # Print token usage
-    usage = response.response_metadata['token_usage']
+    _print_token_usage(console, response)
+    _print_cache_info(console, response, cache)
+    console.print(f"[yellow]{'-'*50} [/yellow]")
+
+def _print_cache_info(console: Console, response, cache=None) -> None:
+    tier = response.response_metadata.get('cache_hit')
+    if tier == 'semantic':
+        similarity = response.response_metadata.get('cache_similarity', 0.0)
+        console.print(f"[bold white]Cache:[/bold white] [bright_black]semantic hit (similarity {similarity:.3f}), tokens not billed[/bright_black]")
+    elif tier:
+        console.print("[bold white]Cache:[/bold white] [bright_black]exact hit, tokens not billed[/bright_black]")
+    elif cache is not None:
+        console.print("[bold white]Cache:[/bold white] [bright_black]miss[/bright_black]")
+    if cache is not None:
+        stats = cache.stats
+        console.print(
+            f"[bold white]Cache hit rate:[/bold white] [bright_black]{stats.hit_rate:.0%} "
+            f"({stats.exact_hits} exact, {stats.semantic_hits} semantic, {stats.misses} misses)"
+            f" | tokens saved: {stats.saved_tokens}[/bright_black]"
+        )
+
+def _print_token_usage(console: Console, response) -> None:
+    usage = response.response_metadata.get('token_usage')
+    if usage is None and getattr(response, 'usage_metadata', None):
+        # Streamed responses only carry the LangChain usage_metadata
+        meta = response.usage_metadata
+        usage = {
+            'prompt_tokens': meta['input_tokens'],
+            'completion_tokens': meta['output_tokens'],
+            'total_tokens': meta['total_tokens'],
+        }
+    if usage is None:
+        console.print("[bold white]Token usage:[/bold white] [bright_black]not reported[/bright_black]")
+        return
     console.print(f"[bold white]Input tokens:[/bold white] [bright_black]{usage['prompt_tokens']}[/bright_black]")
     console.print(f"[bold white]Output tokens:[/bold white] [bright_black]{usage['completion_tokens']}[/bright_black]")
     console.print(f"[bold white]Total tokens:[/bold white] [bright_black]{usage['total_tokens']}[/bright_black]")
+
+@dataclass
+class StreamMetrics:
+    """Latency of a streamed response: time to first token and gaps between tokens"""
+    response: Any = None
+    time_to_first_token: Optional[float] = None
+    total_time: float = 0.0
+    inter_token_latencies: List[float] = field(default_factory=list)
+
+    @property
+    def mean_inter_token_latency(self) -> float:
+        gaps = self.inter_token_latencies
+        return sum(gaps) / len(gaps) if gaps else 0.0
+
+    @property
+    def p95_inter_token_latency(self) -> float:
+        if not self.inter_token_latencies:
+            return 0.0
+        ordered = sorted(self.inter_token_latencies)
+        return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+def stream_llm_result(prompt, model, messages=None) -> StreamMetrics:
+    """
+    Streaming variant of print_llm_result: renders tokens as they arrive through
+    `model.stream`, then prints time-to-first-token, inter-token latency and token usage
+    """
+    console = Console()
+
+    console.print(Text("USER PROMPT:", style="bold green"))
+    console.print(Text(str(prompt), style="bold blue"), end="\n\n")
+    console.print(Text("LLM RESPONSE:", style="bold green"))
+
+    # ChatOpenAI only sends token usage in a stream when asked to
+    kwargs = {"stream_usage": True} if "stream_usage" in getattr(type(model), "model_fields", {}) else {}
+    metrics = StreamMetrics()
+    start = last = time.perf_counter()
+    for chunk in model.stream(messages if messages is not None else prompt, **kwargs):
+        now = time.perf_counter()
+        if chunk.content:
+            if metrics.time_to_first_token is None:
+                metrics.time_to_first_token = now - start
+            else:
+                metrics.inter_token_latencies.append(now - last)
+            last = now
+            console.print(Text(str(chunk.content), style="bold blue"), end="")
+        metrics.response = chunk if metrics.response is None else metrics.response + chunk
+    metrics.total_time = time.perf_counter() - start
+    console.print("\n")
+
+    ttft = metrics.time_to_first_token
+    console.print(f"[bold white]Time to first token:[/bold white] [bright_black]{f'{ttft * 1000:.0f} ms' if ttft is not None else 'n/a'}[/bright_black]")
+    console.print(
+        f"[bold white]Inter-token latency:[/bold white] [bright_black]mean {metrics.mean_inter_token_latency * 1000:.1f} ms"
+        f" | p95 {metrics.p95_inter_token_latency * 1000:.1f} ms[/bright_black]"
+    )
+    console.print(f"[bold white]Total time:[/bold white] [bright_black]{metrics.total_time:.2f} s[/bright_black]")
+    if metrics.response is not None:
+        _print_token_usage(console, metrics.response)
     console.print(f"[yellow]{'-'*50} [/yellow]")
+    return metrics
 
 def display_result(title: str, content: Any, separator: str = "="):
     """Exibe resultado formatado"""
@@ -79,4 +177,93 @@ def create_few_shot_examples(examples: List[Dict[str, str]]) -> str:
         formatted_examples.append(f"Output: {example['output']}")
         formatted_examples.append("")
     
-    return "\n".join(formatted_examples)
\ No newline at end of file
+    return "\n".join(formatted_examples)
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        # tiktoken ausente ou sem acesso para baixar o vocabulário
+        return None
+
+def count_tokens(text: str) -> int:
+    """Conta tokens com o tokenizer do gpt-4o (tiktoken) ou estima ~4 caracteres por token"""
+    encoding = _get_encoding()
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text))
+
+class FewShotPromptCache:
+    """
+    Conjunto de exemplos few-shot compilado uma única vez em um prefixo imutável.
+
+    O prefixo (cabeçalho + exemplos no formato de `create_few_shot_examples`) é montado
+    no construtor, tem a contagem de tokens conhecida e é idêntico byte a byte entre
+    chamadas, o que permite ao provedor reaproveitar o cache de prompt. `build` apenas
+    concatena o prefixo com a entrada.
+    """
+
+    # LRU dos conjuntos compilados: cada combinação de exemplos/cabeçalho/sufixo ocupa uma entrada
+    max_compiled = 128
+    _compiled: "OrderedDict[Tuple, FewShotPromptCache]" = OrderedDict()
+    _compiled_lock = threading.Lock()
+
+    def __init__(
+        self,
+        examples: Sequence[Dict[str, str]],
+        header: str = "",
+        suffix_template: str = "Input: {input}\nOutput:",
+        length_function: Callable[[str], int] = count_tokens,
+    ):
+        if suffix_template.count("{input}") != 1:
+            raise ValueError("suffix_template deve conter {input} exatamente uma vez")
+
+        self.examples: Tuple[Tuple[Tuple[str, str], ...], ...] = tuple(
+            tuple(sorted(example.items())) for example in examples
+        )
+        prefix = create_few_shot_examples(list(examples)).rstrip("\n") + "\n\n"
+        if header:
+            prefix = f"{header.rstrip()}\n\n{prefix}"
+        # Quebras de linha normalizadas: o mesmo conjunto gera sempre os mesmos bytes
+        self._prefix = prefix.replace("\r\n", "\n")
+        self._prefix_bytes = self._prefix.encode("utf-8")
+        self._suffix_head, self._suffix_tail = suffix_template.split("{input}")
+        self.prefix_tokens = length_function(self._prefix)
+        self._length_function = length_function
+
+    @classmethod
+    def compile(
+        cls,
+        examples: Sequence[Dict[str, str]],
+        header: str = "",
+        suffix_template: str = "Input: {input}\nOutput:",
+    ) -> "FewShotPromptCache":
+        """Reaproveita o prefixo já compilado para o mesmo conjunto de exemplos (até `max_compiled` conjuntos)"""
+        key = (tuple(tuple(sorted(example.items())) for example in examples), header, suffix_template)
+        with cls._compiled_lock:
+            compiled = cls._compiled.get(key)
+            if compiled is None:
+                compiled = cls._compiled[key] = cls(examples, header, suffix_template)
+                while len(cls._compiled) > cls.max_compiled:
+                    cls._compiled.popitem(last=False)
+            else:
+                cls._compiled.move_to_end(key)
+            return compiled
+
+    @property
+    def prefix(self) -> str:
+        return self._prefix
+
+    @property
+    def prefix_bytes(self) -> bytes:
+        return self._prefix_bytes
+
+    def build(self, input_text: str) -> str:
+        """Prompt completo: prefixo compilado + entrada"""
+        return self._prefix + self._suffix_head + input_text + self._suffix_tail
+
+    def count_prompt_tokens(self, input_text: str) -> int:
+        """Tokens do prompt sem re-tokenizar o prefixo"""
+        return self.prefix_tokens + self._length_function(self._suffix_head + input_text + self._suffix_tail)
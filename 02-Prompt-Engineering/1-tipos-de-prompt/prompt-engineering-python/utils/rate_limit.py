@@ -0,0 +1,189 @@
+"""
+Limite de requisições/tokens por minuto (token bucket) e concorrência adaptativa (AIMD)
+"""
+
+import asyncio
+import json
+import threading
+import time
+from typing import Optional
+
+import httpx
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at `per_minute / 60` units per second.
+
+    `reserve` takes the units right away (the balance may go negative) and returns
+    how long the caller must wait, so sync and async callers share the same bucket.
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self._available = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1.0) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._available = min(self.capacity, self._available + (now - self._updated) * self.rate)
+            self._updated = now
+            # A request bigger than the bucket would wait forever: cap it at the capacity
+            self._available -= min(amount, self.capacity)
+            return 0.0 if self._available >= 0 else -self._available / self.rate
+
+    def acquire(self, amount: float = 1.0) -> None:
+        wait = self.reserve(amount)
+        if wait:
+            time.sleep(wait)
+
+    async def aacquire(self, amount: float = 1.0) -> None:
+        wait = self.reserve(amount)
+        if wait:
+            await asyncio.sleep(wait)
+
+
+class AIMDConcurrencyController:
+    """
+    Adaptive concurrency limit: additive increase, multiplicative decrease.
+
+    Every `limit` successful calls raise the limit by one (about +1 per round trip);
+    a throttled call (429) multiplies it by `decrease`. Calls that started before the
+    last decrease are ignored, so one burst of 429s counts as a single signal.
+    """
+
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 64, decrease: float = 0.5):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease = decrease
+        self.in_flight = 0
+        self.throttled = 0
+        self.succeeded = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def try_acquire(self) -> Optional[float]:
+        """Take a slot if one is free; returns the start ticket to pass to `release`"""
+        with self._condition:
+            if self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return time.monotonic()
+            return None
+
+    def acquire(self) -> float:
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+            return time.monotonic()
+
+    async def aacquire(self, poll_interval: float = 0.01) -> float:
+        while True:
+            started = self.try_acquire()
+            if started is not None:
+                return started
+            await asyncio.sleep(poll_interval)
+
+    def release(self, started: float, throttled: bool = False, success: bool = True) -> None:
+        """Free a slot; `throttled` backs off, `success` grows the limit, neither (errors) keeps it"""
+        with self._condition:
+            self.in_flight -= 1
+            if throttled:
+                self.throttled += 1
+                if started >= self._last_decrease:
+                    self.limit = max(self.minimum, self.limit * self.decrease)
+                    self._last_decrease = time.monotonic()
+            elif success:
+                self.succeeded += 1
+                self.limit = min(self.maximum, self.limit + 1.0 / max(self.limit, 1.0))
+            self._condition.notify_all()
+
+
+def estimate_request_tokens(request: httpx.Request, default_completion_tokens: int = 256) -> int:
+    """Tokens a chat completion request will consume: ~4 chars per prompt token + max_tokens"""
+    try:
+        body = json.loads(request.content or b"{}")
+    except (ValueError, TypeError):
+        return default_completion_tokens
+    prompt_chars = sum(len(str(message.get("content", ""))) for message in body.get("messages", []))
+    completion = body.get("max_completion_tokens") or body.get("max_tokens") or default_completion_tokens
+    return prompt_chars // 4 + int(completion)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute buckets plus an optional AIMD controller"""
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        concurrency: Optional[AIMDConcurrencyController] = None,
+    ):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.concurrency = concurrency
+
+    def acquire(self, tokens: int) -> float:
+        """Wait for a concurrency slot and bucket capacity; returns the ticket for `release`"""
+        started = self.concurrency.acquire() if self.concurrency else time.monotonic()
+        if self.requests:
+            self.requests.acquire()
+        if self.tokens:
+            self.tokens.acquire(tokens)
+        return started
+
+    async def aacquire(self, tokens: int) -> float:
+        started = await self.concurrency.aacquire() if self.concurrency else time.monotonic()
+        if self.requests:
+            await self.requests.aacquire()
+        if self.tokens:
+            await self.tokens.aacquire(tokens)
+        return started
+
+    def release(self, started: float, status_code: Optional[int]) -> None:
+        if self.concurrency:
+            self.concurrency.release(
+                started,
+                throttled=status_code == 429,
+                success=status_code is not None and status_code < 400,
+            )
+
+
+class RateLimitedTransport(httpx.HTTPTransport):
+    """httpx transport that waits for the limiter before each request and reports 429s"""
+
+    def __init__(self, limiter: RateLimiter, **kwargs):
+        super().__init__(**kwargs)
+        self.limiter = limiter
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        started = self.limiter.acquire(estimate_request_tokens(request))
+        status = None
+        try:
+            response = super().handle_request(request)
+            status = response.status_code
+            return response
+        finally:
+            self.limiter.release(started, status)
+
+
+class AsyncRateLimitedTransport(httpx.AsyncHTTPTransport):
+    """Async counterpart of RateLimitedTransport"""
+
+    def __init__(self, limiter: RateLimiter, **kwargs):
+        super().__init__(**kwargs)
+        self.limiter = limiter
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = await self.limiter.aacquire(estimate_request_tokens(request))
+        status = None
+        try:
+            response = await super().handle_async_request(request)
+            status = response.status_code
+            return response
+        finally:
+            self.limiter.release(started, status)
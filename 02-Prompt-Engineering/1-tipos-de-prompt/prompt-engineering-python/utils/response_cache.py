@@ -0,0 +1,296 @@
+"""
+Cache de respostas em duas camadas (exata e semântica) na frente do chat model
+"""
+
+import contextvars
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.outputs import ChatGeneration, Generation
+
+from .example_selector import Embedder, HashingEmbedder, normalize_rows
+
+_bypass: contextvars.ContextVar[Optional[bool]] = contextvars.ContextVar("response_cache_bypass", default=None)
+
+
+def _messages(prompt: str) -> Optional[List[Tuple[str, str]]]:
+    """(role, content) pairs of a serialized chat prompt, None for a plain-text prompt"""
+    try:
+        messages = json.loads(prompt)
+    except ValueError:
+        return None
+    if not isinstance(messages, list):
+        return None
+    pairs = []
+    for message in messages:
+        kwargs = message.get("kwargs", {}) if isinstance(message, dict) else {}
+        role = kwargs.get("type") or (message.get("id") or ["message"])[-1]
+        content = kwargs.get("content", "")
+        if not isinstance(content, str):
+            content = json.dumps(content, sort_keys=True)
+        pairs.append((role, " ".join(content.split())))
+    return pairs
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Canonical text of a cached prompt: one "role: content" line per message with
+    whitespace collapsed, so re-indented or re-wrapped prompts map to the same key.
+    """
+    messages = _messages(prompt)
+    if messages is None:
+        return " ".join(prompt.split())
+    return "\n".join(f"{role}: {content}" for role, content in messages)
+
+
+def split_query(prompt: str) -> Tuple[str, str]:
+    """
+    Split a cached prompt into (context, query). The query is the last human message
+    (what the template variables filled in); the context is every other message
+    (system prompt, few-shot examples, history). A plain-text prompt is all query.
+    """
+    messages = _messages(prompt)
+    if messages is None:
+        return "", " ".join(prompt.split())
+    for position in range(len(messages) - 1, -1, -1):
+        role, content = messages[position]
+        if role in ("human", "HumanMessage"):
+            context = messages[:position] + messages[position + 1:]
+            return "\n".join(f"{r}: {c}" for r, c in context), content
+    return normalize_prompt(prompt), ""
+
+
+def generation_tokens(generations: Sequence[Generation]) -> int:
+    """Total tokens reported for a cached answer (what a hit saves)"""
+    total = 0
+    for generation in generations:
+        message = getattr(generation, "message", None)
+        if message is None:
+            continue
+        usage = message.response_metadata.get("token_usage") or {}
+        if usage.get("total_tokens"):
+            total += usage["total_tokens"]
+        elif getattr(message, "usage_metadata", None):
+            total += message.usage_metadata.get("total_tokens", 0)
+    return total
+
+
+@dataclass
+class CacheStats:
+    exact_hits: int = 0
+    semantic_hits: int = 0
+    misses: int = 0
+    bypassed: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    saved_tokens: int = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.exact_hits + self.semantic_hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return (self.exact_hits + self.semantic_hits) / self.lookups if self.lookups else 0.0
+
+
+@dataclass
+class _Entry:
+    scope: str
+    query: str
+    generations: List[Generation]
+    created: float
+    tokens: int
+    row: int = -1
+
+
+class ResponseCache(BaseCache):
+    """
+    LangChain cache with an exact tier and a semantic tier, e.g.
+    `ChatOpenAI(..., cache=ResponseCache())` or `get_chat_model(cache=...)`.
+
+    The exact tier is a dict keyed by the hash of the normalized messages plus the
+    model parameters (`llm_string`). The semantic tier is opt-in: with a
+    `similarity_threshold`, an exact miss compares the embedding of the last human
+    message with the cached ones that share the same model parameters and the same
+    other messages (system prompt, few-shot examples, history), so two few-shot
+    prompts that differ only in their input never match each other by accident.
+
+    Pass a real `embedder` for paraphrases. The default HashingEmbedder is lexical:
+    "capital do Chile" and "capital do Brasil" share most of their words, so it only
+    suits near-identical wording with a threshold close to 1.
+
+    Entries expire after `ttl_seconds` and the least recently used ones are evicted
+    beyond `max_entries`. Inside `with cache.bypass():` lookups are skipped and the
+    fresh answers replace the cached ones.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl_seconds: Optional[float] = None,
+        similarity_threshold: Optional[float] = None,
+        embedder: Optional[Embedder] = None,
+        dim: int = 512,
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        # Numbers matter in prompts ("CPU at 15%" vs "CPU at 95%"): keep them apart
+        self.embedder = embedder or HashingEmbedder(dim=dim, collapse_digits=False)
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.RLock()
+        # Semantic index: one row per entry, rows of evicted entries are reused
+        self._vectors: Optional[np.ndarray] = None
+        self._row_group = np.full(max_entries, -1, dtype=np.int64)
+        self._row_created = np.zeros(max_entries, dtype=np.float64)
+        self._row_keys: List[Optional[str]] = [None] * max_entries
+        self._free_rows = list(range(max_entries - 1, -1, -1))
+        self._groups: Dict[str, int] = {}
+
+    # A property, not __len__: LangChain tests `model.cache` for truthiness, an empty cache must not disable itself
+    @property
+    def size(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(text: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\x00{text}".encode("utf-8")).hexdigest()
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created > self.ttl_seconds
+
+    @contextmanager
+    def bypass(self, refresh: bool = True) -> Iterator[None]:
+        """Skip the cache for the calls made in this block; `refresh` stores their answers"""
+        token = _bypass.set(refresh)
+        try:
+            yield
+        finally:
+            _bypass.reset(token)
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        with self._lock:
+            if _bypass.get() is not None:
+                self.stats.bypassed += 1
+                return None
+            now = time.monotonic()
+            key = self._key(normalize_prompt(prompt), llm_string)
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry.created, now):
+                self._remove(key)
+                self.stats.expirations += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats.exact_hits += 1
+                self.stats.saved_tokens += entry.tokens
+                return self._mark(entry.generations, "exact", 1.0)
+
+            match = self._semantic_match(prompt, llm_string, now)
+            if match is not None:
+                key, similarity = match
+                entry = self._entries[key]
+                self._entries.move_to_end(key)
+                self.stats.semantic_hits += 1
+                self.stats.saved_tokens += entry.tokens
+                return self._mark(entry.generations, "semantic", similarity)
+            self.stats.misses += 1
+            return None
+
+    @staticmethod
+    def _scope(context: str, llm_string: str) -> str:
+        """Semantic matches only happen between prompts with the same scope"""
+        return hashlib.sha256(f"{llm_string}\x00{context}".encode("utf-8")).hexdigest()
+
+    def _semantic_match(self, prompt: str, llm_string: str, now: float) -> Optional[Tuple[str, float]]:
+        if self.similarity_threshold is None or self._vectors is None:
+            return None
+        context, query = split_query(prompt)
+        group = self._groups.get(self._scope(context, llm_string))
+        if group is None or not query:
+            return None
+        scores = self._vectors @ normalize_rows(self.embedder([query]))[0]
+        valid = self._row_group == group
+        if self.ttl_seconds is not None:
+            valid &= self._row_created >= now - self.ttl_seconds
+        scores = np.where(valid, scores, -np.inf)
+        row = int(np.argmax(scores))
+        if scores[row] < self.similarity_threshold:
+            return None
+        return self._row_keys[row], float(scores[row])  # type: ignore[return-value]
+
+    @staticmethod
+    def _mark(generations: List[Generation], tier: str, similarity: float) -> List[Generation]:
+        # Copies: callers may mutate the returned messages
+        marked: List[Generation] = []
+        for generation in generations:
+            if isinstance(generation, ChatGeneration):
+                message = generation.message.model_copy(update={"response_metadata": {
+                    **generation.message.response_metadata,
+                    "cache_hit": tier,
+                    "cache_similarity": round(similarity, 4),
+                }})
+                marked.append(ChatGeneration(message=message, generation_info=generation.generation_info))
+            else:
+                marked.append(generation.model_copy())
+        return marked
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        with self._lock:
+            if _bypass.get() is False:
+                return
+            key = self._key(normalize_prompt(prompt), llm_string)
+            if key in self._entries:
+                self._remove(key)
+            while len(self._entries) >= self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.stats.evictions += 1
+            context, query = split_query(prompt)
+            entry = _Entry(self._scope(context, llm_string), query, list(return_val),
+                           time.monotonic(), generation_tokens(return_val))
+            self._entries[key] = entry
+            if self.similarity_threshold is not None and query:
+                self._index(key, entry)
+
+    def _index(self, key: str, entry: _Entry) -> None:
+        vector = normalize_rows(self.embedder([entry.query]))[0]
+        if self._vectors is None:
+            self._vectors = np.zeros((self.max_entries, len(vector)), dtype=np.float32)
+        row = self._free_rows.pop()
+        self._vectors[row] = vector
+        self._row_group[row] = self._groups.setdefault(entry.scope, len(self._groups))
+        self._row_created[row] = entry.created
+        self._row_keys[row] = key
+        entry.row = row
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        if entry.row >= 0:
+            self._row_group[entry.row] = -1
+            self._row_keys[entry.row] = None
+            self._free_rows.append(entry.row)
+
+    # In-memory only: no need to hop to a thread pool on the async path
+    async def alookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        return self.lookup(prompt, llm_string)
+
+    async def aupdate(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        self.update(prompt, llm_string, return_val)
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key)
+            self._groups.clear()
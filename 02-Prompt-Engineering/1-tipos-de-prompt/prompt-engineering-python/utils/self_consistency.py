@@ -0,0 +1,137 @@
+"""
+Self-consistency com amostras paralelas e votação com parada antecipada
+"""
+
+import asyncio
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.runnables import Runnable
+
+ANSWER_PATTERN = re.compile(r"answer\s*:\s*(.+)", re.IGNORECASE)
+EMPHASIS_PATTERN = re.compile(r"(\*\*|__|`)(.+?)\1")
+
+
+def extract_final_answer(text: str) -> Optional[str]:
+    """
+    Extract and normalize the text after the last "Answer:" marker.
+
+    Normalization lowercases, removes spaces around operators, drops paired markdown
+    emphasis (**x**, __x__, `x`, or *x* around the whole answer), surrounding quotes
+    and trailing punctuation, so "**N + 1.**" and "n+1" count as the same vote. A lone
+    "*" is a multiplication and is kept: "2 * N" and "2*N" are the same vote.
+    """
+    matches = ANSWER_PATTERN.findall(text)
+    if not matches:
+        return None
+    answer = matches[-1].strip().lower()
+    answer = re.sub(r"\s*([+\-*/=])\s*", r"\1", answer)
+    answer = EMPHASIS_PATTERN.sub(r"\2", answer)
+    answer = answer.strip(" \"'.;:!")
+    answer = re.sub(r"^([*_])(\S(?:.*\S)?)\1$", r"\2", answer)
+    answer = re.sub(r"\s+", " ", answer)
+    return answer or None
+
+
+@dataclass
+class SelfConsistencyResult:
+    """Majority answer, how much the samples agree on it and how many were taken"""
+    answer: Optional[str]
+    agreement: float
+    votes: Dict[str, int] = field(default_factory=dict)
+    samples: List[str] = field(default_factory=list)
+    stopped_early: bool = False
+
+
+def _content(output: Any) -> str:
+    return output.content if hasattr(output, "content") else str(output)
+
+
+def _leader_is_safe(votes: Counter, remaining: int) -> bool:
+    """True when no other answer can reach the leader with the samples still to come"""
+    if not votes:
+        return False
+    ranked = votes.most_common(2)
+    leader = ranked[0][1]
+    runner_up = ranked[1][1] if len(ranked) > 1 else 0
+    return leader > runner_up + remaining
+
+
+async def aself_consistency(
+    runnable: Runnable,
+    prompt: Any,
+    n_samples: int = 5,
+    max_concurrency: int = 5,
+    extract: Callable[[str], Optional[str]] = extract_final_answer,
+) -> SelfConsistencyResult:
+    """
+    Take up to `n_samples` independent samples concurrently and majority-vote the answers.
+
+    Sampling stops as soon as the leading answer cannot be overtaken by the samples
+    that are still pending; in-flight calls are cancelled.
+
+    Args:
+        runnable: Model or chain to sample from (use temperature > 0 for diverse paths)
+        prompt: Input passed to `runnable.ainvoke`
+        n_samples: Maximum number of reasoning paths
+        max_concurrency: Maximum number of in-flight LLM calls
+        extract: Function that turns a completion into a normalized answer (or None)
+
+    Returns:
+        SelfConsistencyResult with the voted answer and its agreement score
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def sample() -> str:
+        async with semaphore:
+            return _content(await runnable.ainvoke(prompt))
+
+    tasks = [asyncio.create_task(sample()) for _ in range(n_samples)]
+    votes: Counter = Counter()
+    samples: List[str] = []
+    stopped_early = False
+
+    try:
+        for done in asyncio.as_completed(tasks):
+            try:
+                text = await done
+            except Exception as e:
+                # A failed sample is just a path without an answer
+                text = f"Error: {e}"
+            samples.append(text)
+            answer = extract(text)
+            if answer is not None:
+                votes[answer] += 1
+
+            remaining = n_samples - len(samples)
+            if remaining and _leader_is_safe(votes, remaining):
+                stopped_early = True
+                break
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    if not votes:
+        return SelfConsistencyResult(answer=None, agreement=0.0, samples=samples, stopped_early=stopped_early)
+
+    answer, count = votes.most_common(1)[0]
+    return SelfConsistencyResult(
+        answer=answer,
+        agreement=count / len(samples),
+        votes=dict(votes),
+        samples=samples,
+        stopped_early=stopped_early,
+    )
+
+
+def self_consistency(
+    runnable: Runnable,
+    prompt: Any,
+    n_samples: int = 5,
+    max_concurrency: int = 5,
+    extract: Callable[[str], Optional[str]] = extract_final_answer,
+) -> SelfConsistencyResult:
+    """Sync wrapper around aself_consistency for scripts"""
+    return asyncio.run(aself_consistency(runnable, prompt, n_samples, max_concurrency, extract))
@@ -0,0 +1,141 @@
+"""
+Skeleton-of-Thought em duas fases: esqueleto primeiro, depois expansão paralela dos pontos
+"""
+
+import asyncio
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, List, Optional
+
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import PromptTemplate
+
+SKELETON_PROMPT = PromptTemplate.from_template(
+    """{question}
+
+Output ONLY the skeleton of your answer: {min_points}-{max_points} concise bullet points,
+one per line, each starting with "- ". Do not expand the points."""
+)
+
+EXPAND_PROMPT = PromptTemplate.from_template(
+    """{question}
+
+The answer follows this skeleton:
+{skeleton}
+
+Write ONLY the section for point {index}: "{point}".
+Expand it with clear technical details and examples. Do not cover the other points
+and do not repeat the point title."""
+)
+
+DIRECT_PROMPT = PromptTemplate.from_template("{question}")
+
+BULLET_PATTERN = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+(.+?)\s*$")
+
+
+def parse_skeleton(text: str) -> List[str]:
+    """Bullet points ("- ", "* ", "1. ") of the skeleton, in order"""
+    points = []
+    for line in text.splitlines():
+        match = BULLET_PATTERN.match(line)
+        if match:
+            points.append(match.group(1).strip("*").strip())
+    return points
+
+
+@dataclass
+class SoTSection:
+    """Expanded content of one skeleton point"""
+    index: int
+    point: str
+    content: str
+    elapsed: float
+
+
+@dataclass
+class SoTResult:
+    """Skeleton, expanded sections (in skeleton order) and timings"""
+    skeleton: List[str]
+    sections: List[SoTSection] = field(default_factory=list)
+    skeleton_latency: float = 0.0
+    total_latency: float = 0.0
+
+    @property
+    def answer(self) -> str:
+        """Sections stitched back in skeleton order (a direct answer has no point title)"""
+        return "\n\n".join(
+            f"## {section.point}\n\n{section.content}" if section.point else section.content
+            for section in self.sections
+        )
+
+
+class SkeletonOfThought:
+    """
+    Two-phase Skeleton-of-Thought runner.
+
+    One call produces the skeleton; then every point is expanded by its own concurrent
+    call. Sections can be consumed as they finish with `astream`, and `arun` stitches
+    them back in skeleton order. If the skeleton has no parsable bullet, the question
+    is answered by one direct call instead (a single section without point title).
+    """
+
+    def __init__(self, model: Any, max_concurrency: int = 8, min_points: int = 3, max_points: int = 8):
+        self.skeleton_chain = SKELETON_PROMPT | model | StrOutputParser()
+        self.expand_chain = EXPAND_PROMPT | model | StrOutputParser()
+        self.direct_chain = DIRECT_PROMPT | model | StrOutputParser()
+        self.max_concurrency = max_concurrency
+        self.min_points = min_points
+        self.max_points = max_points
+
+    async def askeleton(self, question: str) -> List[str]:
+        text = await self.skeleton_chain.ainvoke(
+            {"question": question, "min_points": self.min_points, "max_points": self.max_points}
+        )
+        return parse_skeleton(text)[: self.max_points]
+
+    async def astream(self, question: str, skeleton: Optional[List[str]] = None) -> AsyncIterator[SoTSection]:
+        """Yield each section as soon as its expansion finishes (completion order)"""
+        if skeleton is None:
+            skeleton = await self.askeleton(question)
+        start = time.perf_counter()
+        if not skeleton:
+            content = await self.direct_chain.ainvoke({"question": question})
+            yield SoTSection(index=1, point="", content=content.strip(), elapsed=time.perf_counter() - start)
+            return
+
+        skeleton_text = "\n".join(f"{i}. {point}" for i, point in enumerate(skeleton, 1))
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def expand(index: int, point: str) -> SoTSection:
+            async with semaphore:
+                content = await self.expand_chain.ainvoke(
+                    {"question": question, "skeleton": skeleton_text, "index": index, "point": point}
+                )
+            return SoTSection(index=index, point=point, content=content.strip(), elapsed=time.perf_counter() - start)
+
+        tasks = [asyncio.create_task(expand(i, point)) for i, point in enumerate(skeleton, 1)]
+        try:
+            for done in asyncio.as_completed(tasks):
+                yield await done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def arun(self, question: str, on_section: Optional[Callable[[SoTSection], None]] = None) -> SoTResult:
+        start = time.perf_counter()
+        result = SoTResult(skeleton=await self.askeleton(question))
+        result.skeleton_latency = time.perf_counter() - start
+
+        async for section in self.astream(question, result.skeleton):
+            if on_section:
+                on_section(section)
+            result.sections.append(section)
+
+        result.sections.sort(key=lambda section: section.index)
+        result.total_latency = time.perf_counter() - start
+        return result
+
+    def run(self, question: str, on_section: Optional[Callable[[SoTSection], None]] = None) -> SoTResult:
+        """Sync wrapper around arun for scripts"""
+        return asyncio.run(self.arun(question, on_section))
@@ -0,0 +1,233 @@
+"""
+Tree-of-Thought: busca em feixe (beam search) sobre pensamentos parciais
+"""
+
+import asyncio
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, List, Optional
+
+from langchain_core.prompts import PromptTemplate
+
+DEFAULT_PROPOSE_PROMPT = PromptTemplate.from_template(
+    """You are solving the problem below one step at a time.
+
+Problem:
+{problem}
+
+Steps so far:
+{steps}
+
+Propose ONLY the next step (one or two sentences). Do not repeat previous steps."""
+)
+
+DEFAULT_EVALUATE_PROMPT = PromptTemplate.from_template(
+    """Problem:
+{problem}
+
+Partial solution:
+{steps}
+
+Rate how promising this partial solution is to reach a correct and complete answer.
+Reply only with a number from 0 to 10."""
+)
+
+SCORE_PATTERN = re.compile(r"\d+(?:\.\d+)?")
+
+
+def parse_score(text: str) -> float:
+    """First number in the evaluator output, clamped to [0, 10]"""
+    match = SCORE_PATTERN.search(text)
+    return min(10.0, max(0.0, float(match.group()))) if match else 0.0
+
+
+@dataclass
+class ThoughtNode:
+    """A partial solution: the list of thoughts from the root plus its score"""
+    steps: List[str] = field(default_factory=list)
+    score: float = 0.0
+
+    @property
+    def depth(self) -> int:
+        return len(self.steps)
+
+    def render(self) -> str:
+        if not self.steps:
+            return "(none yet)"
+        return "\n".join(f"{i}. {step}" for i, step in enumerate(self.steps, 1))
+
+    def state_key(self) -> str:
+        """Normalized state used to deduplicate identical partial solutions"""
+        return "\n".join(re.sub(r"\s+", " ", step).strip().lower() for step in self.steps)
+
+
+@dataclass
+class SearchLevel:
+    """Stats for one level of the search"""
+    depth: int
+    expanded: int
+    duplicates: int
+    kept: int
+    best_score: float
+
+
+@dataclass
+class ToTResult:
+    """Best path found and how the search went"""
+    best: ThoughtNode
+    levels: List[SearchLevel]
+    tokens_used: int
+    elapsed: float
+    stop_reason: str
+
+
+class _TokenBudgetExhausted(Exception):
+    """Raised instead of a model call once the search has used its token budget"""
+
+
+@dataclass
+class _SearchRun:
+    """State of one asearch call, so concurrent searches on the same engine stay independent"""
+    semaphore: asyncio.Semaphore
+    token_budget: Optional[int]
+    tokens_used: int = 0
+
+    @property
+    def exhausted(self) -> bool:
+        return self.token_budget is not None and self.tokens_used >= self.token_budget
+
+
+class TreeOfThought:
+    """
+    Beam search over thoughts.
+
+    Every node in the frontier is expanded by `branching` concurrent LLM calls, the new
+    (deduplicated) nodes are scored by an evaluator prompt, also concurrently, and only
+    the `beam_width` best ones survive to the next level. The search stops at
+    `max_depth` or when the token or wall-clock budget runs out. The token budget is
+    checked before every call, so a level overshoots it by at most the calls already
+    in flight (`max_concurrency`).
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        beam_width: int = 3,
+        branching: int = 3,
+        max_depth: int = 3,
+        max_concurrency: int = 8,
+        token_budget: Optional[int] = None,
+        time_budget: Optional[float] = None,
+        propose_prompt: PromptTemplate = DEFAULT_PROPOSE_PROMPT,
+        evaluate_prompt: PromptTemplate = DEFAULT_EVALUATE_PROMPT,
+    ):
+        self.model = model
+        self.beam_width = beam_width
+        self.branching = branching
+        self.max_depth = max_depth
+        self.max_concurrency = max_concurrency
+        self.token_budget = token_budget
+        self.time_budget = time_budget
+        self.propose_prompt = propose_prompt
+        self.evaluate_prompt = evaluate_prompt
+
+    async def _call(self, run: _SearchRun, prompt: PromptTemplate, problem: str, node: ThoughtNode) -> str:
+        async with run.semaphore:
+            if run.exhausted:
+                raise _TokenBudgetExhausted()
+            message = await (prompt | self.model).ainvoke({"problem": problem, "steps": node.render()})
+            usage = getattr(message, "usage_metadata", None) or {}
+            run.tokens_used += usage.get("total_tokens", 0)
+        return str(message.content).strip()
+
+    async def _expand(self, run: _SearchRun, problem: str, node: ThoughtNode) -> ThoughtNode:
+        thought = await self._call(run, self.propose_prompt, problem, node)
+        return ThoughtNode(steps=node.steps + [thought])
+
+    async def _evaluate(self, run: _SearchRun, problem: str, node: ThoughtNode) -> ThoughtNode:
+        node.score = parse_score(await self._call(run, self.evaluate_prompt, problem, node))
+        return node
+
+    def _remaining_time(self, start: float) -> Optional[float]:
+        if self.time_budget is None:
+            return None
+        return self.time_budget - (time.perf_counter() - start)
+
+    async def asearch(self, problem: str) -> ToTResult:
+        run = _SearchRun(asyncio.Semaphore(self.max_concurrency), self.token_budget)
+        start = time.perf_counter()
+
+        frontier = [ThoughtNode()]
+        best = frontier[0]
+        seen = {best.state_key()}
+        levels: List[SearchLevel] = []
+        stop_reason = "max_depth"
+
+        for depth in range(1, self.max_depth + 1):
+            if run.exhausted:
+                stop_reason = "token_budget"
+                break
+
+            try:
+                # Expansion and evaluation of the whole level run concurrently
+                children = await asyncio.wait_for(
+                    asyncio.gather(
+                        *(self._expand(run, problem, node) for node in frontier for _ in range(self.branching)),
+                        return_exceptions=True,
+                    ),
+                    timeout=self._remaining_time(start),
+                )
+
+                candidates: List[ThoughtNode] = []
+                duplicates = 0
+                for child in children:
+                    if isinstance(child, BaseException):
+                        continue
+                    key = child.state_key()
+                    if key in seen:
+                        duplicates += 1
+                        continue
+                    seen.add(key)
+                    candidates.append(child)
+
+                scored = await asyncio.wait_for(
+                    asyncio.gather(*(self._evaluate(run, problem, node) for node in candidates), return_exceptions=True),
+                    timeout=self._remaining_time(start),
+                )
+            except asyncio.TimeoutError:
+                stop_reason = "time_budget"
+                break
+
+            ranked = sorted(
+                (node for node in scored if isinstance(node, ThoughtNode)), key=lambda n: n.score, reverse=True
+            )
+            if not ranked:
+                stop_reason = "token_budget" if run.exhausted else "no_candidates"
+                break
+
+            frontier = ranked[: self.beam_width]
+            if frontier[0].score >= best.score:
+                best = frontier[0]
+            levels.append(SearchLevel(
+                depth=depth,
+                expanded=len(children),
+                duplicates=duplicates,
+                kept=len(frontier),
+                best_score=frontier[0].score,
+            ))
+            if run.exhausted:
+                stop_reason = "token_budget"
+                break
+
+        return ToTResult(
+            best=best,
+            levels=levels,
+            tokens_used=run.tokens_used,
+            elapsed=time.perf_counter() - start,
+            stop_reason=stop_reason,
+        )
+
+    def search(self, problem: str) -> ToTResult:
+        """Sync wrapper around asearch for scripts"""
+        return asyncio.run(self.asearch(problem))
@@ -1,22 +1,23 @@
 from dotenv import load_dotenv
-from langchain.chat_models import init_chat_model
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from pydantic import SecretStr
 import os
 import sys
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
+from utils.model_factory import get_chat_model
+from utils.gap_filling import NO_PASSAGES, GapLedger, ParallelGapFiller, format_passages, parse_gaps
+from utils.retriever import HybridIndex
+
 # Load environment variables
 load_dotenv()
 
-llm = init_chat_model(
-    model="gpt-4o",
-    temperature=0.7,
-    base_url=os.environ["GITHUB_MODELS_ENDPOINT"],
-    api_key=SecretStr(os.environ["GITHUB_MODELS_TOKEN"])
-)
+llm = get_chat_model("gpt-4o", temperature=0.7)
+
+# Local corpus built offline with 1.1-build-retrieval-index.py (optional)
+INDEX_DIR = os.environ.get("RETRIEVAL_INDEX_DIR", os.path.join(os.path.dirname(__file__), '..', 'retrieval_index'))
+retriever = HybridIndex.load(INDEX_DIR).as_retriever(k=3) if os.path.isdir(INDEX_DIR) else None
 
 # ========= Enhanced Prompt Templates =========
 
@@ -58,11 +59,12 @@ query_prompt = PromptTemplate(
 
 # Prompt to fill gaps gradually based on complexity
 fill_prompt = PromptTemplate(
-    input_variables=["question", "draft", "queries", "iteration"],
+    input_variables=["question", "draft", "queries", "passages", "iteration"],
     template=(
         "Original question: {question}\n\n"
         "Current draft (iteration {iteration}):\n{draft}\n\n"
         "Information to help fill the gaps:\n{queries}\n\n"
+        "Passages retrieved from the local corpus (prefer these facts):\n{passages}\n\n"
         "CRITICAL INSTRUCTIONS:\n"
         "1. You MUST replace AT LEAST 1-2 [MISSING: ...] markers with concrete information\n"
         "2. ACTUALLY REPLACE the text '[MISSING: xyz]' with real content - don't keep the marker\n"
@@ -99,9 +101,25 @@ query_chain = query_prompt | llm | StrOutputParser()
 fill_chain = fill_prompt | llm | StrOutputParser()
 expansion_chain = expansion_prompt | llm | StrOutputParser()
 
+# One call per gap, answers spliced locally into the draft
+gap_filler = ParallelGapFiller(llm, max_concurrency=8, retriever=retriever)
+
+
+def retrieve_passages(queries: str) -> str:
+    """Answer each generated query line from the local corpus"""
+    if retriever is None:
+        return NO_PASSAGES
+    lines = [line.strip() for line in queries.split('\n') if line.strip()]
+    documents = {}
+    for results in retriever.batch(lines):
+        for doc in results:
+            documents.setdefault(doc.metadata["passage_id"], doc)
+    return format_passages(list(documents.values()))
+
 # ========= Enhanced Main Function =========
 
-def iter_retgen_multi(question: str, max_iters: int = 10, target_completeness: float = 0.95):
+def iter_retgen_multi(question: str, max_iters: int = 10, target_completeness: float = 0.95,
+                      parallel_gaps: bool = False, max_gap_attempts: int = 3):
     """
     Perform iterative retrieval and generation with multiple natural rounds.
     Continues until all gaps are filled or max iterations reached.
@@ -110,19 +128,25 @@ def iter_retgen_multi(question: str, max_iters: int = 10, target_completeness: f
         question: The question to answer
         max_iters: Maximum number of iterations to refine the answer
         target_completeness: Target completeness (0-1), stops when achieved
+        parallel_gaps: Fill each gap with its own concurrent call instead of
+            rewriting the whole draft every iteration (see iter_retgen_parallel)
+        max_gap_attempts: Iterations a gap may stay open before it is given up
 
     Returns:
         The final refined answer
     """
+    if parallel_gaps:
+        return iter_retgen_parallel(question, max_rounds=max_iters, target_completeness=target_completeness,
+                                    max_gap_attempts=max_gap_attempts)
 
     # Generate initial draft with many gaps
     draft = draft_chain.invoke({"question": question})
     print("\n=== Initial Draft (with many gaps) ===")
     print(draft)
 
-    # Count initial gaps
-    initial_gaps = draft.count("[MISSING:")
-    print(f"\n Initial gaps identified: {initial_gaps}")
+    # Gaps parsed once, tracked by id across rewrites
+    ledger = GapLedger(draft, max_attempts=max_gap_attempts)
+    print(f"\n Initial gaps identified: {len(ledger.entries)}")
 
     actual_iterations = 0
     consecutive_no_progress = 0
@@ -130,31 +154,46 @@ def iter_retgen_multi(question: str, max_iters: int = 10, target_completeness: f
     # Iterative refinement - continue until complete or max iterations
     for iteration in range(max_iters):
         actual_iterations = iteration + 1
-        current_gaps = draft.count("[MISSING:")
 
         # Check if we've reached completion
-        if current_gaps == 0:
+        if ledger.open_count == 0 and ledger.dropped():
+            # Markers the model deleted without a fill are missing details, not progress
+            print(f"\n No open gaps, but {len(ledger.dropped())} were deleted without a fill "
+                  f"(completeness {ledger.completeness:.0%}):")
+            for entry in ledger.dropped():
+                print(f"  - {entry.topic}")
+            break
+        elif ledger.open_count == 0:
             print("\n All gaps filled!")
 
             # Only expand in early iterations, not indefinitely
             if iteration < 2:  # Only expand in first couple iterations
                 print("Checking for areas to expand...")
                 draft = expansion_chain.invoke({"draft": draft})
-                current_gaps = draft.count("[MISSING:")
+                update = ledger.sync(draft)
 
-                if current_gaps == 0:
+                if ledger.open_count == 0:
                     print(" Answer is comprehensive and complete!")
                     break
                 else:
-                    print(f" Identified {current_gaps} new areas for expansion")
+                    print(f" Identified {len(update.added) + len(update.reopened)} new areas for expansion")
                     consecutive_no_progress = 0  # Reset counter
             else:
                 print("✅ Answer is complete after multiple refinements!")
                 break  # Stop after filling all gaps in later iterations
+        elif ledger.completeness >= target_completeness:
+            print(f"\n Target completeness reached ({ledger.completeness:.0%})")
+            break
+        elif ledger.converged:
+            print(f"\n{ledger.open_count} gaps left, all out of tries. Stopping.")
+            break
+
+        retryable = ledger.retryable()
+        ledger.record_attempts([entry.id for entry in retryable])
 
         print(f"\n{'='*60}")
         print(f" ITERATION {iteration + 1}")
-        print(f" Current gaps to address: {current_gaps}")
+        print(f" Current gaps to address: {ledger.open_count} ({len(retryable)} with tries left)")
         print('='*60)
 
         # Generate queries for missing information
@@ -167,22 +206,28 @@ def iter_retgen_multi(question: str, max_iters: int = 10, target_completeness: f
         if len(queries_list) > 10:
             print(f"   ... and {len(queries_list) - 10} more queries")
 
-        # Fill gaps with new information (gradual filling based on iteration)
+        # Retrieve passages for the queries, then fill gaps (gradual filling based on iteration)
+        passages = retrieve_passages(queries)
         draft = fill_chain.invoke({
             "question": question,
             "draft": draft,
             "queries": queries,
+            "passages": passages,
             "iteration": iteration + 1
         })
+        update = ledger.sync(draft)
 
         # Show refined answer
         print("\n=== Refined Answer ===")
         print(draft[:500] + "..." if len(draft) > 500 else draft)  # Show preview
 
-        # Report progress
-        new_gaps = draft.count("[MISSING:")
-        filled = current_gaps - new_gaps
-        print(f"\nProgress: Filled {filled} gaps, {new_gaps} remaining")
+        # Report progress: gaps closed by id, not marker counts (rewordings keep their id)
+        filled = len(update.filled)
+        print(f"\nProgress: Filled {filled} gaps, {ledger.open_count} remaining")
+        if update.added or update.reopened:
+            print(f"  (model added {len(update.added)} and reopened {len(update.reopened)} gaps)")
+        if update.dropped:
+            print(f"  (model deleted {len(update.dropped)} gaps without filling them)")
 
         # Check if we're making progress
         if filled == 0:
@@ -200,6 +245,56 @@ def iter_retgen_multi(question: str, max_iters: int = 10, target_completeness: f
     return draft
 
 
+def iter_retgen_parallel(question: str, max_rounds: int = 3, target_completeness: float = 0.95,
+                         max_gap_attempts: int = 2):
+    """
+    Parallel mode: parse the [MISSING: ...] markers of the draft into a gap ledger,
+    resolve every open gap with its own concurrent call and splice the answers into
+    the draft locally. A round costs as much as its slowest gap; later rounds only
+    retry the gaps still open, each at most `max_gap_attempts` times.
+
+    Args:
+        question: The question to answer
+        max_rounds: Maximum number of fill rounds
+        target_completeness: Target completeness (0-1), stops when achieved
+        max_gap_attempts: Calls a gap gets before it is given up
+
+    Returns:
+        The final answer
+    """
+    draft = draft_chain.invoke({"question": question})
+    print("\n=== Initial Draft (with many gaps) ===")
+    print(draft)
+
+    ledger = GapLedger(draft, max_attempts=max_gap_attempts)
+    print(f"\n Initial gaps identified: {len(ledger.entries)}")
+
+    for round_number in range(1, max_rounds + 1):
+        if ledger.open_count == 0:
+            print("\n All gaps filled!")
+            break
+        if ledger.completeness >= target_completeness:
+            print(f"\n Target completeness reached ({ledger.completeness:.0%})")
+            break
+        if ledger.converged:
+            print(f"\n{ledger.open_count} gaps left, all out of tries. Stopping.")
+            break
+
+        result = gap_filler.fill(question, ledger)
+
+        print(f"\n{'='*60}")
+        print(f" ROUND {round_number}: {result.calls} concurrent calls, {result.elapsed:.1f}s")
+        print('='*60)
+        for gap_id in result.attempted:
+            entry = ledger.entries[gap_id]
+            status = result.fills.get(gap_id, f"(unresolved, try {entry.attempts}/{ledger.max_attempts})")
+            print(f"- {gap_id} {entry.topic}: {status[:100]}")
+
+        print(f"\nProgress: Filled {len(result.fills)} gaps, {ledger.open_count} remaining")
+
+    return ledger.draft
+
+
 # ========= Main Execution =========
 
 if __name__ == "__main__":
@@ -211,8 +306,8 @@ if __name__ == "__main__":
     print(f"'{demonstration_question}'")
     print("#"*60)
 
-    # Run with more iterations to ensure completion
-    final_answer = iter_retgen_multi(demonstration_question, max_iters=10)
+    # Parallel gap filling: latency of the slowest gap per round, no full rewrites
+    final_answer = iter_retgen_multi(demonstration_question, max_iters=3, parallel_gaps=True)
 
     print("\n" + "="*60)
     print("FINAL COMPLETE ANSWER:")
@@ -220,7 +315,7 @@ if __name__ == "__main__":
     print(final_answer)
 
     # Final statistics
-    final_gaps = final_answer.count("[MISSING:")
+    final_gaps = len(parse_gaps(final_answer))
     initial_length = len(demonstration_question)
     final_length = len(final_answer)
 
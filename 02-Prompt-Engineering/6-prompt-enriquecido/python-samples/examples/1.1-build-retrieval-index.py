@@ -0,0 +1,42 @@
+import glob
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.retriever import HybridIndex, split_documents
+
+# Offline step: index a folder of .md/.txt files once; 1-iter-retgen.py loads the result via mmap.
+# Usage: python examples/1.1-build-retrieval-index.py [corpus_dir ...]
+# Default corpus: the markdown files of this repository.
+DEFAULT_CORPUS = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', '..', '..', '..'))
+INDEX_DIR = os.environ.get("RETRIEVAL_INDEX_DIR", os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'retrieval_index')))
+
+corpus_dirs = sys.argv[1:] or [DEFAULT_CORPUS]
+paths = sorted(
+    path
+    for directory in corpus_dirs
+    for pattern in ("**/*.md", "**/*.txt")
+    for path in glob.glob(os.path.join(directory, pattern), recursive=True)
+    if "node_modules" not in path and ".venv" not in path
+)
+print(f"Indexing {len(paths)} files from {', '.join(corpus_dirs)}")
+
+start = time.perf_counter()
+index = HybridIndex.build(split_documents(paths))
+index.save(INDEX_DIR)
+print(f"{len(index)} passages, {len(index.vocab)} terms indexed in {time.perf_counter() - start:.1f}s -> {INDEX_DIR}")
+
+start = time.perf_counter()
+index = HybridIndex.load(INDEX_DIR)
+print(f"Index loaded (mmap) in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+for query in ("What is LangGraph?", "prompt chaining", "memory management in LangChain"):
+    start = time.perf_counter()
+    hits = index.search(query, k=3)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"\n{query!r} ({elapsed:.2f} ms)")
+    for hit in hits:
+        preview = " ".join(hit.text.split())[:90]
+        print(f"  {hit.score:.3f}  {os.path.relpath(hit.source, DEFAULT_CORPUS)}: {preview}")
@@ -0,0 +1,48 @@
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.retriever import HybridIndex
+
+# Benchmark settings: synthetic corpus with a Zipf word distribution (like natural text)
+NUM_PASSAGES = 300_000
+WORDS_PER_PASSAGE = 50
+VOCABULARY = 50_000
+NUM_QUERIES = 500
+
+rng = np.random.default_rng(0)
+words = np.array([f"term{i}" for i in range(VOCABULARY)])
+
+def zipf_words(size):
+    return words[np.minimum(rng.zipf(1.2, size=size) - 1, VOCABULARY - 1)]
+
+passages = ((f"doc-{i % 1000}.md", " ".join(row)) for i, row in enumerate(zipf_words((NUM_PASSAGES, WORDS_PER_PASSAGE))))
+queries = [" ".join(zipf_words(5)) for _ in range(NUM_QUERIES)]
+
+print(f"=== HYBRID RETRIEVER BENCHMARK: {NUM_PASSAGES:,} passages ===\n")
+
+with tempfile.TemporaryDirectory() as directory:
+    start = time.perf_counter()
+    HybridIndex.build(passages).save(directory)
+    print(f"{'build + save (offline)':<24} {time.perf_counter() - start:8.1f} s")
+
+    start = time.perf_counter()
+    index = HybridIndex.load(directory)
+    print(f"{'load (mmap)':<24} {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+    for query in queries[:50]:  # warm-up: page the postings in
+        index.search(query)
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, k=5)
+        latencies.append(time.perf_counter() - start)
+
+    latencies = np.array(latencies) * 1000
+    print(f"{'search p50':<24} {np.percentile(latencies, 50):8.2f} ms")
+    print(f"{'search p99':<24} {np.percentile(latencies, 99):8.2f} ms")
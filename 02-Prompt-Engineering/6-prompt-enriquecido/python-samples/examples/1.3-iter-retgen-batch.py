@@ -0,0 +1,108 @@
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import Counter
+from dataclasses import asdict
+
+from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.model_factory import get_chat_model
+from utils.iter_retgen_service import IterRetgenService, QuestionBudget, RetgenEvent
+from utils.retriever import HybridIndex
+
+# Batch ITER-RETGEN: many questions through one async service (parallel gap mode).
+# Usage: python examples/1.3-iter-retgen-batch.py [questions.txt] [results.jsonl]
+# questions.txt has one question per line; results are appended as they finish, so an
+# overnight run can be resumed: questions already in results.jsonl are skipped (matched by a
+# hash of the question text, so the file can be edited or reordered between runs).
+load_dotenv()
+
+QUESTIONS_FILE = sys.argv[1] if len(sys.argv) > 1 else None
+RESULTS_FILE = sys.argv[2] if len(sys.argv) > 2 else "iter_retgen_results.jsonl"
+INDEX_DIR = os.environ.get("RETRIEVAL_INDEX_DIR", os.path.join(os.path.dirname(__file__), '..', 'retrieval_index'))
+
+DEMO_QUESTIONS = [
+    "Explain about the LangChain and LangGraph",
+    "How does LangChain manage conversation memory?",
+    "What is prompt chaining and when should it be used?",
+    "Compare ReAct agents and plan-and-execute agents",
+    "How do vector stores support retrieval augmented generation?",
+]
+
+llm = get_chat_model("gpt-4o", temperature=0.7)
+retriever = HybridIndex.load(INDEX_DIR).as_retriever(k=3) if os.path.isdir(INDEX_DIR) else None
+
+
+def load_questions():
+    if QUESTIONS_FILE is None:
+        return DEMO_QUESTIONS
+    with open(QUESTIONS_FILE, encoding="utf-8") as file:
+        return [line.strip() for line in file if line.strip()]
+
+
+def question_id(question):
+    return "q-" + hashlib.sha256(question.encode("utf-8")).hexdigest()[:16]
+
+
+def load_done():
+    if not os.path.exists(RESULTS_FILE):
+        return set()
+    with open(RESULTS_FILE, encoding="utf-8") as file:
+        return {json.loads(line)["question_id"] for line in file if line.strip()}
+
+
+async def main():
+    questions = load_questions()
+    done = load_done()
+    # Duplicated questions run once
+    pending = [(qid, question) for qid, question in {question_id(q): q for q in questions}.items() if qid not in done]
+    print(f"{len(questions)} questions, {len(done)} already done, {len(pending)} to run -> {RESULTS_FILE}")
+
+    statuses = Counter()
+    tokens = 0
+    start = time.perf_counter()
+
+    with open(RESULTS_FILE, "a", encoding="utf-8") as results:
+        def on_event(event: RetgenEvent):
+            # Progress goes through events: here one line per finished question plus the JSONL record
+            nonlocal tokens
+            if event.kind != "finished":
+                return
+            statuses[event.data["status"]] += 1
+            tokens += event.data["tokens"]
+            finished = sum(statuses.values())
+            print(f"[{finished}/{len(pending)}] {event.question_id} {event.data['status']:<16} "
+                  f"gaps {event.data['gaps_filled']}/{event.data['gaps_total']}  "
+                  f"{event.data['tokens']:>6} tokens  {event.data['elapsed']:5.1f}s")
+
+        service = IterRetgenService(
+            llm,
+            max_concurrency=16,          # LLM calls in flight across all questions
+            workers=64,                  # questions in progress at the same time
+            budget=QuestionBudget(max_tokens=20_000, max_seconds=180),
+            max_rounds=3,
+            max_gap_attempts=2,
+            retriever=retriever,
+            on_event=on_event,
+        )
+        async with service:
+            async def run(question_id, question):
+                result = await (await service.submit(question, question_id=question_id))
+                results.write(json.dumps(asdict(result), ensure_ascii=False) + "\n")
+                results.flush()
+
+            await asyncio.gather(*[run(question_id, question) for question_id, question in pending])
+
+    elapsed = time.perf_counter() - start
+    print(f"\n{len(pending)} questions in {elapsed:.1f}s, {tokens:,} tokens")
+    for status, count in statuses.most_common():
+        print(f"  {status:<16} {count}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
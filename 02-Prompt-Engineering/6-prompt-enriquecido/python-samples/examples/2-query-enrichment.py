@@ -3,15 +3,16 @@ from dataclasses import dataclass
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
-from langchain.chat_models import init_chat_model
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser, StrOutputParser
-from pydantic import SecretStr
 import os
 import sys
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
+from utils.model_factory import get_chat_model
+from utils.field_extractor import DEFAULT_FIELD_RULES, FieldExtractor, FieldRule
+
 # Load environment variables
 load_dotenv()
 
@@ -27,6 +28,9 @@ class EnrichmentConfig:
     # Define what information we want to collect
     required_information: Optional[List[Dict[str, str]]] = None
 
+    # Regex / key-value rules that find fields locally, before any LLM call
+    field_rules: Optional[List[FieldRule]] = None
+
     def __post_init__(self):
         if self.required_information is None:
             # Default configuration for PR review scenario
@@ -38,6 +42,8 @@ class EnrichmentConfig:
                 {"field": "style_guide", "question": "What style guide should be followed?"},
                 {"field": "test_requirements", "question": "What are the test requirements?"},
             ]
+        if self.field_rules is None:
+            self.field_rules = DEFAULT_FIELD_RULES
 
 
 # ========= Models =========
@@ -57,13 +63,10 @@ class QueryEnricher:
 
     def __init__(self, config: EnrichmentConfig):
         self.config = config
-        # Updated to use GitHub Models configuration
-        self.llm = init_chat_model(
-            model=config.model_name,
-            temperature=config.temperature,
-            base_url=os.environ["GITHUB_MODELS_ENDPOINT"],
-            api_key=SecretStr(os.environ["GITHUB_MODELS_TOKEN"])
-        )
+        # Shared GitHub Models client: enrichers created per request reuse the same
+        # model instance and pooled HTTP connections
+        self.llm = get_chat_model(config.model_name, temperature=config.temperature)
+        self.extractor = FieldExtractor(config.field_rules)
         self.enrichment_chain = self._create_enrichment_chain()
         self.rewrite_chain = self._create_rewrite_chain()
 
@@ -126,10 +129,30 @@ NEVER set clarifications to empty [] unless ALL 6 required items are explicitly
 
         return rewrite_prompt | self.llm | StrOutputParser()
 
+    def _local_enrichment(self, query: str, fields: Dict[str, str]) -> Dict[str, Any]:
+        """Enrichment output built from locally extracted fields, no LLM call"""
+        request = query.split(" | ")[0].strip()
+        return {
+            "is_complex": len(fields) > 1,
+            "sub_queries": [request] + [f"{field.replace('_', ' ')}: {value}" for field, value in fields.items()],
+            "clarifications": [],
+            "entities": [f"{field}: {value}" for field, value in fields.items()],
+        }
+
     def enrich(self, query: str) -> Dict[str, Any]:
         """Enrich a query with clarifications"""
+        # Fields found by the local rules never cost a round trip; a well-formed
+        # request (or a round whose answers fill every field) skips the LLM entirely
+        fields = self.extractor.extract(query)
+        missing = [info for info in self.config.required_information if info["field"] not in fields]
+        if not missing:
+            return self._local_enrichment(query, fields)
+
+        known = [f"{info['question']}: {fields[info['field']]}"
+                 for info in self.config.required_information if info["field"] in fields]
+        question = query + (" | " + " | ".join(known) if known else "")
         try:
-            return self.enrichment_chain.invoke({"question": query})
+            enriched = self.enrichment_chain.invoke({"question": question})
         except Exception as e:
             print(f"Error during enrichment: {e}")
             return {
@@ -139,6 +162,21 @@ NEVER set clarifications to empty [] unless ALL 6 required items are explicitly
                 "entities": []
             }
 
+        # Drop clarifications the model asks again for fields already found locally
+        # (only when every field they name is known: "Which repository is the PR in?" stays)
+        enriched["clarifications"] = [
+            clarification for clarification in enriched.get("clarifications", [])
+            if not self._already_known(clarification, fields)
+        ]
+        entities = enriched.setdefault("entities", [])
+        entities.extend(f"{field}: {value}" for field, value in fields.items()
+                        if not any(value in entity for entity in entities))
+        return enriched
+
+    def _already_known(self, clarification: str, fields: Dict[str, str]) -> bool:
+        named = self.extractor.fields_for_key(clarification)
+        return bool(named) and all(field in fields for field in named)
+
     def generate_natural_question(self, original: str, context: List[str]) -> str:
         """Generate natural language version of enriched query"""
         if not context:
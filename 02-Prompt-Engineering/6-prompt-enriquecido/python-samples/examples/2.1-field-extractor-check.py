@@ -0,0 +1,48 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.field_extractor import FieldExtractor
+
+# Local field extraction used by 2-query-enrichment.py (no API key needed).
+# A wrong hit is worse than a miss: when every field is found locally the enricher skips
+# the LLM, so a false repository/branch value silently suppresses its clarifying question.
+
+FOUND = [
+    ("Review PR 42 in repo acme/api on branch feature/login",
+     {"pr_id": "42", "repository": "acme/api", "branch": "feature/login"}),
+    ("https://github.com/acme/api/pull/9", {"pr_id": "9", "repository": "acme/api"}),
+    ("repository named billing, branch main", {"repository": "billing", "branch": "main"}),
+    ("repo `payments` branch 'hotfix-12'", {"repository": "payments", "branch": "hotfix-12"}),
+    ("Review PR #42 | Which repository is the PR in?: acme/api | What branch is the PR on?: develop",
+     {"pr_id": "42", "repository": "acme/api", "branch": "develop"}),
+    ("I'm concerned about SQL injection, follow PEP 8, need 80% coverage",
+     {"concerns": "SQL injection", "style_guide": "PEP 8", "test_requirements": "80% coverage"}),
+]
+
+# Ordinary prose: nothing after "repository"/"branch" here is a name
+NOT_FOUND = [
+    ("pull request 7 in the repository I use", ["repository"]),
+    ("focus on the repository structure and branch naming", ["repository", "branch"]),
+    ("The repository is private and the branch is protected.", ["repository", "branch"]),
+    ("check the repo. Branch coverage matters", ["repository", "branch"]),
+]
+
+extractor = FieldExtractor()
+failures = 0
+
+for query, expected in FOUND:
+    fields = extractor.extract(query)
+    wrong = {field: fields.get(field) for field, value in expected.items() if fields.get(field) != value}
+    failures += bool(wrong)
+    print(f"{'ok  ' if not wrong else 'FAIL'} {query!r} -> {fields}")
+
+for query, absent in NOT_FOUND:
+    fields = extractor.extract(query)
+    wrong = {field: fields[field] for field in absent if field in fields}
+    failures += bool(wrong)
+    print(f"{'ok  ' if not wrong else 'FAIL'} {query!r} -> {fields}")
+
+print(f"\n{len(FOUND) + len(NOT_FOUND) - failures}/{len(FOUND) + len(NOT_FOUND)} cases passed")
+sys.exit(1 if failures else 0)
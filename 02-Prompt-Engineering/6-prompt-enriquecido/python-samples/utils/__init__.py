@@ -2,4 +2,11 @@
 Utilitários para Prompt Engineering com LangChain
 """
 
-from .prompt_helpers import *
\ No newline at end of file
+from .prompt_helpers import *
+from .gap_filling import *
+from .example_selector import *
+from .retriever import *
+from .iter_retgen_service import *
+from .field_extractor import *
+
+# model_factory e rate_limit são importados explicitamente (carregam httpx e langchain_openai)
\ No newline at end of file
@@ -0,0 +1,208 @@
+"""
+Extração local (regex e pares chave/valor) dos campos de enriquecimento, antes de qualquer chamada ao LLM
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Pattern, Sequence, Tuple
+
+# Separators of the enrichment session ("request | question: answer | ...") and of pasted forms
+_SEGMENT_SPLIT = re.compile(r"\s*\|\s*|\s*\n\s*|;\s+")
+_KEY_VALUE = re.compile(r"^(?P<key>[^:=]{1,100}?)\s*[:=]\s*(?P<value>.+)$")
+_WORD = re.compile(r"[a-z0-9]+")
+_EDGE_PUNCTUATION = "\"'`.,;:!?()[]{}<> "
+
+# Words that follow "repository"/"branch" in prose but are not names ("the repository name", "branch is")
+_NOT_A_NAME = {"name", "names", "is", "are", "was", "the", "a", "an", "for", "and", "or", "with", "that",
+               "which", "of", "to", "in", "on", "from", "should", "must", "will", "you"}
+
+
+@dataclass(frozen=True)
+class FieldRule:
+    """
+    How to find one field of `required_information` without the model.
+
+    aliases: words (or phrases) that identify the field as the key of a "key: value"
+        pair, e.g. "PR ID: 42" or the session's "What is the PR ID?: 42"
+    patterns: regexes applied to free text, the field value in the `value` group
+    value_pattern: shape a key/value answer must have (its first group, or the whole
+        match, is kept); None accepts any non-empty answer
+    """
+    field: str
+    aliases: Tuple[str, ...]
+    patterns: Tuple[Pattern[str], ...] = ()
+    value_pattern: Optional[Pattern[str]] = None
+
+
+def _compile(*patterns: str) -> Tuple[Pattern[str], ...]:
+    return tuple(re.compile(pattern, re.IGNORECASE) for pattern in patterns)
+
+
+_TEST_KINDS = r"(?:unit|integration|e2e|end-to-end|regression|smoke|snapshot|contract)"
+
+# In prose, a bare word after "repository"/"branch" is usually not a name ("the repository
+# structure", "branch naming"): only accept values with the shape of a name (owner/repo,
+# my-service, feature_x, v1.2), quoted or backticked values, or values after "named"/"called"
+_NAME_LIKE = r"(?=[\w.-]*(?:[._-][a-z0-9]|/\w))"
+_QUOTED = r"(?P<quote>[`'\"])"
+_BRANCH_NAMES = r"(?:main|master|develop|development|trunk|staging|production)"
+
+DEFAULT_FIELD_RULES: List[FieldRule] = [
+    FieldRule(
+        field="pr_id",
+        aliases=("pr", "pull request", "merge request", "mr"),
+        patterns=_compile(
+            r"(?:github\.com|gitlab\.com)/[\w.-]+/[\w.-]+/(?:-/)?(?:pull|merge_requests)/(?P<value>\d+)",
+            r"\b(?:PR|pull request|merge request|MR)\s*(?:ID|number|no\.?)?\s*[:#]?\s*#?(?P<value>\d+)\b",
+        ),
+        value_pattern=re.compile(r"#?(\d+)\b"),
+    ),
+    FieldRule(
+        field="repository",
+        aliases=("repository", "repo"),
+        patterns=_compile(
+            r"(?:github|gitlab|bitbucket)\.(?:com|org)[/:](?P<value>[\w.-]+/[\w.-]+)",
+            r"\b(?:repository|repo)\s+(?:named|called)\s+[`'\"]?(?P<value>[\w.-]+(?:/[\w.-]+)?)",
+            rf"\b(?:repository|repo)\s+{_QUOTED}(?P<value>[\w.-]+(?:/[\w.-]+)?)(?P=quote)",
+            rf"\b(?:repository|repo)\s+{_NAME_LIKE}(?P<value>[\w.-]+(?:/[\w.-]+)?)",
+        ),
+        value_pattern=re.compile(r"(?:https?://)?(?:[\w.-]+\.(?:com|org)[/:])?([\w.-]+(?:/[\w.-]+)?)"),
+    ),
+    FieldRule(
+        field="branch",
+        aliases=("branch",),
+        patterns=_compile(
+            r"(?:github|gitlab)\.com/[\w.-]+/[\w.-]+/(?:-/)?tree/(?P<value>[\w./-]+)",
+            r"\bbranch\s+(?:named|called)\s+[`'\"]?(?P<value>[\w./-]+)",
+            rf"\bbranch\s+{_QUOTED}(?P<value>[\w./-]+)(?P=quote)",
+            rf"\bbranch\s+{_NAME_LIKE}(?P<value>[\w./-]+)",
+            rf"\bbranch\s+(?P<value>{_BRANCH_NAMES})\b",
+            r"\b(?P<value>(?:feature|feat|fix|bugfix|hotfix|release|chore)/[\w./-]+)",
+        ),
+        value_pattern=re.compile(r"([\w./-]+)"),
+    ),
+    FieldRule(
+        field="concerns",
+        aliases=("concern", "concerns", "worry", "worries", "focus", "issue", "issues"),
+        patterns=_compile(
+            r"\b(?:concerned|worried) about\s+(?P<value>[^.,|;\n]+)",
+            r"\b(?:my|main|specific) concerns? (?:is|are)\s+(?P<value>[^.,|;\n]+)",
+            r"\bfocus(?:ing)? on\s+(?P<value>[^.,|;\n]+)",
+        ),
+    ),
+    FieldRule(
+        field="style_guide",
+        aliases=("style", "style guide", "guide", "lint", "linter", "convention", "conventions"),
+        patterns=_compile(
+            r"\b(?P<value>PEP\s?8|PSR-\d+|Airbnb(?: JavaScript)?(?: style(?: guide)?)?|StandardJS"
+            r"|Google (?:Python |Java |JavaScript |C\+\+ )?style(?: guide)?)",
+        ),
+    ),
+    FieldRule(
+        field="test_requirements",
+        aliases=("test", "tests", "testing", "coverage"),
+        patterns=_compile(
+            r"\b(?P<value>(?:at least\s+)?\d{1,3}\s?%\s+(?:test\s+|code\s+)?coverage)",
+            r"\b(?P<value>coverage\s+(?:of\s+|above\s+|>=?\s*)?\d{1,3}\s?%)",
+            rf"\b(?P<value>{_TEST_KINDS}(?:\s*(?:,|/|and)\s*{_TEST_KINDS})*\s+tests?)\b",
+        ),
+    ),
+]
+
+
+def _words(text: str) -> str:
+    return " " + " ".join(_WORD.findall(text.lower())) + " "
+
+
+def _clean(value: str) -> str:
+    return " ".join(value.split()).strip(_EDGE_PUNCTUATION)
+
+
+class FieldExtractor:
+    """
+    Fills the enrichment fields of a query locally.
+
+    The query is split into segments (the session joins answers with " | ");
+    "key: value" segments whose key names a field are read first, later answers
+    overriding earlier ones, then the free-text patterns fill what is still missing.
+    Only fields with a rule can be found; the others are left to the model.
+    """
+
+    def __init__(self, rules: Sequence[FieldRule] = DEFAULT_FIELD_RULES, max_key_words: int = 4):
+        self.rules = list(rules)
+        self.max_key_words = max_key_words
+        self._rules_by_field = {rule.field: rule for rule in self.rules}
+
+    def fields_for_key(self, key: str) -> List[str]:
+        """
+        Every field named by a key or a clarification question, the most specific first:
+        the longest alias wins, so "Which repository is the PR in?" is about the
+        repository, not the PR (rule order breaks ties)
+        """
+        words = _words(key)
+        named: List[Tuple[int, int, str]] = []
+        for order, rule in enumerate(self.rules):
+            lengths = [len(alias) for alias in rule.aliases if f" {alias} " in words]
+            if lengths:
+                named.append((-max(lengths), order, rule.field))
+        return [field for _, _, field in sorted(named)]
+
+    def field_for_key(self, key: str) -> Optional[str]:
+        """Field a key or a clarification question is about ("What is the branch name?" -> "branch")"""
+        fields = self.fields_for_key(key)
+        return fields[0] if fields else None
+
+    def _match_patterns(self, rule: FieldRule, text: str) -> Optional[str]:
+        for pattern in rule.patterns:
+            for match in pattern.finditer(text):
+                value = _clean(match.group("value"))
+                if value and value.lower() not in _NOT_A_NAME:
+                    return value.removesuffix(".git") if rule.field == "repository" else value
+        return None
+
+    def _parse_value(self, rule: FieldRule, value: str) -> Optional[str]:
+        found = self._match_patterns(rule, value)
+        if found is not None:
+            return found
+        if rule.value_pattern is None:
+            return _clean(value) or None
+        match = rule.value_pattern.match(value.strip())
+        if match is None:
+            return None
+        parsed = _clean(match.group(1) if match.groups() else match.group(0))
+        return parsed.removesuffix(".git") if rule.field == "repository" else parsed or None
+
+    def _key_value(self, segment: str) -> Optional[Tuple[str, str]]:
+        match = _KEY_VALUE.match(segment)
+        if match is None or "//" in match.group("value")[:2]:  # "https://..." is not a key/value pair
+            return None
+        key = match.group("key").strip()
+        if not key.endswith("?") and len(key.split()) > self.max_key_words:
+            return None
+        # An answer that does not fit the most specific field may still fit another one it names
+        for field in self.fields_for_key(key):
+            value = self._parse_value(self._rules_by_field[field], match.group("value"))
+            if value:
+                return field, value
+        return None
+
+    def extract(self, query: str) -> Dict[str, str]:
+        """Fields found in the query, in rule order"""
+        found: Dict[str, str] = {}
+        free_text: List[str] = []
+        for segment in _SEGMENT_SPLIT.split(query):
+            if not segment:
+                continue
+            pair = self._key_value(segment)
+            if pair is None:
+                free_text.append(segment)
+            else:
+                found[pair[0]] = pair[1]
+
+        text = "\n".join(free_text)
+        for rule in self.rules:
+            if rule.field not in found and rule.patterns:
+                value = self._match_patterns(rule, text)
+                if value is not None:
+                    found[rule.field] = value
+        return {rule.field: found[rule.field] for rule in self.rules if rule.field in found}
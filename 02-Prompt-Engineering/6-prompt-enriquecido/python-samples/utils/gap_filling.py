@@ -0,0 +1,395 @@
+"""
+Lacunas [MISSING: ...]: registro com ids estáveis e preenchimento paralelo, uma chamada por lacuna
+"""
+
+import os
+import re
+import time
+from difflib import SequenceMatcher
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional, Sequence, Set
+
+from langchain_core.documents import Document
+from langchain_core.language_models import BaseChatModel
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import PromptTemplate
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.runnables import Runnable
+
+MISSING_PATTERN = re.compile(r"\[MISSING:\s*([^\]]*?)\s*\]")
+
+UNKNOWN_ANSWER = "UNKNOWN"
+
+NO_PASSAGES = "(no local corpus)"
+
+GAP_FILL_PROMPT = PromptTemplate(
+    input_variables=["question", "topic", "context", "passages"],
+    template=(
+        "Original question: {question}\n\n"
+        "A draft answer has a gap about: {topic}\n"
+        "Text around the gap (the gap is shown as <GAP>):\n{context}\n\n"
+        "Reference passages (prefer these facts over your own knowledge):\n{passages}\n\n"
+        "Write ONLY the text that replaces <GAP>: a concrete phrase or sentence that reads "
+        "naturally in place, with no markers, quotes or explanations.\n"
+        f"If you cannot fill it with certainty, answer exactly {UNKNOWN_ANSWER}."
+    ),
+)
+
+
+@dataclass(frozen=True)
+class Gap:
+    """One [MISSING: ...] marker: its position in the draft and the topic it asks for"""
+    index: int
+    topic: str
+    start: int
+    end: int
+
+
+def parse_gaps(draft: str) -> List[Gap]:
+    """Every marker of the draft, in order"""
+    return [
+        Gap(index=i, topic=match.group(1), start=match.start(), end=match.end())
+        for i, match in enumerate(MISSING_PATTERN.finditer(draft))
+    ]
+
+
+def gap_context(draft: str, gap: Gap, window: int = 300) -> str:
+    """Text around a gap, with the gap itself as <GAP> and the other markers kept"""
+    before = draft[max(0, gap.start - window):gap.start]
+    after = draft[gap.end:gap.end + window]
+    return f"...{before}<GAP>{after}..."
+
+
+def clean_fill(text: str) -> Optional[str]:
+    """Usable replacement text, or None when the model gave up or answered with a marker"""
+    text = text.strip().strip('"').strip()
+    if not text or text.upper().rstrip(".") == UNKNOWN_ANSWER or MISSING_PATTERN.search(text) or "<GAP>" in text:
+        return None
+    return text
+
+
+def format_passages(documents: Sequence[Document]) -> str:
+    """Retrieved passages as a prompt block, one "[source] text" entry each"""
+    if not documents:
+        return NO_PASSAGES
+    return "\n\n".join(
+        f"[{os.path.basename(str(doc.metadata.get('source', '?')))}] {doc.page_content.strip()}" for doc in documents
+    )
+
+
+def _topic_key(topic: str) -> str:
+    return " ".join(topic.lower().split())
+
+
+def _topic_similarity(a: str, b: str) -> float:
+    """Word overlap of two topics (1.0 when one contains the other), to recognize a reworded marker"""
+    # Short words ("of", "the", "and") say nothing about the topic
+    words_a = {word for word in _topic_key(a).split() if len(word) > 3}
+    words_b = {word for word in _topic_key(b).split() if len(word) > 3}
+    if not words_a or not words_b:
+        return 0.0
+    return len(words_a & words_b) / min(len(words_a), len(words_b))
+
+
+OPEN, FILLED, DROPPED = "open", "filled", "dropped"
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def _replacements(old: str, spans: Sequence["GapSpan"], new: str) -> Dict[str, str]:
+    """
+    Text that took the place of each marker of `old` in the rewritten `new` (diff over
+    words and punctuation, each marker counted as one word). When a rewritten passage
+    held several markers, its text is credited to the first one. An empty string means
+    the marker was deleted.
+    """
+    old_tokens: List[str] = []
+    marker_ids: Dict[int, str] = {}
+    position = 0
+    for span in spans:
+        old_tokens += _TOKEN_PATTERN.findall(old[position:span.start])
+        marker_ids[len(old_tokens)] = span.gap_id
+        old_tokens.append(f"\x00{span.gap_id}\x00")
+        position = span.end
+    old_tokens += _TOKEN_PATTERN.findall(old[position:])
+    new_matches = list(_TOKEN_PATTERN.finditer(new))
+
+    replacements: Dict[str, str] = {}
+    matcher = SequenceMatcher(None, old_tokens, [match.group() for match in new_matches], autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        text = new[new_matches[j1].start():new_matches[j2 - 1].end()] if tag == "replace" else ""
+        for index in range(i1, i2):
+            gap_id = marker_ids.get(index)
+            if gap_id is None:
+                continue
+            if text or gap_id not in replacements:
+                replacements[gap_id] = text
+            text = ""
+    return replacements
+
+
+@dataclass
+class GapEntry:
+    """A logical gap: every marker of the same topic (or a rewording of it) shares its id"""
+    id: str
+    topic: str
+    status: str = OPEN
+    attempts: int = 0
+    fill: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class GapSpan:
+    """Where a gap's marker currently sits in the draft"""
+    gap_id: str
+    start: int
+    end: int
+
+
+@dataclass
+class LedgerUpdate:
+    """What changed in the ledger after fills or a rewrite of the draft"""
+    filled: List[str] = field(default_factory=list)
+    added: List[str] = field(default_factory=list)
+    reopened: List[str] = field(default_factory=list)
+    dropped: List[str] = field(default_factory=list)
+
+
+class GapLedger:
+    """
+    Parsed [MISSING: ...] markers of a draft, with stable gap ids.
+
+    Markers are parsed once; `apply_fills` splices answers in one pass and shifts the
+    remaining spans instead of re-scanning the text. After a model rewrites the draft,
+    `sync` re-parses it and matches the markers to the known gaps by topic (exact,
+    then by word overlap), so a duplicated or reworded marker keeps its id instead of
+    counting as progress or as a new gap. A marker the model deleted without writing
+    anything in its place is DROPPED, not FILLED, and does not count toward
+    completeness. Each gap has `max_attempts` tries; the ledger has converged when no
+    open gap has tries left.
+    """
+
+    def __init__(self, draft: str, max_attempts: int = 3, reword_threshold: float = 0.75):
+        self.max_attempts = max_attempts
+        self.reword_threshold = reword_threshold
+        self.entries: Dict[str, GapEntry] = {}
+        self._draft = draft
+        self._spans: List[GapSpan] = self._match(parse_gaps(draft), previous=set())
+
+    @property
+    def draft(self) -> str:
+        return self._draft
+
+    @property
+    def spans(self) -> List[GapSpan]:
+        return list(self._spans)
+
+    def _new_entry(self, topic: str) -> GapEntry:
+        entry = GapEntry(id=f"gap-{len(self.entries) + 1}", topic=topic)
+        self.entries[entry.id] = entry
+        return entry
+
+    def _match(self, gaps: Sequence[Gap], previous: Set[str]) -> List[GapSpan]:
+        by_key = {_topic_key(entry.topic): entry for entry in self.entries.values()}
+        matched: List[Optional[GapEntry]] = [by_key.get(_topic_key(gap.topic)) for gap in gaps]
+        # Gaps of the previous draft whose marker is gone may have been reworded
+        vanished = previous - {entry.id for entry in matched if entry is not None}
+        for i, gap in enumerate(gaps):
+            if matched[i] is not None:
+                continue
+            entry = by_key.get(_topic_key(gap.topic))  # duplicate of a marker matched just before
+            if entry is None:
+                scored = [
+                    (_topic_similarity(gap.topic, self.entries[gap_id].topic), gap_id)
+                    for gap_id in sorted(vanished) if self.entries[gap_id].status == OPEN
+                ]
+                similarity, gap_id = max(scored, default=(0.0, ""))
+                entry = self.entries[gap_id] if similarity >= self.reword_threshold else self._new_entry(gap.topic)
+                by_key[_topic_key(gap.topic)] = entry
+            matched[i] = entry
+        return [GapSpan(entry.id, gap.start, gap.end) for entry, gap in zip(matched, gaps)]  # type: ignore[union-attr]
+
+    def present_ids(self) -> List[str]:
+        """Ids of the gaps with a marker in the draft, in order of first appearance"""
+        return list(dict.fromkeys(span.gap_id for span in self._spans))
+
+    def retryable(self) -> List[GapEntry]:
+        """Open gaps still in the draft that have tries left"""
+        return [
+            self.entries[gap_id] for gap_id in self.present_ids()
+            if self.entries[gap_id].status == OPEN and self.entries[gap_id].attempts < self.max_attempts
+        ]
+
+    def exhausted(self) -> List[GapEntry]:
+        return [
+            self.entries[gap_id] for gap_id in self.present_ids()
+            if self.entries[gap_id].status == OPEN and self.entries[gap_id].attempts >= self.max_attempts
+        ]
+
+    def record_attempts(self, gap_ids: Sequence[str]) -> None:
+        for gap_id in gap_ids:
+            self.entries[gap_id].attempts += 1
+
+    def first_span(self, gap_id: str) -> GapSpan:
+        return next(span for span in self._spans if span.gap_id == gap_id)
+
+    def context(self, gap_id: str, window: int = 300) -> str:
+        span = self.first_span(gap_id)
+        return gap_context(self._draft, Gap(0, self.entries[gap_id].topic, span.start, span.end), window)
+
+    def apply_fills(self, fills: Mapping[str, str]) -> LedgerUpdate:
+        """Replace every marker of the filled gaps in one pass; other spans are shifted, not re-parsed"""
+        parts: List[str] = []
+        spans: List[GapSpan] = []
+        position = shift = 0
+        for span in self._spans:
+            if span.gap_id in fills:
+                parts.append(self._draft[position:span.start])
+                parts.append(fills[span.gap_id])
+                shift += len(fills[span.gap_id]) - (span.end - span.start)
+                position = span.end
+            else:
+                spans.append(GapSpan(span.gap_id, span.start + shift, span.end + shift))
+        parts.append(self._draft[position:])
+        self._draft = "".join(parts)
+        self._spans = spans
+
+        update = LedgerUpdate()
+        for gap_id, text in fills.items():
+            entry = self.entries[gap_id]
+            if entry.status == OPEN:
+                entry.status, entry.fill = FILLED, text
+                update.filled.append(gap_id)
+        return update
+
+    def sync(self, draft: str) -> LedgerUpdate:
+        """Reconcile with a draft rewritten by the model (the only full re-parse)"""
+        previous = set(self.present_ids())
+        previous_draft, previous_spans = self._draft, self._spans
+        self._draft = draft
+        self._spans = self._match(parse_gaps(draft), previous)
+        present = set(self.present_ids())
+        replacements: Optional[Dict[str, str]] = None
+
+        update = LedgerUpdate()
+        for gap_id in self.entries:
+            entry = self.entries[gap_id]
+            if gap_id in previous and gap_id not in present and entry.status == OPEN:
+                if replacements is None:
+                    # Only diffed when a marker is gone
+                    replacements = _replacements(previous_draft, previous_spans, draft)
+                text = replacements.get(gap_id, "")
+                if re.search(r"\w", text):
+                    entry.status, entry.fill = FILLED, text
+                    update.filled.append(gap_id)
+                else:
+                    entry.status = DROPPED
+                    update.dropped.append(gap_id)
+            elif gap_id in present and gap_id not in previous:
+                if entry.status in (FILLED, DROPPED):
+                    entry.status, entry.fill = OPEN, None
+                    update.reopened.append(gap_id)
+                else:
+                    update.added.append(gap_id)
+        return update
+
+    @property
+    def open_count(self) -> int:
+        return sum(1 for gap_id in self.present_ids() if self.entries[gap_id].status == OPEN)
+
+    @property
+    def filled_count(self) -> int:
+        return sum(1 for entry in self.entries.values() if entry.status == FILLED)
+
+    def dropped(self) -> List[GapEntry]:
+        """Gaps whose marker the model deleted without filling it"""
+        return [entry for entry in self.entries.values() if entry.status == DROPPED]
+
+    @property
+    def completeness(self) -> float:
+        """Share of the gaps seen so far that are filled (dropped gaps count as missing)"""
+        return self.filled_count / len(self.entries) if self.entries else 1.0
+
+    @property
+    def converged(self) -> bool:
+        return not self.retryable()
+
+
+@dataclass
+class GapFillResult:
+    draft: str
+    attempted: List[str] = field(default_factory=list)
+    fills: Dict[str, str] = field(default_factory=dict)
+    calls: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def unresolved(self) -> List[str]:
+        return [gap_id for gap_id in self.attempted if gap_id not in self.fills]
+
+
+class ParallelGapFiller:
+    """
+    Fills the open gaps of a GapLedger with one concurrent call per gap.
+
+    Every marker of a gap shares its call. Answers are spliced into the draft locally
+    (`GapLedger.apply_fills`), so the full text is never regenerated by the model and
+    the latency of a round is that of the slowest gap. Gaps the model cannot fill,
+    or whose call fails, keep their marker and use up one of their tries. With a
+    `retriever`, each gap is first looked up (topic + question) and the passages
+    found go into its prompt.
+    """
+
+    def __init__(
+        self,
+        model: BaseChatModel,
+        max_concurrency: int = 8,
+        context_window: int = 300,
+        prompt: PromptTemplate = GAP_FILL_PROMPT,
+        retriever: Optional[BaseRetriever] = None,
+    ):
+        self.chain: Runnable = prompt | model | StrOutputParser()
+        self.max_concurrency = max_concurrency
+        self.context_window = context_window
+        self.retriever = retriever
+
+    def _passages(self, queries: List[str]) -> List[str]:
+        if self.retriever is None or not queries:
+            return [NO_PASSAGES] * len(queries)
+        results = self.retriever.batch(queries, config={"max_concurrency": self.max_concurrency})
+        return [format_passages(documents) for documents in results]
+
+    def fill(self, question: str, ledger: GapLedger) -> GapFillResult:
+        """One round over the retryable gaps of the ledger, which is updated in place"""
+        start = time.perf_counter()
+        entries = ledger.retryable()
+        ledger.record_attempts([entry.id for entry in entries])
+
+        passages = self._passages([f"{entry.topic} {question}" for entry in entries])
+        inputs = [
+            {
+                "question": question,
+                "topic": entry.topic,
+                "context": ledger.context(entry.id, self.context_window),
+                "passages": entry_passages,
+            }
+            for entry, entry_passages in zip(entries, passages)
+        ]
+        answers = self.chain.batch(
+            inputs, config={"max_concurrency": self.max_concurrency}, return_exceptions=True
+        ) if inputs else []
+
+        fills: Dict[str, str] = {}
+        for entry, answer in zip(entries, answers):
+            text = None if isinstance(answer, Exception) else clean_fill(answer)
+            if text is not None:
+                fills[entry.id] = text
+        ledger.apply_fills(fills)
+
+        return GapFillResult(
+            draft=ledger.draft,
+            attempted=[entry.id for entry in entries],
+            fills=fills,
+            calls=len(inputs),
+            elapsed=time.perf_counter() - start,
+        )
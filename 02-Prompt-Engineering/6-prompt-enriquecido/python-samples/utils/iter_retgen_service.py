@@ -0,0 +1,375 @@
+"""
+Serviço assíncrono de ITER-RETGEN: fila de perguntas, limite global de chamadas (perguntas mais antigas primeiro) e orçamentos por pergunta
+"""
+
+import asyncio
+import heapq
+import inspect
+import itertools
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.prompts import PromptTemplate
+from langchain_core.retrievers import BaseRetriever
+
+from .gap_filling import GAP_FILL_PROMPT, NO_PASSAGES, GapLedger, clean_fill, format_passages
+
+DRAFT_PROMPT = PromptTemplate(
+    input_variables=["question"],
+    template=(
+        "Answer the following question. Mark every specific detail you are not sure about "
+        "(versions, dates, metrics, limitations) with a [MISSING: ...] marker instead of guessing.\n"
+        "Do not generate more than 5 MISSING markers.\n\n"
+        "Question: {question}\n\n"
+        "Answer:"
+    ),
+)
+
+COMPLETED, BUDGET_EXHAUSTED, TIMED_OUT, FAILED = "completed", "budget_exhausted", "timed_out", "failed"
+
+
+class QuestionBudgetExceeded(RuntimeError):
+    """Raised inside a question's pipeline when its token or time budget is used up"""
+
+    def __init__(self, status: str, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass(frozen=True)
+class QuestionBudget:
+    """Per-question limits: tokens over all its calls and wall time from its first model call"""
+    max_tokens: Optional[int] = 20_000
+    max_seconds: Optional[float] = 120.0
+
+
+@dataclass
+class RetgenEvent:
+    question_id: str
+    kind: str  # queued | started | draft | round | finished
+    data: Dict[str, Any] = field(default_factory=dict)
+    timestamp: float = field(default_factory=time.time)
+
+
+@dataclass
+class RetgenResult:
+    question_id: str
+    question: str
+    answer: str
+    status: str
+    gaps_total: int = 0
+    gaps_filled: int = 0
+    rounds: int = 0
+    calls: int = 0
+    tokens: int = 0
+    elapsed: float = 0.0
+    error: Optional[str] = None
+
+
+class CallScheduler:
+    """
+    Global limit on concurrent model calls, granted to the oldest question first.
+
+    Each question has a priority (the order in which it was picked up) and a free slot
+    goes to the waiting call with the lowest one. A question that already started
+    finishes its calls before newer questions get slots, so its time budget is spent
+    on its own calls instead of being shared with every other question in flight.
+    A question never has more calls pending than it has gaps, so none of them can
+    hold the slots for long.
+    """
+
+    def __init__(self, max_concurrency: int = 16):
+        self.max_concurrency = max_concurrency
+        self.in_use = 0
+        self._waiters: List[Tuple[int, int, "asyncio.Future[None]"]] = []
+        self._sequence = itertools.count()
+
+    @asynccontextmanager
+    async def slot(self, priority: int) -> AsyncIterator[None]:
+        await self._acquire(priority)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, priority: int) -> None:
+        if self.in_use < self.max_concurrency and not self._waiters:
+            self.in_use += 1
+            return
+        future: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release()  # the slot was granted just before the cancellation
+            raise
+
+    def _release(self) -> None:
+        self.in_use -= 1
+        while self.in_use < self.max_concurrency and self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                self.in_use += 1
+                future.set_result(None)
+
+
+@dataclass
+class _Job:
+    question_id: str
+    question: str
+    budget: QuestionBudget
+    future: "asyncio.Future[RetgenResult]"
+    priority: int = 0
+    started: Optional[float] = None  # when its first call got a slot
+    tokens: int = 0
+    calls: int = 0
+
+    def remaining_seconds(self) -> Optional[float]:
+        """Time left, or None when there is no limit or the clock has not started yet"""
+        if self.budget.max_seconds is None or self.started is None:
+            return None
+        return self.budget.max_seconds - (time.monotonic() - self.started)
+
+
+def _usage_tokens(message: BaseMessage) -> int:
+    usage = getattr(message, "usage_metadata", None)
+    if usage:
+        return usage.get("total_tokens", 0)
+    token_usage = message.response_metadata.get("token_usage") or {}
+    return token_usage.get("total_tokens", 0)
+
+
+class IterRetgenService:
+    """
+    asyncio service running ITER-RETGEN (parallel gap mode) over a queue of questions.
+
+    Questions go through a bounded queue served by `workers` tasks; every model call
+    of every question goes through one CallScheduler, so `max_concurrency` bounds the
+    load on the endpoint whatever the number of questions in flight. Each call checks
+    the question's QuestionBudget first (tokens used so far, time left) and is cut at
+    the deadline; a question out of budget stops with its best draft so far. The fills
+    of a round run concurrently, so a round only starts as many as the remaining
+    tokens can pay for at the question's mean cost per call, and a question that still
+    ends over its token budget is reported as BUDGET_EXHAUSTED. The time
+    budget starts when the question's first call gets a slot, so `workers` larger than
+    `max_concurrency` only queues questions and does not eat into their budgets. Progress
+    is reported as RetgenEvent objects to `on_event` (sync or async callable).
+    """
+
+    def __init__(
+        self,
+        model: BaseChatModel,
+        max_concurrency: int = 16,
+        workers: int = 64,
+        max_queue: int = 1000,
+        budget: QuestionBudget = QuestionBudget(),
+        max_rounds: int = 3,
+        max_gap_attempts: int = 2,
+        target_completeness: float = 1.0,
+        retriever: Optional[BaseRetriever] = None,
+        draft_prompt: PromptTemplate = DRAFT_PROMPT,
+        fill_prompt: PromptTemplate = GAP_FILL_PROMPT,
+        context_window: int = 300,
+        on_event: Optional[Callable[[RetgenEvent], Any]] = None,
+    ):
+        self.scheduler = CallScheduler(max_concurrency)
+        self.workers = workers
+        self.max_queue = max_queue
+        self.budget = budget
+        self.max_rounds = max_rounds
+        self.max_gap_attempts = max_gap_attempts
+        self.target_completeness = target_completeness
+        self.retriever = retriever
+        self.draft_chain = draft_prompt | model
+        self.fill_chain = fill_prompt | model
+        self.context_window = context_window
+        self.on_event = on_event
+        self._queue: Optional["asyncio.Queue[_Job]"] = None
+        self._tasks: List[asyncio.Task] = []
+        self._next_id = 0
+        self._picked = itertools.count()
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Finish the queued questions, then stop the workers"""
+        if self._queue is not None:
+            await self._queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def __aenter__(self) -> "IterRetgenService":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.stop()
+
+    async def submit(
+        self, question: str, question_id: Optional[str] = None, budget: Optional[QuestionBudget] = None
+    ) -> "asyncio.Future[RetgenResult]":
+        """Queue a question (waiting for room if the queue is full); await the returned future for its result"""
+        if self._queue is None:
+            raise RuntimeError("Service not started: call start() or use 'async with'")
+        if question_id is None:
+            self._next_id += 1
+            question_id = f"q-{self._next_id}"
+        job = _Job(question_id, question, budget or self.budget, asyncio.get_running_loop().create_future())
+        await self._queue.put(job)
+        await self._emit(RetgenEvent(question_id, "queued"))
+        return job.future
+
+    async def run_all(self, questions: Iterable[str]) -> List[RetgenResult]:
+        """Feed a backlog through the bounded queue and return the results in input order"""
+        futures = [await self.submit(question) for question in questions]
+        return list(await asyncio.gather(*futures))
+
+    async def _emit(self, event: RetgenEvent) -> None:
+        if self.on_event is None:
+            return
+        outcome = self.on_event(event)
+        if inspect.isawaitable(outcome):
+            await outcome
+
+    async def _worker(self) -> None:
+        assert self._queue is not None
+        while True:
+            job = await self._queue.get()
+            try:
+                result = await self._run(job)
+                if not job.future.done():
+                    job.future.set_result(result)
+            except Exception as failure:  # an event callback failed: report it, keep the worker alive
+                if not job.future.done():
+                    job.future.set_exception(failure)
+            finally:
+                self._queue.task_done()
+
+    async def _call(self, job: _Job, chain: Any, inputs: Dict[str, Any]) -> str:
+        """Every model call of a question: budget check, fair slot, deadline, token accounting"""
+        if self.budget_exhausted(job):
+            raise QuestionBudgetExceeded(BUDGET_EXHAUSTED, f"token budget of {job.budget.max_tokens} used up")
+        remaining = job.remaining_seconds()
+        if remaining is not None and remaining <= 0:
+            raise QuestionBudgetExceeded(TIMED_OUT, f"time budget of {job.budget.max_seconds}s used up")
+
+        async def call() -> BaseMessage:
+            async with self.scheduler.slot(job.priority):
+                if job.started is None:
+                    # The clock starts here: time spent queued behind older questions is not charged
+                    job.started = time.monotonic()
+                    return await asyncio.wait_for(chain.ainvoke(inputs), timeout=job.remaining_seconds())
+                return await chain.ainvoke(inputs)
+
+        try:
+            message = await asyncio.wait_for(call(), timeout=remaining)
+        except asyncio.TimeoutError:
+            raise QuestionBudgetExceeded(TIMED_OUT, f"time budget of {job.budget.max_seconds}s used up") from None
+        job.calls += 1
+        job.tokens += _usage_tokens(message)
+        return str(message.content)
+
+    @staticmethod
+    def budget_exhausted(job: _Job) -> bool:
+        return job.budget.max_tokens is not None and job.tokens >= job.budget.max_tokens
+
+    @staticmethod
+    def affordable_calls(job: _Job) -> Optional[int]:
+        """
+        How many more calls the token budget allows, reserving the mean cost of the
+        question's calls so far for each one (None: no limit)
+        """
+        if job.budget.max_tokens is None or job.calls == 0:
+            return None
+        per_call = max(1, job.tokens // job.calls)
+        return max(0, (job.budget.max_tokens - job.tokens) // per_call)
+
+    async def _passages(self, queries: List[str]) -> List[str]:
+        if self.retriever is None or not queries:
+            return [NO_PASSAGES] * len(queries)
+        results = await self.retriever.abatch(queries)
+        return [format_passages(documents) for documents in results]
+
+    async def _run(self, job: _Job) -> RetgenResult:
+        job.priority = next(self._picked)
+        await self._emit(RetgenEvent(job.question_id, "started"))
+        ledger: Optional[GapLedger] = None
+        rounds = 0
+        status, error = COMPLETED, None
+        try:
+            draft = await self._call(job, self.draft_chain, {"question": job.question})
+            ledger = GapLedger(draft, max_attempts=self.max_gap_attempts)
+            await self._emit(RetgenEvent(job.question_id, "draft", {"gaps": len(ledger.entries), "tokens": job.tokens}))
+
+            while rounds < self.max_rounds and not ledger.converged and ledger.completeness < self.target_completeness:
+                # The fills of a round run at once: only start the ones the budget can pay for
+                entries = ledger.retryable()
+                affordable = self.affordable_calls(job)
+                if affordable is not None:
+                    if affordable == 0:
+                        raise QuestionBudgetExceeded(
+                            BUDGET_EXHAUSTED, f"token budget of {job.budget.max_tokens} cannot pay for another call"
+                        )
+                    entries = entries[:affordable]
+                rounds += 1
+                ledger.record_attempts([entry.id for entry in entries])
+                passages = await self._passages([f"{entry.topic} {job.question}" for entry in entries])
+                answers = await asyncio.gather(*[
+                    self._call(job, self.fill_chain, {
+                        "question": job.question,
+                        "topic": entry.topic,
+                        "context": ledger.context(entry.id, self.context_window),
+                        "passages": entry_passages,
+                    })
+                    for entry, entry_passages in zip(entries, passages)
+                ], return_exceptions=True)
+
+                fills: Dict[str, str] = {}
+                exceeded: Optional[QuestionBudgetExceeded] = None
+                for entry, answer in zip(entries, answers):
+                    if isinstance(answer, QuestionBudgetExceeded):
+                        exceeded = answer
+                    elif isinstance(answer, str) and clean_fill(answer) is not None:
+                        fills[entry.id] = clean_fill(answer)  # type: ignore[assignment]
+                # Fills that made it in before the budget ran out are kept
+                ledger.apply_fills(fills)
+                await self._emit(RetgenEvent(job.question_id, "round", {
+                    "round": rounds, "filled": len(fills), "open": ledger.open_count, "tokens": job.tokens,
+                }))
+                if exceeded is not None:
+                    raise exceeded
+        except QuestionBudgetExceeded as budget_error:
+            status, error = budget_error.status, str(budget_error)
+        except Exception as failure:
+            status, error = FAILED, f"{type(failure).__name__}: {failure}"
+        if status == COMPLETED and job.budget.max_tokens is not None and job.tokens > job.budget.max_tokens:
+            # Calls cost more than their estimate: the answer is kept, the overrun is reported
+            status, error = BUDGET_EXHAUSTED, f"used {job.tokens} tokens of a {job.budget.max_tokens} budget"
+
+        result = RetgenResult(
+            question_id=job.question_id,
+            question=job.question,
+            answer=ledger.draft if ledger is not None else "",
+            status=status,
+            gaps_total=len(ledger.entries) if ledger is not None else 0,
+            gaps_filled=ledger.filled_count if ledger is not None else 0,
+            rounds=rounds,
+            calls=job.calls,
+            tokens=job.tokens,
+            elapsed=time.monotonic() - job.started if job.started is not None else 0.0,
+            error=error,
+        )
+        await self._emit(RetgenEvent(job.question_id, "finished", {
+            "status": status, "gaps_filled": result.gaps_filled, "gaps_total": result.gaps_total,
+            "tokens": result.tokens, "elapsed": result.elapsed,
+        }))
+        return result
@@ -0,0 +1,196 @@
+"""
+Fábrica de chat models compartilhados: clientes em cache, um pool HTTP único com keep-alive
+e limite de taxa/concorrência aplicado em todas as chamadas
+"""
+
+import asyncio
+import json
+import os
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import httpx
+from langchain_openai import ChatOpenAI
+from pydantic import SecretStr
+
+from .rate_limit import AIMDConcurrencyController, AsyncRateLimitedTransport, RateLimitedTransport, RateLimiter
+
+
+@dataclass(frozen=True)
+class HttpPoolConfig:
+    """Limits of the shared HTTP connection pool"""
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    timeout: float = 120.0
+
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+
+class LoopBoundAsyncTransport(httpx.AsyncBaseTransport):
+    """
+    Async transport with one connection pool per event loop.
+
+    httpx connections belong to the loop that opened them, so a shared AsyncClient
+    breaks as soon as a script calls `asyncio.run` a second time. Every request is
+    forwarded to the pool of the running loop instead; pools of finished loops are
+    dropped together with the loop.
+    """
+
+    def __init__(self, factory: Callable[[], httpx.AsyncBaseTransport]):
+        self._factory = factory
+        self._transports: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncBaseTransport]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+
+    def _transport(self) -> httpx.AsyncBaseTransport:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            transport = self._transports.get(loop)
+            if transport is None:
+                transport = self._transports[loop] = self._factory()
+            return transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._transport().handle_async_request(request)
+
+    async def aclose(self) -> None:
+        with self._lock:
+            transport = self._transports.pop(asyncio.get_running_loop(), None)
+        if transport is not None:
+            await transport.aclose()
+
+
+_lock = threading.RLock()
+_pool_config = HttpPoolConfig(max_connections=int(os.environ.get("LLM_MAX_CONNECTIONS", "20")))
+_http_client: Optional[httpx.Client] = None
+_async_http_client: Optional[httpx.AsyncClient] = None
+_models: Dict[Tuple[str, str], ChatOpenAI] = {}
+_rate_limiter: Optional[RateLimiter] = None
+
+
+def _env_float(name: str) -> Optional[float]:
+    value = os.environ.get(name)
+    return float(value) if value else None
+
+
+def configure_http_pool(**limits: Any) -> HttpPoolConfig:
+    """
+    Change the pool limits (e.g. max_connections=50). Call before the first model is
+    created: existing clients and cached models are discarded.
+    """
+    global _pool_config
+    with _lock:
+        close_http_clients()
+        _pool_config = HttpPoolConfig(**{**_pool_config.__dict__, **limits})
+        return _pool_config
+
+
+def configure_rate_limits(
+    requests_per_minute: Optional[float] = None,
+    tokens_per_minute: Optional[float] = None,
+    adaptive: bool = True,
+    initial_concurrency: int = 4,
+    max_concurrency: Optional[int] = None,
+) -> RateLimiter:
+    """
+    Throttle every model handed out by `get_chat_model`: RPM/TPM token buckets and, with
+    `adaptive`, an AIMD limit on in-flight requests that grows until the endpoint
+    answers 429 and then backs off. Existing clients and cached models are discarded.
+    """
+    global _rate_limiter
+    with _lock:
+        close_http_clients()
+        concurrency = None
+        if adaptive:
+            concurrency = AIMDConcurrencyController(
+                initial=initial_concurrency,
+                maximum=max_concurrency or _pool_config.max_connections,
+            )
+        _rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute, concurrency)
+        return _rate_limiter
+
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """Limiter in use (configured explicitly or from LLM_RPM / LLM_TPM), if any"""
+    global _rate_limiter
+    with _lock:
+        if _rate_limiter is None and (_env_float("LLM_RPM") or _env_float("LLM_TPM")):
+            _rate_limiter = RateLimiter(
+                _env_float("LLM_RPM"),
+                _env_float("LLM_TPM"),
+                AIMDConcurrencyController(maximum=_pool_config.max_connections),
+            )
+        return _rate_limiter
+
+
+def get_http_client() -> httpx.Client:
+    """Process-wide sync HTTP client shared by every model (one pool, keep-alive)"""
+    global _http_client
+    with _lock:
+        if _http_client is None or _http_client.is_closed:
+            limiter = get_rate_limiter()
+            transport = RateLimitedTransport(limiter, limits=_pool_config.limits()) if limiter else None
+            _http_client = httpx.Client(limits=_pool_config.limits(), timeout=_pool_config.timeout,
+                                        transport=transport)
+        return _http_client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Process-wide async HTTP client; connections are pooled per event loop (LoopBoundAsyncTransport)"""
+    global _async_http_client
+    with _lock:
+        if _async_http_client is None or _async_http_client.is_closed:
+            limiter = get_rate_limiter()
+            limits = _pool_config.limits()
+
+            def new_transport() -> httpx.AsyncBaseTransport:
+                if limiter:
+                    return AsyncRateLimitedTransport(limiter, limits=limits)
+                return httpx.AsyncHTTPTransport(limits=limits)
+
+            _async_http_client = httpx.AsyncClient(timeout=_pool_config.timeout,
+                                                   transport=LoopBoundAsyncTransport(new_transport))
+        return _async_http_client
+
+
+def get_chat_model(model: str = "gpt-4o", **params: Any) -> ChatOpenAI:
+    """
+    Cached ChatOpenAI for GitHub Models, keyed by model name and parameters.
+
+    Same arguments return the same instance; every instance shares the pooled HTTP
+    clients, so short-lived jobs and per-request objects skip client setup and TLS
+    handshakes.
+    """
+    key = (model, json.dumps(params, sort_keys=True, default=str))
+    with _lock:
+        if key not in _models:
+            _models[key] = ChatOpenAI(
+                model=model,
+                base_url=os.environ["GITHUB_MODELS_ENDPOINT"],
+                api_key=SecretStr(os.environ["GITHUB_MODELS_TOKEN"]),
+                http_client=get_http_client(),
+                http_async_client=get_async_http_client(),
+                **params,
+            )
+        return _models[key]
+
+
+def close_http_clients() -> None:
+    """Close the shared clients and forget the cached models"""
+    global _http_client, _async_http_client
+    with _lock:
+        if _http_client is not None:
+            _http_client.close()
+        # The async client is dropped without awaiting aclose(): its loops may be gone already
+        _http_client = None
+        _async_http_client = None
+        _models.clear()
@@ -0,0 +1,302 @@
+"""
+Índice híbrido local (BM25 em índice invertido + matriz de embeddings NumPy) salvo em disco via mmap
+"""
+
+import json
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from pydantic import ConfigDict
+
+from .example_selector import Embedder, HashingEmbedder, normalize_rows
+
+WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Longer "words" (hashes, base64) would widen the fixed-size vocabulary array for nothing
+MAX_TOKEN_LENGTH = 32
+
+# Files of a saved index; every array is an .npy so the load is a set of mmaps
+_ARRAYS = ("vocab", "indptr", "postings", "weights", "vectors", "offsets", "sources")
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in WORD_PATTERN.findall(text.lower()) if len(token) <= MAX_TOKEN_LENGTH]
+
+
+@dataclass
+class SearchHit:
+    passage_id: int
+    text: str
+    source: str
+    score: float
+    bm25: float
+    dense: float
+
+
+class HybridIndex:
+    """
+    Passage index combining BM25 and embedding similarity.
+
+    BM25 lives in a CSR inverted index: a sorted vocabulary, one postings slice per
+    term and the BM25 weight of every posting precomputed at build time, so a query
+    is a few vectorized `scores[docs] += weights` over the postings of its terms. The
+    best `candidates` BM25 passages are re-ranked with the cosine similarity of their
+    rows in the normalized embedding matrix (a full matrix scan only when no query
+    term is in the vocabulary). All arrays and the passage text are saved as .npy
+    files and memory-mapped on load, so opening a large index is instant and pages
+    are read on demand.
+    """
+
+    def __init__(
+        self,
+        vocab: np.ndarray,
+        indptr: np.ndarray,
+        postings: np.ndarray,
+        weights: np.ndarray,
+        vectors: np.ndarray,
+        text: np.ndarray,
+        offsets: np.ndarray,
+        sources: np.ndarray,
+        source_names: List[str],
+        embedder: Optional[Embedder] = None,
+    ):
+        self.vocab = vocab
+        self.indptr = indptr
+        self.postings = postings
+        self.weights = weights
+        self.vectors = vectors
+        self.text = text
+        self.offsets = offsets
+        self.sources = sources
+        self.source_names = source_names
+        self.embedder = embedder or HashingEmbedder(dim=vectors.shape[1], collapse_digits=False)
+        self._term_ids: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @classmethod
+    def build(
+        cls,
+        passages: Iterable[Tuple[str, str]],
+        embedder: Optional[Embedder] = None,
+        dim: int = 256,
+        k1: float = 1.5,
+        b: float = 0.75,
+        batch_size: int = 4096,
+    ) -> "HybridIndex":
+        """Index (source, text) passages; meant to run offline, see `save`"""
+        embedder = embedder or HashingEmbedder(dim=dim, collapse_digits=False)
+        term_ids: Dict[str, int] = {}
+        source_ids: Dict[str, int] = {}
+        doc_terms: List[np.ndarray] = []
+        doc_tfs: List[np.ndarray] = []
+        lengths: List[int] = []
+        sources: List[int] = []
+        chunks: List[bytes] = []
+        vectors: List[np.ndarray] = []
+        batch: List[str] = []
+
+        for source, passage in passages:
+            tokens = tokenize(passage)
+            counts = Counter(tokens)
+            doc_terms.append(np.fromiter(
+                (term_ids.setdefault(token, len(term_ids)) for token in counts), dtype=np.int64, count=len(counts)
+            ))
+            doc_tfs.append(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+            lengths.append(len(tokens))
+            sources.append(source_ids.setdefault(source, len(source_ids)))
+            chunks.append(passage.encode("utf-8"))
+            batch.append(passage)
+            if len(batch) == batch_size:
+                vectors.append(normalize_rows(embedder(batch)))
+                batch = []
+        if batch:
+            vectors.append(normalize_rows(embedder(batch)))
+        if not chunks:
+            raise ValueError("No passages to index")
+
+        # Term ids re-labelled in alphabetical order, so the vocabulary is binary-searchable
+        words = np.array(list(term_ids), dtype=str)
+        vocab_order = np.argsort(words)
+        rank = np.empty(len(words), dtype=np.int64)
+        rank[vocab_order] = np.arange(len(words))
+
+        # Postings sorted by term (then by passage): CSR layout, one slice per term
+        doc_ids = np.repeat(np.arange(len(doc_terms), dtype=np.int32), [len(t) for t in doc_terms])
+        terms = rank[np.concatenate(doc_terms)]
+        tfs = np.concatenate(doc_tfs)
+        order = np.argsort(terms, kind="stable")
+        terms, doc_ids, tfs = terms[order], doc_ids[order], tfs[order]
+        indptr = np.zeros(len(words) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(terms, minlength=len(words)), out=indptr[1:])
+
+        # BM25 weight of each posting, computed once
+        doc_lengths = np.asarray(lengths, dtype=np.float32)
+        df = np.diff(indptr).astype(np.float32)
+        idf = np.log(1.0 + (len(chunks) - df + 0.5) / (df + 0.5))
+        norm = k1 * (1.0 - b + b * doc_lengths[doc_ids] / max(float(doc_lengths.mean()), 1.0))
+        weights = (idf[terms] * tfs * (k1 + 1.0) / (tfs + norm)).astype(np.float32)
+
+        offsets = np.zeros(len(chunks) + 1, dtype=np.int64)
+        np.cumsum([len(chunk) for chunk in chunks], out=offsets[1:])
+        return cls(
+            vocab=words[vocab_order],
+            indptr=indptr,
+            postings=doc_ids,
+            weights=weights,
+            vectors=np.vstack(vectors).astype(np.float32),
+            text=np.frombuffer(b"".join(chunks), dtype=np.uint8),
+            offsets=offsets,
+            sources=np.asarray(sources, dtype=np.int32),
+            source_names=list(source_ids),
+            embedder=embedder,
+        )
+
+    def save(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        arrays = {
+            "vocab": self.vocab, "indptr": self.indptr, "postings": self.postings, "weights": self.weights,
+            "vectors": self.vectors, "offsets": self.offsets, "sources": self.sources,
+        }
+        for name in _ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), np.ascontiguousarray(arrays[name]))
+        np.save(os.path.join(directory, "text.npy"), np.ascontiguousarray(self.text))
+        with open(os.path.join(directory, "sources.json"), "w", encoding="utf-8") as f:
+            json.dump(self.source_names, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, directory: str, embedder: Optional[Embedder] = None, mmap: bool = True) -> "HybridIndex":
+        """Open a saved index; with `mmap` nothing is read until a query touches it"""
+        mode = "r" if mmap else None
+        arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mode) for name in _ARRAYS}
+        with open(os.path.join(directory, "sources.json"), encoding="utf-8") as f:
+            source_names = json.load(f)
+        return cls(
+            text=np.load(os.path.join(directory, "text.npy"), mmap_mode=mode),
+            source_names=source_names,
+            embedder=embedder,
+            **arrays,
+        )
+
+    def passage(self, passage_id: int) -> str:
+        start, end = self.offsets[passage_id], self.offsets[passage_id + 1]
+        return bytes(self.text[start:end]).decode("utf-8")
+
+    def _term_id(self, term: str) -> int:
+        if term not in self._term_ids:
+            position = int(np.searchsorted(self.vocab, term))
+            found = position < len(self.vocab) and self.vocab[position] == term
+            self._term_ids[term] = position if found else -1
+        return self._term_ids[term]
+
+    def bm25_scores(self, query: str, max_df: float = 0.5) -> Optional[np.ndarray]:
+        """BM25 score of every passage, or None when no query term is indexed"""
+        result = self._bm25(query, max_df)
+        return result[0] if result is not None else None
+
+    def _bm25(self, query: str, max_df: float) -> Optional[Tuple[np.ndarray, List[Tuple[int, int]]]]:
+        # Terms found in more than `max_df` of the passages weigh almost nothing (idf ~ 0)
+        # but have the longest postings: they are skipped when the query has rarer terms
+        term_ids = {self._term_id(term) for term in tokenize(query)} - {-1}
+        if not term_ids:
+            return None
+        spans = [(int(self.indptr[t]), int(self.indptr[t + 1])) for t in term_ids]
+        spans = [(start, end) for start, end in spans if end - start <= max_df * len(self)] or spans
+        scores = np.zeros(len(self), dtype=np.float32)
+        for start, end in spans:
+            np.add.at(scores, self.postings[start:end], self.weights[start:end])
+        return scores, spans
+
+    def search(self, query: str, k: int = 5, alpha: float = 0.5, candidates: int = 100) -> List[SearchHit]:
+        """
+        Top-k passages by `alpha * normalized BM25 + (1 - alpha) * cosine`,
+        re-ranking the `candidates` best BM25 passages
+        """
+        query_vector = normalize_rows(self.embedder([query]))[0]
+        result = self._bm25(query, max_df=0.5)
+        if result is None:
+            dense = self.vectors @ query_vector
+            ids = _top(dense, k)
+            return [self._hit(int(i), float(dense[i]), 0.0, float(dense[i])) for i in ids]
+
+        bm25, spans = result
+        if sum(end - start for start, end in spans) < len(self) // 4:
+            # Selective query: rank only the passages its postings touch, not the whole array.
+            # A passage appears once per term, so the best len(spans) * candidates entries
+            # hold at least `candidates` distinct passages
+            touched = np.concatenate([self.postings[start:end] for start, end in spans])
+            best = touched[_top(bm25[touched], len(spans) * candidates)]
+            _, first = np.unique(best, return_index=True)
+            ids = best[np.sort(first)][:candidates]
+        else:
+            ids = _top(bm25, min(candidates, len(self)))
+        ids = ids[bm25[ids] > 0]
+        # Rows gathered in file order (friendlier to a memmap), then mapped back to `ids`
+        rows = np.sort(ids)
+        dense = (self.vectors[rows] @ query_vector)[np.searchsorted(rows, ids)]
+        lexical = bm25[ids] / bm25[ids].max()
+        combined = alpha * lexical + (1.0 - alpha) * np.maximum(dense, 0.0)
+        best = np.argsort(-combined, kind="stable")[:k]
+        return [self._hit(int(ids[i]), float(combined[i]), float(bm25[ids[i]]), float(dense[i])) for i in best]
+
+    def _hit(self, passage_id: int, score: float, bm25: float, dense: float) -> SearchHit:
+        return SearchHit(
+            passage_id=passage_id,
+            text=self.passage(passage_id),
+            source=self.source_names[int(self.sources[passage_id])],
+            score=score,
+            bm25=bm25,
+            dense=dense,
+        )
+
+    def as_retriever(self, k: int = 3, alpha: float = 0.5) -> "HybridRetriever":
+        return HybridRetriever(index=self, k=k, alpha=alpha)
+
+
+def _top(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k largest scores, best first"""
+    k = min(k, len(scores))
+    if k == 0:
+        return np.empty(0, dtype=np.int64)
+    ids = np.argpartition(-scores, k - 1)[:k]
+    return ids[np.argsort(-scores[ids], kind="stable")]
+
+
+class HybridRetriever(BaseRetriever):
+    """LangChain retriever over a HybridIndex (score and source in the metadata)"""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    index: HybridIndex
+    k: int = 3
+    alpha: float = 0.5
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        return [
+            Document(
+                page_content=hit.text,
+                metadata={"source": hit.source, "passage_id": hit.passage_id, "score": hit.score},
+            )
+            for hit in self.index.search(query, k=self.k, alpha=self.alpha)
+        ]
+
+
+def split_documents(paths: Sequence[str], chunk_size: int = 800, chunk_overlap: int = 100) -> Iterable[Tuple[str, str]]:
+    """(source, passage) pairs from text/markdown files, for `HybridIndex.build`"""
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    for path in paths:
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            for passage in splitter.split_text(f.read()):
+                yield path, passage